@@ -1,11 +1,22 @@
-from utils.math3d import Vector3, distance_3d
+import itertools
+import numpy as np
+from utils.math3d import Vector3, distance_3d, scale_matrix
+from utils.transforms import translation_matrices
 from utils.constants import *
 
+BULLET_SCALE = scale_matrix(0.1, 0.1, 0.1).astype(np.float32)
+
+# Bullets come and go every tick and CPython reuses their id()s, so
+# snapshots match them between ticks by serial instead
+BULLET_SERIALS = itertools.count()
+
 class Bullet:
     def __init__(self, position, direction, is_player_bullet=True):
+        self.serial = next(BULLET_SERIALS)
         self.position = Vector3(position.x, position.y, position.z)
         self.velocity = direction.normalize() * BULLET_SPEED
         self.is_player_bullet = is_player_bullet
+        self.side = None  # Event side of the shooter, set by whoever fires it
         
         # Bullet properties
         self.width = 0.2  # For collision detection
@@ -38,9 +49,20 @@ class Bullet:
             return distance < collision_distance
         return False
     
-    def draw(self, renderer):
-        """Draw the bullet"""
-        renderer.push_matrix()
-        renderer.translate(self.position.x, self.position.y, self.position.z)
-        renderer.draw_sphere(0.1, self.color, slices=8, stacks=8)
-        renderer.pop_matrix()
\ No newline at end of file
+    def draw(self, queue):
+        """Submit the bullet to the render queue"""
+        draw_bullets(queue, [self])
+
+
+def draw_bullet_batch(queue, positions):
+    """Submit one bullet sphere per row of an (N, 3) position array"""
+    if len(positions) == 0:
+        return
+    transforms = np.matmul(translation_matrices(positions), BULLET_SCALE)
+    queue.submit_batch('sphere', transforms, BULLET_COLOR)
+
+
+def draw_bullets(queue, bullets):
+    """Submit every bullet in a list to the render queue"""
+    positions = np.array([(b.position.x, b.position.y, b.position.z) for b in bullets], dtype=np.float32)
+    draw_bullet_batch(queue, positions)
\ No newline at end of file
@@ -1,6 +1,9 @@
 from entities.tank import Tank
 from utils.constants import *
+from utils.math3d import angle_to_target
+from utils.ballistics import default_firing_table
 import random
+import math
 
 class Enemy(Tank):
     def __init__(self, x, z):
@@ -17,18 +20,90 @@ class Enemy(Tank):
         # Random starting rotation
         self.rotation = random.uniform(0, 6.28)  # 0 to 2*pi
         
-    def update(self, target_pos):
-        """Update enemy with AI behavior"""
-        # Call parent update with target position for movement AI
-        super().update(target_pos=target_pos)
+        # Last AI decision, held between thinks when the AI is time-sliced
+        self.ai_command = (0.0, 0, 0)
+        self.ai_bucket = None
+        self.ticks_since_think = 0
+        
+    def update(self, target_pos, navigation=None, think=True, command=None):
+        """Update enemy with AI behavior
+        
+        With think=False the enemy repeats its last command instead of
+        re-planning, which is how the AI scheduler throttles distant enemies.
+        A command planned elsewhere, such as in a batch, counts as a think.
+        """
+        if command is not None:
+            self.ai_command = command
+            self.ticks_since_think = 0
+        elif think:
+            # Steer along the shared flow field when one is available
+            steer = navigation.direction_at(self.position) if navigation else None
+            self.ai_command = self.plan_ai_movement(target_pos, steer)
+            self.ticks_since_think = 0
+        else:
+            self.ticks_since_think += 1
+        
+        super().update(controls=self.ai_command)
         
         # Update shooting timer
         self.shoot_timer += 1
         
     def should_shoot(self):
         """Check if enemy should shoot based on timer"""
-        if self.shoot_timer >= self.shoot_interval and self.can_shoot:
+        return self.shoot_timer >= self.shoot_interval and self.can_shoot
+    
+    def shoot(self, target_pos=None, elevation=0.0, yaw=None):
+        """Shoot a bullet, restarting the timer only if one was fired
+        
+        An enemy that holds fire stays ready and tries again next tick.
+        """
+        bullet = super().shoot(target_pos, elevation, yaw)
+        if bullet:
             self.shoot_timer = 0
             self.shoot_interval = random.randint(60, 180)  # Reset with random interval
-            return True
-        return False
\ No newline at end of file
+        return bullet
+    
+    def try_shoot(self, target_pos, target_velocity=None, firing_table=None, obstacles=None):
+        """Fire at a target if the timer allows and the shot is worth taking"""
+        if not self.should_shoot():
+            return None
+        return fire_volley([self], target_pos, target_velocity, firing_table, obstacles)[0]
+
+
+def fire_volley(shooters, target_pos, target_velocity=None, firing_table=None, obstacles=None):
+    """Aim every shooter at once with the firing table and return their bullets
+    
+    Shooters whose gun is too far off the lead angle, whose estimated hit
+    probability is below MIN_HIT_PROBABILITY, or who have no line of sight
+    past the obstacles hold fire and yield None.
+    """
+    if not shooters:
+        return []
+    table = firing_table or default_firing_table()
+    
+    # Muzzles sit at the end of the barrel, pointed roughly at the target
+    origins = []
+    for shooter in shooters:
+        muzzle = shooter.muzzle_position(angle_to_target(shooter.position, target_pos))
+        origins.append((muzzle.x, muzzle.y, muzzle.z))
+    target = (target_pos.x, target_pos.y, target_pos.z)
+    velocity = None
+    if target_velocity is not None:
+        velocity = (target_velocity.x, target_velocity.y, target_velocity.z)
+    
+    yaw, elevation, _, hit_probability, _ = table.aim(origins, target, velocity)
+    if obstacles is not None:
+        visible = obstacles.line_of_sight(origins, [target] * len(origins))
+    else:
+        visible = [True] * len(shooters)
+    
+    bullets = []
+    for i, shooter in enumerate(shooters):
+        turret_angle = shooter.rotation + shooter.turret_rotation
+        off_target = abs((yaw[i] - turret_angle + math.pi) % (2 * math.pi) - math.pi)
+        if (off_target > AIM_TOLERANCE or hit_probability[i] < MIN_HIT_PROBABILITY or
+                not visible[i]):
+            bullets.append(None)
+            continue
+        bullets.append(shooter.shoot(elevation=float(elevation[i]), yaw=float(yaw[i])))
+    return bullets
\ No newline at end of file
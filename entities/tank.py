@@ -1,11 +1,17 @@
+import itertools
 import math
-import pygame
+import numpy as np
 from utils.math3d import Vector3, distance_3d, angle_to_target
+from utils.transforms import tank_part_matrices
 from utils.constants import *
 from entities.bullet import Bullet
 
+# Serial numbers identifying tanks across snapshots
+TANK_SERIALS = itertools.count()
+
 class Tank:
     def __init__(self, x, z, color, is_player=True):
+        self.serial = next(TANK_SERIALS)
         self.position = Vector3(x, 0.5, z)  # Y is height above ground
         self.velocity = Vector3()
         self.rotation = 0.0  # Hull rotation
@@ -26,17 +32,22 @@ class Tank:
         self.shoot_cooldown = 0
         self.max_shoot_cooldown = 30  # frames
         
+        # Optional ParticleSystem for muzzle flashes
+        self.particles = None
+        
         # Dimensions
         self.width = TANK_WIDTH
         self.length = TANK_LENGTH
         self.height = TANK_HEIGHT
         
-    def update(self, keys=None, target_pos=None):
+    def update(self, keys=None, target_pos=None, steer=None, controls=None):
         """Update tank state"""
         if self.is_player and keys:
             self.handle_player_input(keys)
+        elif controls:
+            self.apply_controls(*controls)
         elif target_pos:
-            self.handle_ai_movement(target_pos)
+            self.handle_ai_movement(target_pos, steer)
         
         # Apply movement
         self.position = self.position + self.velocity
@@ -67,6 +78,8 @@ class Tank:
     
     def handle_player_input(self, keys):
         """Handle player keyboard input"""
+        import pygame
+        
         # Movement
         if keys[pygame.K_w]:
             # Move forward
@@ -93,21 +106,34 @@ class Tank:
         self.rotation = self.rotation % (2 * math.pi)
         self.turret_rotation = self.turret_rotation % (2 * math.pi)
     
-    def handle_ai_movement(self, target_pos):
+    def handle_ai_movement(self, target_pos, steer=None):
         """Handle AI movement and turret aiming"""
         if not target_pos:
             return
+        self.apply_controls(*self.plan_ai_movement(target_pos, steer))
+    
+    def plan_ai_movement(self, target_pos, steer=None):
+        """Decide AI controls as a (throttle, turn, turret_turn) command
+        
+        steer is an optional (x, z) direction to drive along, such as a flow
+        field lookup; without it the tank heads straight for the target.
+        """
+        throttle = 0.0
+        turn = 0
+        turret_turn = 0
         
         # Calculate distance to target
         distance = distance_3d(self.position, target_pos)
         
         # If too close, back up
         if distance < 15.0:
-            backward = Vector3(-math.sin(self.rotation), 0, -math.cos(self.rotation))
-            self.velocity = self.velocity + backward * (self.speed * 0.5)
+            throttle = -0.5
         elif distance > 25.0:
             # Move toward target
-            target_angle = angle_to_target(self.position, target_pos)
+            if steer and (steer[0] or steer[1]):
+                target_angle = math.atan2(steer[0], steer[1])
+            else:
+                target_angle = angle_to_target(self.position, target_pos)
             angle_diff = target_angle - self.rotation
             
             # Normalize angle difference
@@ -118,18 +144,14 @@ class Tank:
             
             # Rotate toward target
             if abs(angle_diff) > 0.1:
-                if angle_diff > 0:
-                    self.rotation += self.rotation_speed
-                else:
-                    self.rotation -= self.rotation_speed
+                turn = 1 if angle_diff > 0 else -1
             else:
                 # Move forward when facing target
-                forward = Vector3(math.sin(self.rotation), 0, math.cos(self.rotation))
-                self.velocity = self.velocity + forward * self.speed
+                throttle = 1.0
         
-        # Aim turret at target
+        # Aim turret at target, allowing for this tick's hull turn
         turret_target_angle = angle_to_target(self.position, target_pos)
-        absolute_turret_angle = self.rotation + self.turret_rotation
+        absolute_turret_angle = self.rotation + turn * self.rotation_speed + self.turret_rotation
         turret_angle_diff = turret_target_angle - absolute_turret_angle
         
         # Normalize turret angle difference
@@ -140,34 +162,56 @@ class Tank:
         
         # Rotate turret toward target
         if abs(turret_angle_diff) > 0.05:
-            if turret_angle_diff > 0:
-                self.turret_rotation += self.turret_rotation_speed
-            else:
-                self.turret_rotation -= self.turret_rotation_speed
+            turret_turn = 1 if turret_angle_diff > 0 else -1
+        
+        return throttle, turn, turret_turn
+    
+    def apply_controls(self, throttle, turn, turret_turn):
+        """Apply a (throttle, turn, turret_turn) command for one tick"""
+        if throttle:
+            forward = Vector3(math.sin(self.rotation), 0, math.cos(self.rotation))
+            self.velocity = self.velocity + forward * (self.speed * throttle)
+        self.rotation += turn * self.rotation_speed
+        self.turret_rotation += turret_turn * self.turret_rotation_speed
+        
+        # Normalize rotations
+        self.rotation = self.rotation % (2 * math.pi)
+        self.turret_rotation = self.turret_rotation % (2 * math.pi)
     
-    def shoot(self, target_pos=None):
-        """Shoot a bullet"""
+    def muzzle_position(self, angle):
+        """Point the bullet leaves the barrel for an absolute turret angle"""
+        return Vector3(
+            self.position.x + math.sin(angle) * (self.length / 2 + 0.5),
+            self.position.y + 0.3,
+            self.position.z + math.cos(angle) * (self.length / 2 + 0.5)
+        )
+    
+    def shoot(self, target_pos=None, elevation=0.0, yaw=None):
+        """Shoot a bullet
+        
+        yaw overrides the absolute turret angle and elevation raises the gun,
+        both in radians; the defaults fire flat along the turret.
+        """
         if not self.can_shoot:
             return None
         
         # Calculate bullet starting position (end of turret)
-        absolute_turret_angle = self.rotation + self.turret_rotation
-        turret_end = Vector3(
-            self.position.x + math.sin(absolute_turret_angle) * (self.length / 2 + 0.5),
-            self.position.y + 0.3,
-            self.position.z + math.cos(absolute_turret_angle) * (self.length / 2 + 0.5)
-        )
+        absolute_turret_angle = self.rotation + self.turret_rotation if yaw is None else yaw
+        turret_end = self.muzzle_position(absolute_turret_angle)
         
         # Calculate bullet direction
         direction = Vector3(
-            math.sin(absolute_turret_angle),
-            0,
-            math.cos(absolute_turret_angle)
+            math.sin(absolute_turret_angle) * math.cos(elevation),
+            math.sin(elevation),
+            math.cos(absolute_turret_angle) * math.cos(elevation)
         )
         
         # Create bullet
         bullet = Bullet(turret_end, direction, self.is_player)
         
+        if self.particles is not None:
+            self.particles.emit_muzzle_flash(turret_end, direction)
+        
         # Set cooldown
         self.can_shoot = False
         self.shoot_cooldown = self.max_shoot_cooldown
@@ -186,40 +230,35 @@ class Tank:
             return distance < (self.width + getattr(other, 'width', 1.0)) / 2
         return False
     
-    def draw(self, renderer):
-        """Draw the tank using the renderer"""
-        renderer.push_matrix()
-        
-        # Move to tank position
-        renderer.translate(self.position.x, self.position.y, self.position.z)
-        
-        # Rotate to tank orientation
-        renderer.rotate(self.rotation, 0, 1, 0)
-        
-        # Draw hull
-        renderer.push_matrix()
-        renderer.scale(self.width, self.height * 0.6, self.length)
-        renderer.draw_cube(1.0, 1.0, 1.0, self.color)
-        renderer.pop_matrix()
-        
-        # Draw turret
-        renderer.push_matrix()
-        renderer.translate(0, self.height * 0.4, 0)
-        renderer.rotate(self.turret_rotation, 0, 1, 0)
-        
-        # Turret base
-        renderer.push_matrix()
-        renderer.scale(self.width * 0.8, self.height * 0.4, self.width * 0.8)
-        renderer.draw_cube(1.0, 1.0, 1.0, self.color)
-        renderer.pop_matrix()
-        
-        # Gun barrel
-        renderer.push_matrix()
-        renderer.translate(0, 0, self.length * 0.4)
-        renderer.scale(0.1, 0.1, self.length * 0.6)
-        darker_color = [c * 0.7 for c in self.color[:3]] + [self.color[3]]
-        renderer.draw_cube(1.0, 1.0, 1.0, darker_color)
-        renderer.pop_matrix()
-        
-        renderer.pop_matrix()  # turret
-        renderer.pop_matrix()  # tank
\ No newline at end of file
+    def draw(self, queue):
+        """Submit the tank's hull, turret and barrel to the render queue"""
+        draw_tanks(queue, [self])
+
+
+def gather_tank_state(tanks):
+    """Stack tank positions, rotations and colors into arrays"""
+    positions = np.array([(t.position.x, t.position.y, t.position.z) for t in tanks], dtype=np.float32)
+    rotations = np.array([t.rotation for t in tanks], dtype=np.float32)
+    turret_rotations = np.array([t.turret_rotation for t in tanks], dtype=np.float32)
+    colors = np.array([t.color for t in tanks], dtype=np.float32)
+    return positions, rotations, turret_rotations, colors
+
+
+def draw_tank_batch(queue, positions, rotations, turret_rotations, colors):
+    """Submit hull, turret and barrel instances for a stack of tank states"""
+    if len(positions) == 0:
+        return
+    hull, turret_base, barrel = tank_part_matrices(
+        positions, rotations, turret_rotations, TANK_WIDTH, TANK_HEIGHT, TANK_LENGTH
+    )
+    darker_colors = np.array(colors, dtype=np.float32)
+    darker_colors[:, :3] *= 0.7
+    
+    queue.submit_batch('cube', hull, colors)
+    queue.submit_batch('cube', turret_base, colors)
+    queue.submit_batch('cube', barrel, darker_colors)
+
+
+def draw_tanks(queue, tanks):
+    """Submit every tank in a list to the render queue"""
+    draw_tank_batch(queue, *gather_tank_state(tanks))
\ No newline at end of file
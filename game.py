@@ -1,46 +1,201 @@
-import pygame
-from pygame.locals import *
 import random
 import math
 import os
 import sys
+import time
+import threading
 
-# Try to import OpenGL, but handle gracefully if not available
-try:
-    from OpenGL.GL import *
-    OPENGL_AVAILABLE = True
-except ImportError:
-    OPENGL_AVAILABLE = False
-    print("OpenGL not available, falling back to 2D mode")
+# pygame and OpenGL are imported by load_pygame() and load_opengl() only
+# when a window is opened, so headless runs start without either
+pygame = None
+GL = None
+GLU = None
+OPENGL_AVAILABLE = None
 
-from entities.tank import Tank
-from entities.enemy import Enemy
-from entities.bullet import Bullet
+from entities.tank import Tank, draw_tank_batch
+from entities.enemy import Enemy, fire_volley
+from entities.bullet import Bullet, draw_bullet_batch
 from utils.constants import *
-from utils.math3d import Vector3, distance_3d
+from utils.particles import ParticleSystem
+from utils.navigation import NavigationGrid
+from utils.ai_scheduler import AIScheduler
+from utils.parallel_ai import ParallelAI
+from utils.ballistics import default_firing_table
+from utils.obstacles import load_map, generate_map
+from utils.collision import TankCollisions, armor_damage
+from utils.regions import WorldRegions
+from utils.controls import IDLE, KeyboardInput, execute_command
+from utils.bots import BotDriver
+from utils.occupancy import OccupancyGrid, PLAYER, ALLY, ENEMY
+from utils.events import EventBus, SHOT, HIT, KILL, SPAWN, DEATH
+from utils.telemetry import TelemetryRecorder
+from utils.heatmaps import Heatmaps
+from utils.startup import StartupReport, Warmup
+from utils.pipeline import SimulationThread, capture_snapshot
+from utils.math3d import Vector3, look_at_matrix, scale_matrix
 
 # Check if we're in a headless environment
 HEADLESS = os.environ.get('DISPLAY') is None
 
+# SDL video drivers that cannot create a GL context
+NO_GL_VIDEO_DRIVERS = ('dummy', 'offscreen')
+
+def load_pygame():
+    """Import pygame on first use"""
+    global pygame
+    if pygame is None:
+        import pygame
+    return pygame
+
+def load_opengl():
+    """Import OpenGL and the 3D renderer on first use; returns whether they loaded"""
+    global GL, GLU, Renderer, DynamicResolution, HUD, OPENGL_AVAILABLE
+    if OPENGL_AVAILABLE is None:
+        try:
+            from OpenGL import GL, GLU
+            from utils.renderer import Renderer
+            from utils.dynamic_resolution import DynamicResolution
+            from utils.hud import HUD
+            OPENGL_AVAILABLE = True
+        except ImportError:
+            OPENGL_AVAILABLE = False
+    return OPENGL_AVAILABLE
+
 class Game:
-    def __init__(self):
-        # Initialize Pygame
-        pygame.init()
+    def __init__(self, headless=False, startup=None):
+        """Create the game; headless=True skips the window and all rendering
+        
+        startup is a StartupReport to time the phases of start-up against.
+        """
+        self.headless = headless
+        self.startup = startup or StartupReport()
         
-        # Disable audio to avoid ALSA warnings in headless environments
-        pygame.mixer.quit()
+        # Caches built off the main thread while the window opens
+        self.warmup = Warmup()
+        self.warmup.submit('firing_table', default_firing_table)
         
         # Try to set up 3D mode, but fall back to 2D if it fails
         self.mode_3d = False
+        self.audio = None
+        
+        if not headless:
+            self.setup_display()
+            self.startup.mark('display')
+        elif HEADLESS_AUDIO or os.environ.get('SDL_AUDIODRIVER') == 'dummy':
+            # Headless runs can still drive the mixer, e.g. to soak-test audio
+            load_pygame()
+            self.setup_audio()
+        
+        self.running = True
+        
+        # Guards game state when the simulation runs on its own thread
+        self.state_lock = threading.RLock()
+        
+        # Game objects
+        self.particles = ParticleSystem()
+        self.player = Tank(0, 0, PLAYER_COLOR, is_player=True)
+        self.player.particles = self.particles
+        self.allies = []
+        self.enemies = []
+        self.bullets = []
+        
+        # Shots, hits, kills, spawns and deaths, handed on once per tick
+        self.events = EventBus(path=EVENT_LOG_FILE)
+        if self.audio:
+            self.events.subscribe(self.audio.on_events)
         
-        if OPENGL_AVAILABLE:
+        # Per-tick columns written to memory-mapped .npy files, when enabled
+        self.telemetry = TelemetryRecorder(TELEMETRY_DIR) if TELEMETRY_DIR else None
+        
+        # Live object counts and allocation tracking, when enabled
+        self.memory = None
+        
+        # Occupancy, shot, hit and death heatmaps, when enabled
+        self.heatmaps = None
+        if HEATMAP_FILE:
+            self.enable_heatmaps()
+        
+        # Where the player's commands come from, and any extra bot tanks
+        self.player_input = None if headless else KeyboardInput()
+        self.bot_driver = BotDriver(self)
+        
+        # Static cover, loaded with the map
+        self.obstacles = load_map(MAP_FILE) if MAP_FILE else generate_map()
+        
+        # Shared flow field steering every enemy toward the player
+        self.navigation = NavigationGrid()
+        self.obstacles.block_navigation(self.navigation)
+        self.parallel_ai = ParallelAI(AI_WORKERS) if AI_WORKERS > 0 else None
+        self.ai_scheduler = AIScheduler(planner=self.parallel_ai)
+        self.tank_collisions = TankCollisions()
+        self.regions = WorldRegions()
+        self.regions.populate()
+        
+        # Game state
+        self.score = 0
+        self.enemy_spawn_timer = 0
+        self.game_over = False
+        self.frame_ms = 0.0
+        
+        # Camera for 3D mode
+        if self.mode_3d:
+            self.camera_pos = Vector3(0, CAMERA_HEIGHT, CAMERA_DISTANCE)
+            self.camera_rotation = Vector3(0, 0, 0)
+            self.mouse_locked = True
+        
+        # Occupancy grid for bot observations
+        self.occupancy = OccupancyGrid()
+        
+        # Sprite and dirty-rectangle renderer for 2D mode
+        if not self.mode_3d and not headless:
+            from utils.renderer2d import Renderer2D
+            self.renderer_2d = Renderer2D(self.screen, self.obstacles)
+        self.startup.mark('world')
+        
+        mode = 'headless' if headless else '3D' if self.mode_3d else '2D'
+        print(f"Game initialized in {mode} mode")
+    
+    @property
+    def firing_table(self):
+        """Enemy firing table, waiting for the warm-up thread if it is still building"""
+        return self.warmup.result('firing_table')
+    
+    def setup_audio(self):
+        """Start sound effects, when there is an audio device to play them on"""
+        if AUDIO_ENABLED and not pygame.mixer.get_init():
+            try:
+                pygame.mixer.init(AUDIO_SAMPLE_RATE, -16, 2, AUDIO_BUFFER_SIZE)
+            except pygame.error:
+                pass
+        if AUDIO_ENABLED and pygame.mixer.get_init():
+            from utils.audio import Audio
+            self.audio = Audio()
+        else:
+            pygame.mixer.quit()
+    
+    def setup_display(self):
+        """Open the window, preferring 3D OpenGL and falling back to 2D"""
+        # Initialize Pygame
+        load_pygame()
+        pygame.mixer.pre_init(AUDIO_SAMPLE_RATE, -16, 2, AUDIO_BUFFER_SIZE)
+        pygame.init()
+        self.setup_audio()
+        
+        # Skip the GL attempt outright where it cannot work
+        driver = pygame.display.get_driver()
+        if driver in NO_GL_VIDEO_DRIVERS:
+            print(f"No OpenGL on the {driver} video driver, using 2D mode")
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        elif load_opengl():
+            from utils.render_queue import build_meshes
+            self.warmup.submit('meshes', build_meshes)
             try:
                 print("Attempting to initialize 3D OpenGL mode...")
                 self.screen_size = (SCREEN_WIDTH, SCREEN_HEIGHT)
-                pygame.display.set_mode(self.screen_size, DOUBLEBUF | OPENGL)
+                pygame.display.set_mode(self.screen_size, pygame.DOUBLEBUF | pygame.OPENGL)
                 
                 # Test if OpenGL actually works
-                glClear(GL_COLOR_BUFFER_BIT)
+                GL.glClear(GL.GL_COLOR_BUFFER_BIT)
                 
                 print("3D OpenGL mode successful!")
                 self.mode_3d = True
@@ -65,100 +220,48 @@ class Game:
         pygame.display.set_caption("War Thunder Offline")
         
         self.clock = pygame.time.Clock()
-        self.running = True
-        
-        # Game objects
-        self.player = Tank(0, 0, PLAYER_COLOR, is_player=True)
-        self.enemies = []
-        self.bullets = []
-        
-        # Game state
-        self.score = 0
-        self.enemy_spawn_timer = 0
-        self.game_over = False
-        
-        # Camera for 3D mode
-        if self.mode_3d:
-            self.camera_pos = Vector3(0, CAMERA_HEIGHT, CAMERA_DISTANCE)
-            self.camera_rotation = Vector3(0, 0, 0)
-            self.mouse_locked = True
-        
-        # Fonts for 2D mode
-        if not self.mode_3d:
-            self.font = pygame.font.Font(None, 36)
-            self.big_font = pygame.font.Font(None, 72)
-        
-        print(f"Game initialized in {'3D' if self.mode_3d else '2D'} mode")
     
     def setup_opengl(self):
         """Initialize OpenGL settings"""
-        glEnable(GL_DEPTH_TEST)
-        glEnable(GL_LIGHTING)
-        glEnable(GL_LIGHT0)
-        glEnable(GL_COLOR_MATERIAL)
-        glColorMaterial(GL_FRONT_AND_BACK, GL_AMBIENT_AND_DIFFUSE)
-        
-        # Set up lighting
-        glLightfv(GL_LIGHT0, GL_AMBIENT, AMBIENT_LIGHT)
-        glLightfv(GL_LIGHT0, GL_DIFFUSE, DIFFUSE_LIGHT)
-        glLightfv(GL_LIGHT0, GL_POSITION, LIGHT_POSITION)
-        
-        # Set clear color (sky)
-        glClearColor(*SKY_COLOR)
+        self.renderer = Renderer(self.warmup.result('meshes'))
+        self.render_queue = self.renderer.queue
         
         # Set up perspective
         self.setup_perspective()
+        
+        # Offscreen target for dynamic resolution scaling
+        self.dynamic_resolution = None
+        if DYNAMIC_RESOLUTION:
+            try:
+                self.dynamic_resolution = DynamicResolution(SCREEN_WIDTH, SCREEN_HEIGHT)
+            except Exception as e:
+                print(f"Dynamic resolution unavailable ({e}), rendering at full size")
+        
+        # Text and bars over the 3D view
+        self.hud = HUD(SCREEN_WIDTH, SCREEN_HEIGHT)
     
     def setup_perspective(self):
         """Set up 3D perspective projection"""
-        glMatrixMode(GL_PROJECTION)
-        glLoadIdentity()
+        GL.glMatrixMode(GL.GL_PROJECTION)
+        GL.glLoadIdentity()
         
         # Set up perspective projection
-        from OpenGL.GLU import gluPerspective
-        gluPerspective(60, SCREEN_WIDTH / SCREEN_HEIGHT, 0.1, 1000.0)
+        GLU.gluPerspective(60, SCREEN_WIDTH / SCREEN_HEIGHT, 0.1, 1000.0)
         
-        glMatrixMode(GL_MODELVIEW)
-        glLoadIdentity()
+        GL.glMatrixMode(GL.GL_MODELVIEW)
+        GL.glLoadIdentity()
     
     def handle_events(self):
         """Handle input events"""
         for event in pygame.event.get():
-            if event.type == QUIT:
+            if event.type == pygame.QUIT:
                 self.running = False
-            elif event.type == KEYDOWN:
-                if event.key == K_ESCAPE:
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
                     self.running = False
-                elif event.key == K_r and self.game_over:
+                elif event.key == pygame.K_r and self.game_over:
                     self.restart_game()
         
-        # Handle continuous key presses
-        keys = pygame.key.get_pressed()
-        
-        if not self.game_over:
-            # Movement
-            if keys[K_w]:
-                self.player.move_forward()
-            if keys[K_s]:
-                self.player.move_backward()
-            if keys[K_a]:
-                self.player.rotate_left()
-            if keys[K_d]:
-                self.player.rotate_right()
-            
-            # Turret control (only in 3D mode)
-            if self.mode_3d:
-                if keys[K_LEFT]:
-                    self.player.rotate_turret_left()
-                if keys[K_RIGHT]:
-                    self.player.rotate_turret_right()
-            
-            # Shooting
-            if keys[K_SPACE]:
-                bullet = self.player.shoot()
-                if bullet:
-                    self.bullets.append(bullet)
-        
         # Mouse look (3D mode only)
         if self.mode_3d and self.mouse_locked and not self.game_over:
             mouse_rel = pygame.mouse.get_rel()
@@ -171,27 +274,66 @@ class Game:
     def update(self):
         """Update game logic"""
         if self.game_over:
+            self.particles.update()
+            if self.audio:
+                self.audio.update(self.player.position, self.player.rotation)
             return
+        tick_start = time.perf_counter()
+        
+        # Drive the player and any bots from their input sources
+        command = self.player_input.command(self.player, self) if self.player_input else IDLE
+        bullet = execute_command(self.player, command)
+        if bullet:
+            bullet.side = PLAYER
+            self.bullets.append(bullet)
+            self.events.emit_at(SHOT, bullet.position, PLAYER)
+        self.bot_driver.update()
         
-        # Update player
-        self.player.update()
+        # Wake enemies near the player and park the ones far away
+        self.regions.update(self.enemies, self.player.position, self.make_enemy)
         
         # Update enemies
-        for enemy in self.enemies[:]:
-            enemy.update(self.player.position)
-            bullet = enemy.try_shoot(self.player.position)
+        ai_start = time.perf_counter()
+        self.navigation.update(self.player.position)
+        self.ai_scheduler.update(self.enemies, self.player.position, self.navigation)
+        
+        # Push overlapping tanks apart and apply ramming damage
+        collision_start = time.perf_counter()
+        self.tank_collisions.update([self.player] + self.allies + self.enemies)
+        for first, second in self.tank_collisions.impacts:
+            self.particles.emit_hit((first.position + second.position) * 0.5)
+        collision_end = time.perf_counter()
+        
+        # Aim all enemies that are ready to fire in one batch
+        shooters = [enemy for enemy in self.enemies if enemy.should_shoot()]
+        for bullet in fire_volley(shooters, self.player.position, self.player.velocity,
+                                  self.firing_table, self.obstacles):
             if bullet:
+                bullet.side = ENEMY
                 self.bullets.append(bullet)
-            
+                self.events.emit_at(SHOT, bullet.position, ENEMY)
+        
+        for enemy in self.enemies[:]:
             # Remove dead enemies
             if enemy.health <= 0:
+                self.particles.emit_explosion(enemy.position)
                 self.enemies.remove(enemy)
                 self.score += 100
+                self.events.emit_at(KILL, enemy.position, target=ENEMY, value=100)
         
-        # Update bullets
-        for bullet in self.bullets[:]:
+        # Update bullets, then test this tick's path of every bullet against
+        # the obstacles in one batched query
+        bullet_start = time.perf_counter()
+        starts = [(b.position.x, b.position.y, b.position.z) for b in self.bullets]
+        for bullet in self.bullets:
             bullet.update()
-            
+        ends = [(b.position.x, b.position.y, b.position.z) for b in self.bullets]
+        blocked, hit_t, _ = self.obstacles.segment_query(starts, ends)
+        tank_hits = self.tank_collisions.bullet_hits(
+            starts, ends, [b.is_player_bullet for b in self.bullets],
+            [self.player] + self.allies + self.enemies)
+        
+        for i, bullet in enumerate(self.bullets[:]):
             # Remove bullets that are out of bounds or lifetime expired
             if (bullet.position.y < -5 or 
                 abs(bullet.position.x) > WORLD_SIZE or 
@@ -200,21 +342,26 @@ class Game:
                 self.bullets.remove(bullet)
                 continue
             
-            # Check collisions with tanks
-            if bullet.is_player_bullet:
-                # Check collision with enemies
-                for enemy in self.enemies[:]:
-                    if distance_3d(bullet.position, enemy.position) < 2.0:
-                        enemy.take_damage(BULLET_DAMAGE)
-                        if bullet in self.bullets:
-                            self.bullets.remove(bullet)
-                        break
-            else:
-                # Check collision with player
-                if distance_3d(bullet.position, self.player.position) < 2.0:
-                    self.player.take_damage(BULLET_DAMAGE)
-                    if bullet in self.bullets:
-                        self.bullets.remove(bullet)
+            # Stop bullets at whichever they reach first: an obstacle or a tank
+            tank_hit = tank_hits.get(i)
+            if blocked[i] and (tank_hit is None or hit_t[i] <= tank_hit[0]):
+                start = Vector3(*starts[i])
+                self.particles.emit_hit(start + (bullet.position - start) * float(hit_t[i]))
+                self.bullets.remove(bullet)
+                continue
+            
+            if tank_hit is not None:
+                t, tank, part, face = tank_hit
+                damage = armor_damage(BULLET_DAMAGE, part, face)
+                tank.take_damage(damage)
+                start = Vector3(*starts[i])
+                hit_point = start + (bullet.position - start) * t
+                self.particles.emit_hit(hit_point)
+                self.bullets.remove(bullet)
+                self.events.emit_at(HIT, hit_point, bullet.side, self.side_of(tank), damage)
+        bullet_end = time.perf_counter()
+        
+        self.particles.update()
         
         # Spawn enemies
         self.enemy_spawn_timer += 1
@@ -224,21 +371,50 @@ class Game:
         
         # Check if player is dead
         if self.player.health <= 0:
+            self.particles.emit_explosion(self.player.position)
             self.game_over = True
-        
-        # Update camera position (3D mode)
-        if self.mode_3d:
-            self.update_camera()
+            self.events.emit_at(DEATH, self.player.position, target=PLAYER)
+        
+        self.events.end_tick()
+        if self.audio:
+            speed = self.player.velocity.length() * (1 - FRICTION) / TANK_SPEED
+            self.audio.update(self.player.position, self.player.rotation,
+                              AUDIO_ENGINE_IDLE + (1 - AUDIO_ENGINE_IDLE) * min(1.0, speed))
+        
+        if self.telemetry:
+            self.telemetry.record(self, ((collision_start - ai_start) * 1000,
+                                         (collision_end - collision_start) * 1000,
+                                         (bullet_end - bullet_start) * 1000,
+                                         (time.perf_counter() - tick_start) * 1000))
+        if self.heatmaps:
+            self.heatmaps.record_tanks([self.player] + self.allies + self.enemies)
+        if self.memory:
+            self.memory.update(self)
     
-    def update_camera(self):
+    def enable_heatmaps(self):
+        """Start accumulating heatmaps from tank positions and events"""
+        self.heatmaps = Heatmaps()
+        self.events.subscribe(self.heatmaps.record_events)
+        return self.heatmaps
+    
+    def side_of(self, tank):
+        """Event id for a tank: PLAYER, ALLY or ENEMY"""
+        if tank is self.player:
+            return PLAYER
+        return ALLY if tank.is_player else ENEMY
+    
+    def update_camera(self, position=None, rotation=None):
         """Update camera position to follow player"""
+        if position is None:
+            position, rotation = self.player.position, self.player.rotation
+        
         # Camera follows player with offset
         offset = Vector3(
-            math.sin(self.player.rotation) * CAMERA_DISTANCE,
+            math.sin(rotation) * CAMERA_DISTANCE,
             CAMERA_HEIGHT,
-            math.cos(self.player.rotation) * CAMERA_DISTANCE
+            math.cos(rotation) * CAMERA_DISTANCE
         )
-        self.camera_pos = self.player.position + offset
+        self.camera_pos = position + offset
     
     def spawn_enemy(self):
         """Spawn a new enemy at a random position"""
@@ -246,220 +422,160 @@ class Game:
         distance = random.uniform(30, 60)
         x = self.player.position.x + math.cos(angle) * distance
         z = self.player.position.z + math.sin(angle) * distance
-        
+        self.enemies.append(self.make_enemy(x, z))
+        self.events.emit(SPAWN, x, 0.5, z, target=ENEMY, value=distance)
+    
+    def make_enemy(self, x, z):
+        """Create an enemy wired up to the game's shared systems"""
         enemy = Enemy(x, z)
-        self.enemies.append(enemy)
+        enemy.particles = self.particles
+        return enemy
     
-    def render(self):
-        """Render the game"""
+    def render(self, snapshot=None):
+        """Render the game from a snapshot of its state (the live state by default)"""
+        if snapshot is None:
+            snapshot = capture_snapshot(self)
         if self.mode_3d:
-            self.render_3d()
+            self.render_3d(snapshot)
         else:
-            self.render_2d()
+            self.render_2d(snapshot)
     
-    def render_3d(self):
+    def render_3d(self, snapshot):
         """Render in 3D OpenGL mode"""
-        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-        glLoadIdentity()
+        if self.dynamic_resolution:
+            self.dynamic_resolution.begin()
+        self.renderer.clear_screen()
         
-        # Set up camera
-        from OpenGL.GLU import gluLookAt
+        # Set up camera behind the (possibly interpolated) player
+        player_pos = snapshot.tank_positions[0]
+        self.update_camera(Vector3(*player_pos.tolist()), float(snapshot.tank_rotations[0]))
         look_target = Vector3(
             self.camera_pos.x + math.sin(self.camera_rotation.y),
             self.camera_pos.y + math.sin(self.camera_rotation.x),
             self.camera_pos.z + math.cos(self.camera_rotation.y)
         )
+        view = look_at_matrix(self.camera_pos, look_target, Vector3(0, 1, 0))
         
-        gluLookAt(
-            self.camera_pos.x, self.camera_pos.y, self.camera_pos.z,
-            look_target.x, look_target.y, look_target.z,
-            0, 1, 0
-        )
-        
-        # Render terrain
+        # Queue terrain, tanks and bullets, then draw them sorted by state
         self.render_terrain()
+        self.obstacles.draw(self.render_queue)
         
-        # Render player
-        self.render_tank_3d(self.player)
+        draw_tank_batch(self.render_queue, snapshot.tank_positions, snapshot.tank_rotations,
+                        snapshot.turret_rotations, snapshot.tank_colors)
+        draw_bullet_batch(self.render_queue, snapshot.bullet_positions)
         
-        # Render enemies
-        for enemy in self.enemies:
-            self.render_tank_3d(enemy)
+        self.render_queue.flush(view)
+        self.renderer.draw_particles(snapshot.particle_positions, snapshot.particle_colors)
         
-        # Render bullets
-        for bullet in self.bullets:
-            self.render_bullet_3d(bullet)
-        
-        pygame.display.flip()
-    
-    def render_2d(self):
-        """Render in 2D software mode"""
-        self.screen.fill(SKY_COLOR)
-        
-        # Simple 2D top-down view
-        center_x, center_y = SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2
-        
-        # Calculate screen positions relative to player
-        def world_to_screen(world_pos):
-            rel_x = world_pos.x - self.player.position.x
-            rel_z = world_pos.z - self.player.position.z
-            screen_x = center_x + rel_x * 10  # Scale factor
-            screen_y = center_y + rel_z * 10
-            return int(screen_x), int(screen_y)
-        
-        # Draw player (always in center)
-        pygame.draw.circle(self.screen, PLAYER_COLOR, (center_x, center_y), 15)
-        
-        # Draw enemies
-        for enemy in self.enemies:
-            screen_pos = world_to_screen(enemy.position)
-            if 0 <= screen_pos[0] < SCREEN_WIDTH and 0 <= screen_pos[1] < SCREEN_HEIGHT:
-                pygame.draw.circle(self.screen, ENEMY_COLOR, screen_pos, 12)
-        
-        # Draw bullets
-        for bullet in self.bullets:
-            screen_pos = world_to_screen(bullet.position)
-            if 0 <= screen_pos[0] < SCREEN_WIDTH and 0 <= screen_pos[1] < SCREEN_HEIGHT:
-                color = BULLET_COLOR if bullet.is_player_bullet else RED
-                pygame.draw.circle(self.screen, color, screen_pos, 3)
+        if self.dynamic_resolution:
+            self.dynamic_resolution.end()
         
-        # Draw UI
-        self.render_ui_2d()
+        # HUD at full window resolution, after any upscale
+        self.hud.update(max(0.0, snapshot.player_health / snapshot.player_max_health), snapshot.score,
+                        int((~snapshot.tank_is_player).sum()), snapshot.game_over, self.hud_stats())
+        self.hud.draw()
         
         pygame.display.flip()
     
-    def render_ui_2d(self):
-        """Render 2D UI elements"""
-        # Health bar
-        health_width = 200
-        health_height = 20
-        health_x = 10
-        health_y = 10
-        
-        # Background
-        pygame.draw.rect(self.screen, RED, (health_x, health_y, health_width, health_height))
-        
-        # Health
-        health_ratio = max(0, self.player.health / self.player.max_health)
-        pygame.draw.rect(self.screen, GREEN, (health_x, health_y, health_width * health_ratio, health_height))
-        
-        # Score
-        score_text = self.font.render(f"Score: {self.score}", True, WHITE)
-        self.screen.blit(score_text, (10, 40))
-        
-        # Enemy count
-        enemy_text = self.font.render(f"Enemies: {len(self.enemies)}", True, WHITE)
-        self.screen.blit(enemy_text, (10, 70))
-        
-        # Game over screen
-        if self.game_over:
-            game_over_text = self.big_font.render("GAME OVER", True, RED)
-            restart_text = self.font.render("Press R to restart", True, WHITE)
-            
-            text_rect = game_over_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2))
-            restart_rect = restart_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 60))
-            
-            self.screen.blit(game_over_text, text_rect)
-            self.screen.blit(restart_text, restart_rect)
-    
-    def render_terrain(self):
-        """Render 3D terrain"""
-        glColor3f(0.4, 0.6, 0.2)  # Green ground color
-        glBegin(GL_QUADS)
-        size = TERRAIN_SIZE
-        glVertex3f(-size, 0, -size)
-        glVertex3f(size, 0, -size)
-        glVertex3f(size, 0, size)
-        glVertex3f(-size, 0, size)
-        glEnd()
+    def hud_stats(self):
+        """Profiling figures shown on the 3D HUD"""
+        ai = self.ai_scheduler.stats()
+        stats = {
+            'frame ms': self.frame_ms,
+            'AI ms': ai['ai_ms'],
+            'thinks': ai['thinks'],
+            'deferred': ai['deferred'],
+            'draw calls': self.render_queue.draw_calls,
+        }
+        if self.dynamic_resolution:
+            stats['scale'] = self.dynamic_resolution.scale
+            stats['GPU ms'] = self.dynamic_resolution.gpu_frame_ms
+        return stats
     
-    def render_tank_3d(self, tank):
-        """Render a 3D tank"""
-        glPushMatrix()
-        
-        # Move to tank position
-        glTranslatef(tank.position.x, tank.position.y, tank.position.z)
-        glRotatef(math.degrees(tank.rotation), 0, 1, 0)
-        
-        # Set color
-        glColor3f(*[c/255 for c in tank.color])
-        
-        # Draw tank hull (simple box)
-        glPushMatrix()
-        glScalef(TANK_LENGTH, TANK_HEIGHT, TANK_WIDTH)
-        self.draw_cube()
-        glPopMatrix()
-        
-        # Draw turret
-        glPushMatrix()
-        glTranslatef(0, TANK_HEIGHT * 0.7, 0)
-        glRotatef(math.degrees(tank.turret_rotation), 0, 1, 0)
-        glScalef(TANK_LENGTH * 0.8, TANK_HEIGHT * 0.6, TANK_WIDTH * 0.8)
-        self.draw_cube()
-        glPopMatrix()
-        
-        glPopMatrix()
+    def render_2d(self, snapshot):
+        """Render in 2D software mode"""
+        self.renderer_2d.draw_snapshot(snapshot)
     
-    def render_bullet_3d(self, bullet):
-        """Render a 3D bullet"""
-        glPushMatrix()
-        glTranslatef(bullet.position.x, bullet.position.y, bullet.position.z)
-        glColor3f(*[c/255 for c in bullet.color])
-        glScalef(0.2, 0.2, 0.2)
-        self.draw_cube()
-        glPopMatrix()
+    def observe(self, out=None):
+        """Occupancy grid of the current state around the player, for bots"""
+        return self.occupancy.rasterize_snapshot(capture_snapshot(self, particles=False), out)
     
-    def draw_cube(self):
-        """Draw a simple cube"""
-        glBegin(GL_QUADS)
-        
-        # Front face
-        glVertex3f(-0.5, -0.5, 0.5)
-        glVertex3f(0.5, -0.5, 0.5)
-        glVertex3f(0.5, 0.5, 0.5)
-        glVertex3f(-0.5, 0.5, 0.5)
-        
-        # Back face
-        glVertex3f(-0.5, -0.5, -0.5)
-        glVertex3f(-0.5, 0.5, -0.5)
-        glVertex3f(0.5, 0.5, -0.5)
-        glVertex3f(0.5, -0.5, -0.5)
-        
-        # Top face
-        glVertex3f(-0.5, 0.5, -0.5)
-        glVertex3f(-0.5, 0.5, 0.5)
-        glVertex3f(0.5, 0.5, 0.5)
-        glVertex3f(0.5, 0.5, -0.5)
-        
-        # Bottom face
-        glVertex3f(-0.5, -0.5, -0.5)
-        glVertex3f(0.5, -0.5, -0.5)
-        glVertex3f(0.5, -0.5, 0.5)
-        glVertex3f(-0.5, -0.5, 0.5)
-        
-        # Right face
-        glVertex3f(0.5, -0.5, -0.5)
-        glVertex3f(0.5, 0.5, -0.5)
-        glVertex3f(0.5, 0.5, 0.5)
-        glVertex3f(0.5, -0.5, 0.5)
-        
-        # Left face
-        glVertex3f(-0.5, -0.5, -0.5)
-        glVertex3f(-0.5, -0.5, 0.5)
-        glVertex3f(-0.5, 0.5, 0.5)
-        glVertex3f(-0.5, 0.5, -0.5)
-        
-        glEnd()
+    def render_terrain(self):
+        """Queue the 3D terrain"""
+        size = TERRAIN_SIZE * 2
+        self.render_queue.submit('terrain', scale_matrix(size, 1, size), (0.4, 0.6, 0.2, 1.0))
     
     def restart_game(self):
         """Restart the game"""
+        self.particles.clear()
         self.player = Tank(0, 0, PLAYER_COLOR, is_player=True)
+        self.player.particles = self.particles
         self.enemies = []
         self.bullets = []
+        self.bot_driver.respawn()
+        self.regions = WorldRegions()
+        self.regions.populate()
         self.score = 0
         self.enemy_spawn_timer = 0
         self.game_over = False
     
+    def record_frame_time(self, frame_start, render_start):
+        """Time the frame's work, excluding the limiter sleep
+        
+        The whole frame is shown on the HUD, but only the time from
+        render_start is fed to dynamic resolution: rendering fewer pixels
+        cannot speed up the simulation tick.
+        """
+        now = time.perf_counter()
+        self.frame_ms = (now - frame_start) * 1000
+        if self.mode_3d and self.dynamic_resolution:
+            self.dynamic_resolution.record_frame((now - render_start) * 1000)
+    
+    def finish_startup(self, name):
+        """Close the start-up report once the first frame or tick is done"""
+        if not self.startup.finished:
+            self.startup.add_background(self.warmup.durations)
+            self.startup.finish(name)
+    
+    def run_pipelined(self):
+        """Simulate on a fixed-tick thread while this thread renders interpolated snapshots"""
+        simulation = SimulationThread(self, SIMULATION_TICK_RATE)
+        simulation.start()
+        try:
+            while self.running:
+                frame_start = time.perf_counter()
+                with self.state_lock:
+                    self.handle_events()
+                render_start = time.perf_counter()
+                self.render(simulation.snapshot_at(frame_start))
+                self.record_frame_time(frame_start, render_start)
+                self.finish_startup('first frame')
+                self.clock.tick(RENDER_FPS)
+        finally:
+            simulation.stop()
+    
+    def run_headless(self, ticks):
+        """Simulate a number of ticks as fast as possible, restarting on game over
+        
+        Returns (ticks, seconds) for throughput reporting.
+        """
+        start = time.perf_counter()
+        try:
+            for _ in range(ticks):
+                if self.game_over:
+                    self.restart_game()
+                self.update()
+                self.finish_startup('first tick')
+        finally:
+            self.close_workers()
+        return ticks, time.perf_counter() - start
+    
+    def close_workers(self):
+        """Stop the AI worker processes and free their shared memory"""
+        if self.parallel_ai:
+            self.parallel_ai.close()
+            self.parallel_ai = self.ai_scheduler.planner = None
+    
     def run(self):
         """Main game loop"""
         print("Starting game loop...")
@@ -470,10 +586,19 @@ class Game:
         print("- Escape: Quit")
         print("- R: Restart (when game over)")
         
-        while self.running:
-            self.handle_events()
-            self.update()
-            self.render()
-            self.clock.tick(FPS)
-        
+        try:
+            if PIPELINED_SIMULATION:
+                self.run_pipelined()
+            else:
+                while self.running:
+                    frame_start = time.perf_counter()
+                    self.handle_events()
+                    self.update()
+                    render_start = time.perf_counter()
+                    self.render()
+                    self.record_frame_time(frame_start, render_start)
+                    self.finish_startup('first frame')
+                    self.clock.tick(FPS)
+        finally:
+            self.close_workers()
         print("Game ended.")
\ No newline at end of file
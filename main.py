@@ -4,21 +4,109 @@ War Thunder Offline - A simplified 2D tank combat game
 Inspired by the popular vehicular combat game War Thunder
 """
 
-import pygame
+import time
+STARTED = time.perf_counter()
+
+import argparse
+import math
 import sys
 from game import Game
+from utils.bots import make_policy
+from utils.constants import HEATMAP_FILE
+from utils.controls import CommandRecorder
+from utils.memory import MemoryMonitor
+from utils.startup import StartupReport
+from utils.telemetry import TelemetryRecorder
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="War Thunder Offline")
+    parser.add_argument('--headless', action='store_true',
+                        help="simulate without a window, e.g. for performance runs")
+    parser.add_argument('--ticks', type=int, default=3600,
+                        help="ticks to simulate in headless mode")
+    parser.add_argument('--player', choices=['keyboard', 'chase', 'wander', 'script'],
+                        default=None, help="input source for the player tank")
+    parser.add_argument('--script', help="command script to play back with --player script")
+    parser.add_argument('--record', help="record the player's commands to this script file")
+    parser.add_argument('--bots', type=int, default=0, help="extra allied tanks driven by bots")
+    parser.add_argument('--bot-policy', choices=['chase', 'wander', 'script'], default='chase')
+    parser.add_argument('--seed', type=int, default=0, help="seed for bot decisions")
+    parser.add_argument('--event-log', help="log gameplay events to this file (.bin for raw records)")
+    parser.add_argument('--telemetry', metavar='DIR', help="record per-tick telemetry into this directory")
+    parser.add_argument('--heatmaps', metavar='PATH', default=HEATMAP_FILE,
+                        help="merge this run's heatmaps into this .npz file")
+    parser.add_argument('--heatmap-images', metavar='DIR',
+                        help="export the merged heatmaps, or this run's without --heatmaps, "
+                             "as PNG images into this directory")
+    parser.add_argument('--memory-report', action='store_true',
+                        help="count live entities and their memory, and print a report at the end")
+    parser.add_argument('--memory-snapshots', type=int, default=0, metavar='TICKS',
+                        help="diff tracemalloc snapshots by source line every TICKS ticks")
+    parser.add_argument('--memory-assert', type=int, default=0, metavar='TICKS',
+                        help="fail if memory keeps growing from one TICKS window to the next")
+    parser.add_argument('--startup-report', action='store_true',
+                        help="print how long each start-up phase took")
+    args = parser.parse_args()
+    if args.script is None and (args.player == 'script' or (args.bots and args.bot_policy == 'script')):
+        parser.error("a script policy needs --script")
+    return args
+
+def setup_inputs(game, args):
+    """Attach the requested input sources to the player and bot tanks"""
+    if args.player is None:
+        args.player = 'chase' if args.headless else 'keyboard'
+    if args.player != 'keyboard':
+        game.player_input = make_policy(args.player, args.seed, args.script)
+    if args.record:
+        game.player_input = CommandRecorder(game.player_input, args.record)
+
+    # Bots start in a ring around the player
+    for i in range(args.bots):
+        angle = 2 * math.pi * i / args.bots
+        game.bot_driver.add_bot(math.cos(angle) * 10, math.sin(angle) * 10,
+                                make_policy(args.bot_policy, args.seed + i + 1, args.script))
 
 def main():
-    # Initialize Pygame
-    pygame.init()
-    
+    args = parse_args()
+    startup = StartupReport(STARTED, echo=args.startup_report)
+    startup.mark('imports')
+
     # Create and run the game
-    game = Game()
-    game.run()
-    
-    # Quit
-    pygame.quit()
+    game = Game(headless=args.headless, startup=startup)
+    setup_inputs(game, args)
+    if args.event_log:
+        game.events.log_to(args.event_log)
+    if args.telemetry:
+        game.telemetry = TelemetryRecorder(args.telemetry)
+    if args.memory_report or args.memory_snapshots or args.memory_assert:
+        game.memory = MemoryMonitor(snapshot_interval=args.memory_snapshots,
+                                    growth_ticks=args.memory_assert)
+    if (args.heatmaps or args.heatmap_images) and not game.heatmaps:
+        game.enable_heatmaps()
+
+    if args.headless:
+        ticks, seconds = game.run_headless(args.ticks)
+        print(f"Simulated {ticks} ticks in {seconds:.2f}s ({ticks / seconds:.0f} ticks/s)")
+    else:
+        game.run()
+
+    if game.memory:
+        game.memory.sample(game)
+        print(game.memory.report())
+    if isinstance(game.player_input, CommandRecorder):
+        game.player_input.close()
+    game.events.close()
+    if game.telemetry:
+        game.telemetry.close()
+    if game.heatmaps:
+        totals = game.heatmaps.accumulate_into(args.heatmaps) if args.heatmaps else game.heatmaps
+        if args.heatmap_images:
+            totals.export_images(args.heatmap_images)
+
+    # Quit; headless runs never loaded pygame
+    if 'pygame' in sys.modules:
+        sys.modules['pygame'].quit()
     sys.exit()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -7,7 +7,23 @@ A working demonstration of the game mechanics in text format
 import random
 import math
 import time
-import os
+import sys
+from collections import deque
+from utils.events import EventBus, iter_events, SHOT, HIT, KILL, SPAWN, DEATH
+
+# The vectorized occupancy grid needs NumPy; the demo itself needs nothing
+try:
+    from utils.occupancy import OccupancyGrid, grid_to_ascii, PLAYER, ENEMY, PLAYER_BULLET, ENEMY_BULLET
+    OCCUPANCY_AVAILABLE = True
+except ImportError:
+    OCCUPANCY_AVAILABLE = False
+    PLAYER, ENEMY, PLAYER_BULLET, ENEMY_BULLET = 0, 2, 3, 4
+
+# Event id of the player; enemies use their number
+PLAYER_ID = 0
+
+# Map symbols, drawn lowest priority first so bullets end up on top
+SYMBOLS = [(PLAYER, 'P'), (ENEMY, 'E'), (ENEMY_BULLET, '!'), (PLAYER_BULLET, '*')]
 
 class Vector3:
     def __init__(self, x=0.0, y=0.0, z=0.0):
@@ -142,6 +158,61 @@ class Bullet:
         self.lifetime -= 1
         return self.lifetime <= 0  # Return True if bullet should be removed
 
+class TerminalView:
+    """Draws frames of text to an ANSI terminal, rewriting only changed cells
+    
+    Each frame is diffed against the previous one; changed runs of cells
+    are sent as cursor moves plus text in a single write, so nothing is
+    cleared and the view does not flicker.
+    """
+    # Unchanged gaps shorter than a cursor move are rewritten instead
+    MIN_GAP = 8
+    
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.previous = None
+        
+    def draw(self, lines):
+        parts = []
+        if self.previous is None:
+            # First frame: hide the cursor and start from a blank screen
+            parts.append("\x1b[?25l\x1b[2J")
+            self.previous = []
+        
+        for row, line in enumerate(lines):
+            old = self.previous[row] if row < len(self.previous) else ""
+            width = max(len(line), len(old))
+            line = line.ljust(width)
+            old = old.ljust(width)
+            col = 0
+            while col < width:
+                if line[col] == old[col]:
+                    col += 1
+                    continue
+                start = col
+                end = col
+                while col < width and col - end <= self.MIN_GAP:
+                    if line[col] != old[col]:
+                        end = col + 1
+                    col += 1
+                parts.append(f"\x1b[{row + 1};{start + 1}H{line[start:end]}")
+                col = end
+        
+        # Blank out rows left over from a taller previous frame
+        for row in range(len(lines), len(self.previous)):
+            parts.append(f"\x1b[{row + 1};1H\x1b[2K")
+        
+        self.previous = list(lines)
+        if parts:
+            self.stream.write("".join(parts))
+            self.stream.flush()
+        
+    def close(self):
+        """Park the cursor below the last frame and show it again"""
+        rows = len(self.previous or [])
+        self.stream.write(f"\x1b[{rows + 1};1H\x1b[?25h\n")
+        self.stream.flush()
+
 class Game:
     def __init__(self):
         self.player = Tank(0, 0, "Player Tank", is_player=True)
@@ -153,6 +224,15 @@ class Game:
         self.game_over = False
         self.frame = 0
         
+        # Recent event messages; printed between frames unless a live view shows them
+        self.messages = deque(maxlen=5)
+        self.unprinted = []
+        self.live = False
+        
+        # Gameplay events are turned into messages once per tick
+        self.events = EventBus()
+        self.events.subscribe(self.describe_events)
+        
         print("=== WAR THUNDER OFFLINE - TEXT DEMO ===")
         print("Controls: w/s=move, a/d=rotate hull, q/e=rotate turret, space=shoot, x=quit")
         print()
@@ -165,8 +245,9 @@ class Game:
         
         enemy_num = len(self.enemies) + 1
         enemy = Tank(x, z, f"Enemy {enemy_num}", is_player=False)
+        enemy.number = enemy_num
         self.enemies.append(enemy)
-        print(f"Enemy tank #{enemy_num} spotted at distance {distance:.1f}!")
+        self.events.emit(SPAWN, x, 0, z, source=enemy_num, value=distance)
         
     def update(self):
         if self.game_over:
@@ -186,11 +267,12 @@ class Game:
                 bullet = enemy.shoot()
                 if bullet:
                     self.bullets.append(bullet)
-                    print(f"{enemy.name} fires!")
+                    self.events.emit(SHOT, bullet.position.x, 0, bullet.position.z, source=enemy.number)
             
             # Remove dead enemies
             if enemy.health <= 0:
-                print(f"{enemy.name} destroyed! +100 points")
+                self.events.emit(KILL, enemy.position.x, 0, enemy.position.z,
+                                 PLAYER_ID, enemy.number, 100)
                 self.enemies.remove(enemy)
                 self.score += 100
                 
@@ -205,7 +287,8 @@ class Game:
                 # Check collision with enemies
                 for enemy in self.enemies[:]:
                     if distance_3d(bullet.position, enemy.position) < 2.0:
-                        print(f"Hit! {enemy.name} takes 25 damage")
+                        self.events.emit(HIT, bullet.position.x, 0, bullet.position.z,
+                                         PLAYER_ID, enemy.number, 25)
                         enemy.take_damage(25)
                         if bullet in self.bullets:
                             self.bullets.remove(bullet)
@@ -213,7 +296,7 @@ class Game:
             else:
                 # Check collision with player
                 if distance_3d(bullet.position, self.player.position) < 2.0:
-                    print(f"Player hit! -25 health")
+                    self.events.emit(HIT, bullet.position.x, 0, bullet.position.z, target=PLAYER_ID, value=25)
                     self.player.take_damage(25)
                     if bullet in self.bullets:
                         self.bullets.remove(bullet)
@@ -227,63 +310,104 @@ class Game:
         # Check if player is dead
         if self.player.health <= 0:
             self.game_over = True
-            print("\\n=== GAME OVER ===")
-            print(f"Final Score: {self.score}")
-            print("You fought valiantly, commander!")
-            
-    def display_status(self):
-        os.system('clear' if os.name == 'posix' else 'cls')
-        print("=== WAR THUNDER OFFLINE - TEXT DEMO ===")
-        print(f"Frame: {self.frame} | Score: {self.score}")
-        print(f"Player Health: {self.player.health}/100")
-        print(f"Position: ({self.player.position.x:.1f}, {self.player.position.z:.1f})")
-        print(f"Hull Rotation: {math.degrees(self.player.rotation):.0f}°")
-        print(f"Turret Rotation: {math.degrees(self.player.turret_rotation):.0f}°")
-        print()
+            self.events.emit(DEATH, self.player.position.x, 0, self.player.position.z, target=PLAYER_ID)
         
-        print("=== BATTLEFIELD ===")
-        # Simple ASCII battlefield view
-        field_size = 10
-        for z in range(-field_size, field_size + 1):
-            line = ""
-            for x in range(-field_size, field_size + 1):
-                world_x = self.player.position.x + x
-                world_z = self.player.position.z + z
-                
-                char = "."
-                
-                # Check for player
-                if abs(x) < 1 and abs(z) < 1:
-                    char = "P"
-                
-                # Check for enemies
-                for enemy in self.enemies:
-                    rel_x = enemy.position.x - self.player.position.x
-                    rel_z = enemy.position.z - self.player.position.z
-                    if abs(rel_x - x) < 1 and abs(rel_z - z) < 1:
-                        char = "E"
-                        
-                # Check for bullets
-                for bullet in self.bullets:
-                    rel_x = bullet.position.x - self.player.position.x
-                    rel_z = bullet.position.z - self.player.position.z
-                    if abs(rel_x - x) < 0.5 and abs(rel_z - z) < 0.5:
-                        char = "*" if bullet.is_player_bullet else "!"
-                        
-                line += char + " "
-            print(line)
+        self.events.end_tick()
             
-        print()
-        print("Legend: P=Player, E=Enemy, *=Your bullets, !=Enemy bullets")
-        print("Status:")
-        print(f"  Enemies: {len(self.enemies)}")
-        print(f"  Active bullets: {len(self.bullets)}")
-        print(f"  Can shoot: {'Yes' if self.player.can_shoot and self.player.shoot_cooldown <= 0 else 'No'}")
-        
+    def describe_events(self, batch):
+        """Log a message for each of a tick's events"""
+        for event in iter_events(batch):
+            if event.kind == SHOT:
+                self.log("Player fires!" if event.source == PLAYER_ID else f"Enemy {event.source} fires!")
+            elif event.kind == HIT and event.target == PLAYER_ID:
+                self.log(f"Player hit! -{event.value:.0f} health")
+            elif event.kind == HIT:
+                self.log(f"Hit! Enemy {event.target} takes {event.value:.0f} damage")
+            elif event.kind == KILL:
+                self.log(f"Enemy {event.target} destroyed! +{event.value:.0f} points")
+            elif event.kind == SPAWN:
+                self.log(f"Enemy tank #{event.source} spotted at distance {event.value:.1f}!")
+            elif event.kind == DEATH:
+                self.log("=== GAME OVER ===")
+                self.log(f"Final Score: {self.score}")
+                self.log("You fought valiantly, commander!")
+            
+    def log(self, message):
+        self.messages.append(message)
+        if not self.live:
+            self.unprinted.append(message)
+            
+    def print_log(self):
+        """Print the messages logged since the last call in one write"""
+        if self.unprinted:
+            print("\n".join(self.unprinted))
+            self.unprinted = []
+            
+    def status_lines(self):
+        """The status screen as a list of text lines"""
+        lines = [
+            "=== WAR THUNDER OFFLINE - TEXT DEMO ===",
+            f"Frame: {self.frame} | Score: {self.score}",
+            f"Player Health: {self.player.health}/100",
+            f"Position: ({self.player.position.x:.1f}, {self.player.position.z:.1f})",
+            f"Hull Rotation: {math.degrees(self.player.rotation):.0f}°",
+            f"Turret Rotation: {math.degrees(self.player.turret_rotation):.0f}°",
+            "",
+            "=== BATTLEFIELD ===",
+        ]
+        # Simple ASCII battlefield view
+        lines += self.battlefield_rows()
+        lines += [
+            "",
+            "Legend: P=Player, E=Enemy, *=Your bullets, !=Enemy bullets",
+            "Status:",
+            f"  Enemies: {len(self.enemies)}",
+            f"  Active bullets: {len(self.bullets)}",
+            f"  Can shoot: {'Yes' if self.player.can_shoot and self.player.shoot_cooldown <= 0 else 'No'}",
+        ]
+        if self.live:
+            lines += ["", "Events:"] + [f"  {message}" for message in self.messages]
         if self.game_over:
-            print("\\n=== GAME OVER ===")
-            print("Press Enter to exit...")
+            lines += ["", "=== GAME OVER ==="]
+        return lines
+            
+    def display_status(self, view=None):
+        """Show the status screen on a TerminalView, or print it"""
+        if view:
+            view.draw(self.status_lines())
+        else:
+            print()
+            print("\n".join(self.status_lines()))
             
+    def battlefield_rows(self, field_size=10):
+        """ASCII rows of the area around the player, one cell per world unit"""
+        entities = [(self.player, PLAYER)]
+        entities += [(enemy, ENEMY) for enemy in self.enemies]
+        entities += [(bullet, PLAYER_BULLET if bullet.is_player_bullet else ENEMY_BULLET)
+                     for bullet in self.bullets]
+        center_x = self.player.position.x
+        center_z = self.player.position.z
+        
+        if OCCUPANCY_AVAILABLE:
+            # Bin everything in one vectorized pass
+            grid = OccupancyGrid(2 * field_size + 1, field_size + 0.5)
+            counts = grid.rasterize(center_x, center_z,
+                                    [entity.position.x for entity, _ in entities],
+                                    [entity.position.z for entity, _ in entities],
+                                    [channel for _, channel in entities])
+            return grid_to_ascii(counts)
+        
+        # Without NumPy, bin each entity once instead of scanning per cell
+        size = 2 * field_size + 1
+        cells = [['.'] * size for _ in range(size)]
+        priority = [channel for channel, _ in SYMBOLS]
+        for entity, channel in sorted(entities, key=lambda item: priority.index(item[1])):
+            col = math.floor(entity.position.x - center_x + field_size + 0.5)
+            row = math.floor(entity.position.z - center_z + field_size + 0.5)
+            if 0 <= row < size and 0 <= col < size:
+                cells[row][col] = dict(SYMBOLS)[channel]
+        return [' '.join(row) for row in cells]
+        
     def get_input(self):
         """Non-blocking input simulation for demo"""
         # In a real implementation, you'd use proper input handling
@@ -294,45 +418,62 @@ class Game:
             
             if action == 'w':
                 self.player.move_forward()
-                print("Player moves forward")
+                self.log("Player moves forward")
             elif action == 's':
                 self.player.move_backward()
-                print("Player moves backward")
+                self.log("Player moves backward")
             elif action == 'a':
                 self.player.rotate_left()
-                print("Player rotates left")
+                self.log("Player rotates left")
             elif action == 'd':
                 self.player.rotate_right()
-                print("Player rotates right")
+                self.log("Player rotates right")
             elif action == 'q':
                 self.player.rotate_turret_left()
-                print("Turret rotates left")
+                self.log("Turret rotates left")
             elif action == 'e':
                 self.player.rotate_turret_right()
-                print("Turret rotates right")
+                self.log("Turret rotates right")
             elif action == 'space':
                 bullet = self.player.shoot()
                 if bullet:
                     self.bullets.append(bullet)
-                    print("Player fires!")
+                    self.events.emit(SHOT, bullet.position.x, 0, bullet.position.z, source=PLAYER_ID)
                     
-    def run_demo(self):
-        """Run automated demo"""
-        print("Running automated demo for 300 frames...")
+    def run_demo(self, frames=300, live=False, fps=30):
+        """Run automated demo
+        
+        live=True redraws a TerminalView every frame at fps; otherwise the
+        status is printed every 30 frames.
+        """
+        print(f"Running automated demo for {frames} frames...")
         print("This demonstrates the game mechanics working!")
         print()
         
-        for _ in range(300):
-            if self.game_over:
-                break
+        self.live = live
+        view = TerminalView() if live else None
+        next_frame = time.perf_counter()
+        try:
+            for _ in range(frames):
+                if self.game_over:
+                    break
+                    
+                self.get_input()  # Simulated input
+                self.update()
+                self.print_log()
                 
-            self.get_input()  # Simulated input
-            self.update()
-            
-            # Display status every 30 frames
-            if self.frame % 30 == 0:
-                self.display_status()
-                time.sleep(0.5)  # Pause for readability
+                if live:
+                    self.display_status(view)
+                    next_frame += 1.0 / fps
+                    time.sleep(max(0.0, next_frame - time.perf_counter()))
+                elif self.frame % 30 == 0:
+                    # Display status every 30 frames
+                    self.display_status()
+                    time.sleep(0.5)  # Pause for readability
+        finally:
+            if view:
+                view.close()
+            self.live = False
                 
         print("\\n=== DEMO COMPLETE ===")
         print(f"Final Score: {self.score}")
@@ -341,8 +482,18 @@ class Game:
         print("this would be a full 3D tank combat game.")
 
 def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="War Thunder Offline text demo")
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--fps', type=int, default=30, help="refresh rate of the live view")
+    parser.add_argument('--live', dest='live', action='store_true', default=sys.stdout.isatty(),
+                        help="redraw in place every frame (default on a terminal)")
+    parser.add_argument('--plain', dest='live', action='store_false',
+                        help="print the status every 30 frames instead")
+    args = parser.parse_args()
+    
     game = Game()
-    game.run_demo()
+    game.run_demo(args.frames, args.live, args.fps)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,110 @@
+import time
+import numpy as np
+from utils.math3d import distance_3d
+from utils.constants import *
+
+
+class AIScheduler:
+    """Spreads enemy AI thinking across ticks under a per-frame time budget.
+
+    Enemies within AI_NEAR_DISTANCE think every tick. Farther enemies are
+    dealt round-robin into AI_FAR_INTERVAL buckets and think when their bucket
+    comes up, holding their last command in between. Once the budget is spent,
+    remaining far enemies are deferred; deferred enemies go first next tick.
+
+    With a planner (see utils.parallel_ai.ParallelAI) every scheduled enemy is
+    planned in one batch instead, which is cheap enough that nothing is
+    deferred.
+    """
+    def __init__(self, near_distance=AI_NEAR_DISTANCE, far_interval=AI_FAR_INTERVAL,
+                 budget_ms=AI_BUDGET_MS, planner=None):
+        self.near_distance = near_distance
+        self.far_interval = far_interval
+        self.budget_ms = budget_ms
+        self.planner = planner
+        self.tick = 0
+        self.next_bucket = 0
+
+        # Statistics for the last tick
+        self.last_ai_ms = 0.0
+        self.thinks = 0
+        self.deferred = 0
+        self.max_starvation = 0
+
+    def assign_bucket(self, enemy):
+        """Deal a newly seen enemy into the next round-robin bucket"""
+        enemy.ai_bucket = self.next_bucket
+        self.next_bucket = (self.next_bucket + 1) % self.far_interval
+
+    def update(self, enemies, target_pos, navigation=None):
+        """Advance every enemy one tick, re-planning only the scheduled ones"""
+        start = time.perf_counter()
+        budget_end = start + self.budget_ms / 1000.0
+        bucket = self.tick % self.far_interval
+
+        near = []
+        due = []
+        holding = []
+        for enemy in enemies:
+            if enemy.ai_bucket is None:
+                self.assign_bucket(enemy)
+            if distance_3d(enemy.position, target_pos) < self.near_distance:
+                near.append(enemy)
+            elif enemy.ai_bucket == bucket or enemy.ticks_since_think >= self.far_interval:
+                due.append(enemy)
+            else:
+                holding.append(enemy)
+
+        if self.planner is not None:
+            self.plan_batch(near + due, target_pos, navigation)
+            for enemy in holding:
+                enemy.update(target_pos, navigation, think=False)
+            self.finish_tick(enemies, start, len(near) + len(due), 0)
+            return
+
+        # Near enemies always think; the most starved far enemies go next
+        for enemy in near:
+            enemy.update(target_pos, navigation, think=True)
+
+        due.sort(key=lambda e: e.ticks_since_think, reverse=True)
+        deferred = 0
+        for enemy in due:
+            if time.perf_counter() < budget_end:
+                enemy.update(target_pos, navigation, think=True)
+            else:
+                enemy.update(target_pos, navigation, think=False)
+                deferred += 1
+
+        for enemy in holding:
+            enemy.update(target_pos, navigation, think=False)
+
+        self.finish_tick(enemies, start, len(near) + len(due) - deferred, deferred)
+
+    def plan_batch(self, thinkers, target_pos, navigation):
+        """Plan and apply commands for a list of enemies with the batch planner"""
+        if not thinkers:
+            return
+        inputs = np.array([(e.position.x, e.position.y, e.position.z, e.rotation, e.turret_rotation, 0.0, 0.0)
+                           for e in thinkers])
+        if navigation is not None:
+            inputs[:, 5:7] = navigation.directions_at(inputs[:, 0], inputs[:, 2])
+        commands = self.planner.plan(inputs, (target_pos.x, target_pos.y, target_pos.z))
+        for enemy, (throttle, turn, turret_turn) in zip(thinkers, commands.tolist()):
+            enemy.update(target_pos, navigation, command=(throttle, int(turn), int(turret_turn)))
+
+    def finish_tick(self, enemies, start, thinks, deferred):
+        """Advance the tick counter and record this tick's statistics"""
+        self.tick += 1
+        self.last_ai_ms = (time.perf_counter() - start) * 1000
+        self.thinks = thinks
+        self.deferred = deferred
+        self.max_starvation = max((e.ticks_since_think for e in enemies), default=0)
+
+    def stats(self):
+        """Per-tick AI cost and starvation figures"""
+        return {
+            'ai_ms': self.last_ai_ms,
+            'thinks': self.thinks,
+            'deferred': self.deferred,
+            'max_starvation': self.max_starvation,
+        }
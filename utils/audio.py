@@ -0,0 +1,153 @@
+import math
+import pygame
+import numpy as np
+from utils.constants import *
+from utils.events import RECORD_SIZE, SHOT, HIT, KILL, DEATH
+
+# Sound played for each event kind, and how much each sound matters when
+# voices run out
+EVENT_SOUNDS = {SHOT: 'cannon', HIT: 'hit', KILL: 'explosion', DEATH: 'explosion'}
+SOUND_PRIORITIES = {'cannon': 1, 'hit': 2, 'explosion': 3}
+
+
+def synthesize(name, rate, rng):
+    """Mono float samples in -1..1 for one of the built-in sounds"""
+    if name == 'engine':
+        # Whole cycles of both tones, so the sample loops without a click
+        t = np.arange(int(rate * 0.5)) / rate
+        wave = sum(np.sin(2 * math.pi * 30 * k * t) / k for k in range(1, 6))
+        return wave * (0.8 + 0.2 * np.sin(2 * math.pi * 10 * t))
+    duration, decay = {'cannon': (0.4, 0.08), 'hit': (0.2, 0.04), 'explosion': (1.2, 0.35)}[name]
+    t = np.arange(int(rate * duration)) / rate
+    noise = rng.uniform(-1, 1, len(t))
+    if name == 'cannon':
+        return noise * np.exp(-t / 0.04) + 1.5 * np.sin(2 * math.pi * 55 * t) * np.exp(-t / decay)
+    if name == 'hit':
+        ring = np.sin(2 * math.pi * 900 * t) + np.sin(2 * math.pi * 1370 * t)
+        return ring * np.exp(-t / decay) + noise * np.exp(-t / 0.01)
+    # Low-passed noise for the blast, over a falling rumble
+    rumble = np.convolve(noise, np.ones(48) / 48, mode='same') * 6
+    return (rumble + np.sin(2 * math.pi * 35 * t * (1 - t / 3))) * np.exp(-t / decay)
+
+
+def build_sounds(sound_files=SOUND_FILES):
+    """Every effect decoded into a mixer Sound, once, at start-up
+
+    Files named in sound_files replace the synthesized sound of that name.
+    """
+    rate, _, channels = pygame.mixer.get_init()
+    rng = np.random.default_rng(0)
+    sounds = {}
+    for name in ('cannon', 'hit', 'explosion', 'engine'):
+        if name in sound_files:
+            sounds[name] = pygame.mixer.Sound(sound_files[name])
+            continue
+        wave = synthesize(name, rate, rng)
+        samples = (wave / np.abs(wave).max() * 0.9 * 32767).astype(np.int16)
+        if channels > 1:
+            samples = np.repeat(samples[:, None], channels, axis=1)
+        sounds[name] = pygame.sndarray.make_sound(np.ascontiguousarray(samples))
+    return sounds
+
+
+class Audio:
+    """Sound effects for gameplay events on a fixed pool of mixer channels.
+
+    Sounds are decoded once at start-up. Events only queue requests; once a
+    tick, update() keeps the loudest few requests per sound, gives each a
+    volume and pan from its distance and bearing to the listener, and plays
+    them best first. A request with no free channel steals the voice with
+    the lowest priority and remaining loudness, or is dropped if every voice
+    matters more. The engine loop has a reserved channel of its own.
+    """
+    def __init__(self, channels=AUDIO_CHANNELS, sound_files=SOUND_FILES):
+        self.sounds = build_sounds(sound_files)
+        self.lengths = {name: max(1, round(sound.get_length() * FPS)) for name, sound in self.sounds.items()}
+        pygame.mixer.set_num_channels(channels + 1)
+        pygame.mixer.set_reserved(1)
+        self.engine = pygame.mixer.Channel(0)
+        self.engine.set_volume(0.0)
+        self.engine.play(self.sounds['engine'], loops=-1)
+        self.voices = [pygame.mixer.Channel(i) for i in range(1, channels + 1)]
+        # Per voice: (priority, peak volume, tick started, length in ticks)
+        self.voice_state = [None] * channels
+        self.requests = []
+        self.tick = 0
+        self.played = 0
+        self.stolen = 0
+        self.dropped = 0
+
+    def on_events(self, batch):
+        """EventBus subscriber: queue a sound for every event that has one"""
+        for i in range(0, len(batch), RECORD_SIZE):
+            name = EVENT_SOUNDS.get(int(batch[i + 1]))
+            if name:
+                self.requests.append((name, batch[i + 2], batch[i + 4]))
+
+    def request(self, name, x, z):
+        """Queue a sound at a world position for the next update()"""
+        self.requests.append((name, x, z))
+
+    def voice_score(self, i):
+        """How much voice i matters now, fading as it plays; idle voices score -1"""
+        state = self.voice_state[i]
+        if state is None or not self.voices[i].get_busy():
+            return -1.0
+        priority, volume, started, length = state
+        remaining = 1.0 - (self.tick - started) / length
+        return (priority + volume) * remaining if remaining > 0 else -1.0
+
+    def update(self, listener, heading, engine_level=0.0):
+        """Play this tick's queued sounds and set the engine volume
+
+        listener is the Vector3 the sounds are heard from and heading the
+        rotation it faces; engine_level runs from 0 (silent) to 1.
+        """
+        self.tick += 1
+        self.engine.set_volume(AUDIO_ENGINE_VOLUME * engine_level)
+        if not self.requests:
+            return
+
+        # Bearing to the listener's right: forward x up for a y-up world
+        right_x, right_z = -math.cos(heading), math.sin(heading)
+        candidates = []
+        for name, x, z in self.requests:
+            dx = x - listener.x
+            dz = z - listener.z
+            distance = math.hypot(dx, dz)
+            if distance > AUDIO_MAX_DISTANCE:
+                self.dropped += 1
+                continue
+            volume = 1.0 / (1.0 + distance / AUDIO_FALLOFF_DISTANCE)
+            pan = (dx * right_x + dz * right_z) / distance if distance > 1e-6 else 0.0
+            candidates.append((SOUND_PRIORITIES.get(name, 0) + volume, volume, pan, name))
+        self.requests.clear()
+
+        # Best first, and only the loudest few of any one sound per tick
+        candidates.sort(reverse=True)
+        per_sound = {}
+        scores = [self.voice_score(i) for i in range(len(self.voices))]
+        for score, volume, pan, name in candidates:
+            count = per_sound.get(name, 0)
+            if count >= AUDIO_MAX_PER_SOUND:
+                self.dropped += 1
+                continue
+            per_sound[name] = count + 1
+            i = min(range(len(scores)), key=scores.__getitem__)
+            if scores[i] >= score:
+                self.dropped += 1
+                continue
+            if scores[i] >= 0:
+                self.stolen += 1
+            channel = self.voices[i]
+            channel.play(self.sounds[name])
+            channel.set_volume(volume * min(1.0, 1.0 - pan), volume * min(1.0, 1.0 + pan))
+            self.voice_state[i] = (SOUND_PRIORITIES.get(name, 0), volume, self.tick, self.lengths[name])
+            scores[i] = score
+            self.played += 1
+
+    def stats(self):
+        return {'played': self.played, 'stolen': self.stolen, 'dropped': self.dropped}
+
+    def close(self):
+        pygame.mixer.stop()
@@ -0,0 +1,108 @@
+import math
+import numpy as np
+from utils.constants import *
+
+
+class FiringTable:
+    """Precomputed gun elevation and flight time by range and height difference.
+
+    Bullets move BULLET_SPEED per tick along their launch direction and pick up
+    GRAVITY per tick of extra vertical speed, so after t ticks at elevation e:
+
+        range  = t * v * cos(e)
+        height = t * v * sin(e) + GRAVITY * t * (t + 1) / 2
+
+    For every range bin the low-arc branch of height(e) is inverted once at
+    start-up; aiming is then a bilinear lookup, vectorized over all shooters.
+    """
+    def __init__(self, speed=BULLET_SPEED, gravity=GRAVITY, lifetime=BULLET_LIFETIME,
+                 max_range=FIRING_TABLE_MAX_RANGE, max_height=FIRING_TABLE_MAX_HEIGHT,
+                 range_bins=FIRING_TABLE_RANGE_BINS, height_bins=FIRING_TABLE_HEIGHT_BINS):
+        self.speed = speed
+        self.gravity = gravity
+        self.ranges = np.linspace(0.0, max_range, range_bins)
+        self.heights = np.linspace(-max_height, max_height, height_bins)
+
+        self.elevation = np.zeros((range_bins, height_bins), dtype=np.float32)
+        self.flight_time = np.zeros((range_bins, height_bins), dtype=np.float32)
+        self.reachable = np.zeros((range_bins, height_bins), dtype=bool)
+
+        elevations = np.linspace(-math.pi / 4, math.pi / 2 - 1e-3, 512)
+        for k, distance in enumerate(self.ranges):
+            times = distance / (speed * np.cos(elevations))
+            heights = distance * np.tan(elevations) + gravity * times * (times + 1) / 2
+
+            # Keep the low arc only: elevations up to the highest point reachable
+            peak = int(np.argmax(heights)) + 1
+            low_heights = heights[:peak]
+            low_elevations = elevations[:peak]
+
+            elevation = np.interp(self.heights, low_heights, low_elevations)
+            time = distance / (speed * np.cos(elevation))
+            self.elevation[k] = elevation
+            self.flight_time[k] = time
+            self.reachable[k] = ((self.heights >= low_heights[0]) &
+                                 (self.heights <= low_heights[-1]) &
+                                 (time <= lifetime))
+
+    def lookup(self, distances, height_differences):
+        """Elevation, flight time and reachability for arrays of shots"""
+        distances = np.asarray(distances, dtype=np.float32)
+        height_differences = np.asarray(height_differences, dtype=np.float32)
+
+        # Fractional table coordinates
+        fr = np.clip(distances / self.ranges[-1], 0.0, 1.0) * (len(self.ranges) - 1)
+        fh = np.clip((height_differences - self.heights[0]) / (self.heights[-1] - self.heights[0]),
+                     0.0, 1.0) * (len(self.heights) - 1)
+        r0 = np.minimum(fr.astype(np.intp), len(self.ranges) - 2)
+        h0 = np.minimum(fh.astype(np.intp), len(self.heights) - 2)
+        tr = fr - r0
+        th = fh - h0
+
+        def bilinear(table):
+            return ((table[r0, h0] * (1 - th) + table[r0, h0 + 1] * th) * (1 - tr) +
+                    (table[r0 + 1, h0] * (1 - th) + table[r0 + 1, h0 + 1] * th) * tr)
+
+        elevation = bilinear(self.elevation)
+        flight_time = bilinear(self.flight_time)
+        reachable = (self.reachable[r0, h0] & self.reachable[r0 + 1, h0 + 1] &
+                     (distances <= self.ranges[-1]) &
+                     (np.abs(height_differences) <= self.heights[-1]))
+        return elevation, flight_time, reachable
+
+    def aim(self, origins, target, target_velocity=None, lead_iterations=2):
+        """Solve lead, yaw and elevation for an (N, 3) array of muzzle positions
+
+        Returns (yaw, elevation, flight_time, hit_probability, reachable) arrays.
+        """
+        origins = np.asarray(origins, dtype=np.float32).reshape(-1, 3)
+        target = np.asarray(target, dtype=np.float32)
+        velocity = np.zeros(3, dtype=np.float32) if target_velocity is None else \
+            np.asarray(target_velocity, dtype=np.float32)
+
+        # Start with no lead and refine the intercept point a few times
+        flight_time = np.zeros(len(origins), dtype=np.float32)
+        for _ in range(lead_iterations + 1):
+            aim_point = target + flight_time[:, None] * velocity
+            offset = aim_point - origins
+            distance = np.hypot(offset[:, 0], offset[:, 2])
+            elevation, flight_time, reachable = self.lookup(distance, offset[:, 1])
+
+        yaw = np.arctan2(offset[:, 0], offset[:, 2])
+
+        # A 2D Gaussian miss whose spread grows with flight time and target speed
+        spread = AIM_SPREAD_PER_TICK * flight_time * (1.0 + np.linalg.norm(velocity) / TANK_SPEED)
+        hit_probability = 1.0 - np.exp(-(HIT_RADIUS ** 2) / (2 * np.maximum(spread, 1e-6) ** 2))
+        hit_probability = np.where(reachable, hit_probability, 0.0)
+        return yaw, elevation, flight_time, hit_probability, reachable
+
+
+_default_table = None
+
+
+def default_firing_table():
+    """Firing table for the standard gun, built on first use"""
+    global _default_table
+    if _default_table is None:
+        _default_table = FiringTable()
+    return _default_table
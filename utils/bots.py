@@ -0,0 +1,117 @@
+import math
+import random
+from entities.tank import Tank
+from utils.controls import TankCommand, IDLE, ScriptedInput, execute_command
+from utils.math3d import distance_3d, angle_to_target
+from utils.events import SHOT, DEATH
+from utils.occupancy import ALLY
+from utils.constants import *
+
+
+class WanderPolicy:
+    """Drives around at random, holding each choice for a human-like while"""
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.current = IDLE
+        self.ticks_left = 0
+
+    def command(self, tank, game):
+        """Keep the current random command until it expires, then pick another"""
+        if self.ticks_left <= 0:
+            self.current = TankCommand(self.rng.choice((1.0, 1.0, 0.5, 0.0, -0.5)),
+                                       self.rng.choice((-1, 0, 0, 1)),
+                                       self.rng.choice((-1, 0, 1)), False)
+            self.ticks_left = self.rng.randint(20, 90)
+        self.ticks_left -= 1
+        fire = tank.can_shoot and self.rng.random() < BOT_WANDER_FIRE_CHANCE
+        return self.current._replace(fire=fire)
+
+
+class ChasePolicy:
+    """Hunts the nearest enemy like a player would.
+
+    The bot re-plans only every reaction_ticks and aims with some random
+    error, retreats when badly damaged, and wanders when no enemy is left.
+    """
+    def __init__(self, seed=None, reaction_ticks=BOT_REACTION_TICKS, aim_error=BOT_AIM_ERROR):
+        self.rng = random.Random(seed)
+        self.reaction_ticks = reaction_ticks
+        self.aim_error = aim_error
+        self.wander = WanderPolicy(self.rng.random())
+        self.current = IDLE
+        self.ticks_left = 0
+        self.error = 0.0
+
+    def command(self, tank, game):
+        """Pursue and shoot the nearest enemy"""
+        if not game.enemies:
+            return self.wander.command(tank, game)
+
+        target = min(game.enemies, key=lambda e: distance_3d(tank.position, e.position))
+        distance = distance_3d(tank.position, target.position)
+        if self.ticks_left <= 0:
+            throttle, turn, turret_turn = tank.plan_ai_movement(target.position)
+            if tank.health < tank.max_health * BOT_RETREAT_HEALTH:
+                throttle = -1.0
+            self.current = TankCommand(throttle, turn, turret_turn, False)
+            self.error = self.rng.gauss(0.0, self.aim_error)
+            self.ticks_left = self.reaction_ticks
+        self.ticks_left -= 1
+
+        aim = angle_to_target(tank.position, target.position) + self.error
+        off_target = abs((aim - tank.rotation - tank.turret_rotation + math.pi) % (2 * math.pi) - math.pi)
+        fire = tank.can_shoot and distance < BOT_FIRE_RANGE and off_target < AIM_TOLERANCE
+        return self.current._replace(fire=fire)
+
+
+def make_policy(name, seed=None, script=None):
+    """Build an input source by name: 'chase', 'wander' or 'script'"""
+    if name == 'chase':
+        return ChasePolicy(seed)
+    if name == 'wander':
+        return WanderPolicy(seed)
+    if name == 'script':
+        return ScriptedInput.load(script, loop=True)
+    raise ValueError(f"Unknown bot policy: {name}")
+
+
+class BotDriver:
+    """Drives extra tanks on the player's side, each from its own input source"""
+    def __init__(self, game):
+        self.game = game
+        self.bots = []  # (tank, source, spawn point)
+        self.fallen = []
+
+    def add_bot(self, x, z, source):
+        """Spawn an allied tank at (x, z) controlled by source"""
+        tank = Tank(x, z, ALLY_COLOR, is_player=True)
+        tank.particles = self.game.particles
+        self.bots.append((tank, source, (x, z)))
+        self.game.allies.append(tank)
+        return tank
+
+    def respawn(self):
+        """Put every bot, destroyed or not, back on a fresh tank at its spawn point"""
+        bots = self.bots + self.fallen
+        self.bots = []
+        self.fallen = []
+        self.game.allies = []
+        for _, source, (x, z) in bots:
+            self.add_bot(x, z, source)
+
+    def update(self):
+        """Run every bot for one tick; destroyed bots are removed"""
+        for bot in self.bots[:]:
+            tank, source, _ = bot
+            if tank.health <= 0:
+                self.game.particles.emit_explosion(tank.position)
+                self.game.events.emit_at(DEATH, tank.position, target=ALLY)
+                self.game.allies.remove(tank)
+                self.bots.remove(bot)
+                self.fallen.append(bot)
+                continue
+            bullet = execute_command(tank, source.command(tank, self.game))
+            if bullet:
+                bullet.side = ALLY
+                self.game.bullets.append(bullet)
+                self.game.events.emit_at(SHOT, bullet.position, ALLY)
@@ -0,0 +1,308 @@
+import math
+import numpy as np
+from utils.constants import *
+
+# Faces a bullet can strike, used to look up ARMOR_MULTIPLIERS
+FACE_FRONT = 0
+FACE_SIDE = 1
+FACE_REAR = 2
+FACE_TOP = 3
+FACE_NAMES = ('front', 'side', 'rear', 'top')
+
+# Parts of a tank that can be hit
+PART_HULL = 0
+PART_TURRET = 1
+PART_NAMES = ('hull', 'turret')
+
+
+def hull_axes(rotations):
+    """Right and forward unit axes in the XZ plane for an array of hull rotations"""
+    sin_r = np.sin(rotations)
+    cos_r = np.cos(rotations)
+    right = np.stack([cos_r, -sin_r], axis=-1)
+    forward = np.stack([sin_r, cos_r], axis=-1)
+    return right, forward
+
+
+def obb_overlap_2d(centers_a, rotations_a, half_a, centers_b, rotations_b, half_b):
+    """Separating axis test between pairs of oriented rectangles on the XZ plane
+
+    centers are (N, 2) x/z positions, rotations are hull angles and half are
+    (N, 2) half extents along (right, forward). Returns (overlapping, depth,
+    normal) where normal is the unit (N, 2) axis of least penetration pointing
+    from a to b.
+    """
+    right_a, forward_a = hull_axes(rotations_a)
+    right_b, forward_b = hull_axes(rotations_b)
+    offset = centers_b - centers_a
+
+    # The four candidate axes, shaped (4, N, 2)
+    axes = np.stack([right_a, forward_a, right_b, forward_b])
+
+    def projected_radius(right, forward, half):
+        return (half[:, 0] * np.abs((axes * right).sum(axis=-1)) +
+                half[:, 1] * np.abs((axes * forward).sum(axis=-1)))
+
+    distance = (axes * offset).sum(axis=-1)
+    overlap = (projected_radius(right_a, forward_a, half_a) +
+               projected_radius(right_b, forward_b, half_b) - np.abs(distance))
+
+    best = overlap.argmin(axis=0)
+    pairs = np.arange(overlap.shape[1])
+    depth = overlap[best, pairs]
+    normal = axes[best, pairs] * np.where(distance[best, pairs] < 0, -1.0, 1.0)[:, None]
+    return depth > 0, depth, normal
+
+
+def tank_part_boxes(positions, rotations, turret_rotations):
+    """Centres, yaw angles and half extents of the hull and turret boxes
+
+    Inputs are arrays for N tanks; outputs stack the N hulls first, then the
+    N turrets, matching the geometry drawn by draw_tank_batch.
+    """
+    count = len(positions)
+    turret_centers = positions + np.array([0.0, TANK_HEIGHT * 0.4, 0.0])
+    centers = np.concatenate([positions, turret_centers])
+    angles = np.concatenate([rotations, rotations + turret_rotations])
+    half = np.concatenate([
+        np.tile([TANK_WIDTH / 2, TANK_HEIGHT * 0.3, TANK_LENGTH / 2], (count, 1)),
+        np.tile([TANK_WIDTH * 0.4, TANK_HEIGHT * 0.2, TANK_WIDTH * 0.4], (count, 1)),
+    ])
+    return centers, angles, half
+
+
+def segment_obb_hits(starts, ends, centers, angles, half_extents, radius=0.0):
+    """Separating axis test of segments against Y-rotated boxes, pairwise
+
+    Each segment is tested against the box in the same row. The test runs in
+    the box's local frame on the three box axes plus the three cross products
+    with the segment direction. Returns (hit, t, face): whether the pair
+    touches, the fraction along the segment where it enters, and the struck
+    face as a FACE_* code.
+    """
+    sin_a = np.sin(angles)
+    cos_a = np.cos(angles)
+
+    def to_local(points):
+        d = points - centers
+        return np.stack([d[:, 0] * cos_a - d[:, 2] * sin_a,
+                         d[:, 1],
+                         d[:, 0] * sin_a + d[:, 2] * cos_a], axis=1)
+
+    start = to_local(starts)
+    end = to_local(ends)
+    e = half_extents + radius
+    mid = (start + end) / 2
+    h = (end - start) / 2
+    ah = np.abs(h)
+
+    # Box face axes
+    hit = np.all(np.abs(mid) <= e + ah, axis=1)
+
+    # Cross products of the segment with each box axis
+    ah = ah + 1e-6
+    hit &= np.abs(mid[:, 1] * h[:, 2] - mid[:, 2] * h[:, 1]) <= e[:, 1] * ah[:, 2] + e[:, 2] * ah[:, 1]
+    hit &= np.abs(mid[:, 2] * h[:, 0] - mid[:, 0] * h[:, 2]) <= e[:, 0] * ah[:, 2] + e[:, 2] * ah[:, 0]
+    hit &= np.abs(mid[:, 0] * h[:, 1] - mid[:, 1] * h[:, 0]) <= e[:, 0] * ah[:, 1] + e[:, 1] * ah[:, 0]
+
+    # Entry parameter and entry axis from the slabs
+    direction = end - start
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t1 = (-e - start) / direction
+        t2 = (e - start) / direction
+    near = np.nan_to_num(np.minimum(t1, t2), nan=-np.inf)
+    axis = near.argmax(axis=1)
+    rows = np.arange(len(axis))
+    t = np.clip(near[rows, axis], 0.0, 1.0)
+
+    # A segment starting inside the box is blamed on the face nearest its start
+    inside = near[rows, axis] < 0
+    axis = np.where(inside, np.abs(start / e).argmax(axis=1), axis)
+    from_positive = np.where(inside, start[rows, axis] > 0, direction[rows, axis] < 0)
+
+    face = np.full(len(axis), FACE_SIDE)
+    face[axis == 1] = FACE_TOP
+    face[(axis == 2) & from_positive] = FACE_FRONT
+    face[(axis == 2) & ~from_positive] = FACE_REAR
+    return hit, t, face
+
+
+class SweepAndPrune:
+    """Broadphase over tanks sorted by the low end of their x extent.
+
+    The sorted order is kept between ticks. Tanks move little per tick, so an
+    insertion sort over the nearly sorted list runs in close to linear time,
+    and the sweep only pairs tanks whose x extents overlap.
+    """
+    def __init__(self):
+        self.order = []
+        self.keys = []
+
+    def sync(self, tanks):
+        """Drop tanks no longer in tanks from the order and append new ones"""
+        alive = set(map(id, tanks))
+        known = set(map(id, self.order))
+        self.order = [t for t in self.order if id(t) in alive]
+        self.order.extend(t for t in tanks if id(t) not in known)
+
+    def candidate_pairs(self, tanks):
+        """Pairs of tanks whose x extents overlap"""
+        self.sync(tanks)
+
+        radius = math.hypot(TANK_WIDTH / 2, TANK_LENGTH / 2)
+        keys = [t.position.x - radius for t in self.order]
+
+        # Insertion sort: cheap when the previous tick's order is nearly right
+        for i in range(1, len(self.order)):
+            tank = self.order[i]
+            key = keys[i]
+            j = i - 1
+            while j >= 0 and keys[j] > key:
+                self.order[j + 1] = self.order[j]
+                keys[j + 1] = keys[j]
+                j -= 1
+            self.order[j + 1] = tank
+            keys[j + 1] = key
+
+        self.keys = keys
+
+        pairs = []
+        for i, tank in enumerate(self.order):
+            max_x = keys[i] + 2 * radius
+            for j in range(i + 1, len(self.order)):
+                if keys[j] > max_x:
+                    break
+                other = self.order[j]
+                if abs(tank.position.z - other.position.z) <= 2 * radius:
+                    pairs.append((tank, other))
+        return pairs
+
+    def query_x(self, min_x, max_x):
+        """Index ranges into self.order of tanks that may overlap [min_x, max_x]
+
+        Works on arrays of intervals; uses the order from the last
+        candidate_pairs or sync call with keys refreshed to current positions.
+        """
+        radius = math.hypot(TANK_WIDTH / 2, TANK_LENGTH / 2)
+        keys = np.array([t.position.x - radius for t in self.order])
+        sorter = np.argsort(keys, kind='stable')
+        self.order = [self.order[i] for i in sorter]
+        keys = keys[sorter]
+        low = np.searchsorted(keys, np.asarray(min_x) - 2 * radius, side='left')
+        high = np.searchsorted(keys, np.asarray(max_x), side='right')
+        return low, high
+
+
+class TankCollisions:
+    """Detects and separates overlapping tanks and applies ramming damage"""
+    def __init__(self):
+        self.broadphase = SweepAndPrune()
+        self.contacts = set()
+        self.impacts = []
+
+    def update(self, tanks):
+        """Resolve all tank overlaps for this tick"""
+        pairs = self.broadphase.candidate_pairs(tanks)
+        self.impacts = []
+        if not pairs:
+            self.contacts = set()
+            return
+
+        a = [p[0] for p in pairs]
+        b = [p[1] for p in pairs]
+        half = np.tile([[TANK_WIDTH / 2, TANK_LENGTH / 2]], (len(pairs), 1))
+        overlapping, depth, normal = obb_overlap_2d(
+            np.array([(t.position.x, t.position.z) for t in a]),
+            np.array([t.rotation for t in a]), half,
+            np.array([(t.position.x, t.position.z) for t in b]),
+            np.array([t.rotation for t in b]), half,
+        )
+
+        contacts = set()
+        for i in np.flatnonzero(overlapping):
+            first, second = a[i], b[i]
+            nx, nz = normal[i]
+            push = depth[i] / 2
+
+            # Separate along the axis of least penetration
+            first.position.x -= nx * push
+            first.position.z -= nz * push
+            second.position.x += nx * push
+            second.position.z += nz * push
+
+            # Cancel the closing part of the relative velocity
+            closing = ((first.velocity.x - second.velocity.x) * nx +
+                       (first.velocity.z - second.velocity.z) * nz)
+            if closing > 0:
+                first.velocity.x -= nx * closing / 2
+                first.velocity.z -= nz * closing / 2
+                second.velocity.x += nx * closing / 2
+                second.velocity.z += nz * closing / 2
+
+            # Damage only on the tick two tanks first touch
+            key = (id(first), id(second)) if id(first) < id(second) else (id(second), id(first))
+            contacts.add(key)
+            if key not in self.contacts and closing >= COLLISION_MIN_IMPACT_SPEED:
+                first.take_damage(COLLISION_DAMAGE)
+                second.take_damage(COLLISION_DAMAGE)
+                self.impacts.append((first, second))
+
+        self.contacts = contacts
+
+    def bullet_hits(self, starts, ends, is_player_bullet, tanks):
+        """Earliest hull or turret hit on tanks for each bullet path this tick
+
+        Candidate (bullet, tank) pairs come from the sweep-and-prune order,
+        brought in line with tanks first so tanks removed since update() are
+        never hit; all hull and turret boxes of those pairs are tested in one
+        batch. Returns a dict of bullet index -> (t, tank, part, face).
+        """
+        starts = np.asarray(starts, dtype=np.float64).reshape(-1, 3)
+        ends = np.asarray(ends, dtype=np.float64).reshape(-1, 3)
+        self.broadphase.sync(tanks)
+        if len(starts) == 0 or not self.broadphase.order:
+            return {}
+
+        # Padded so a bullet's radius reaching into a box still counts
+        low, high = self.broadphase.query_x(np.minimum(starts[:, 0], ends[:, 0]) - BULLET_RADIUS,
+                                            np.maximum(starts[:, 0], ends[:, 0]) + BULLET_RADIUS)
+        counts = high - low
+        bullets = np.repeat(np.arange(len(starts)), counts)
+        slots = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        slots += np.repeat(low, counts)
+        if len(bullets) == 0:
+            return {}
+
+        # Bullets only hit the other side
+        order = self.broadphase.order
+        tank_is_player = np.array([t.is_player for t in order])
+        enemy_fire = tank_is_player[slots] != np.asarray(is_player_bullet)[bullets]
+        bullets = bullets[enemy_fire]
+        slots = slots[enemy_fire]
+        if len(bullets) == 0:
+            return {}
+
+        tanks = [order[i] for i in slots]
+        positions = np.array([(t.position.x, t.position.y, t.position.z) for t in tanks])
+        rotations = np.array([t.rotation for t in tanks])
+        turret_rotations = np.array([t.turret_rotation for t in tanks])
+        centers, angles, half = tank_part_boxes(positions, rotations, turret_rotations)
+
+        pair_bullets = np.concatenate([bullets, bullets])
+        hit, t, face = segment_obb_hits(starts[pair_bullets], ends[pair_bullets],
+                                        centers, angles, half, radius=BULLET_RADIUS)
+
+        hits = {}
+        count = len(bullets)
+        for row in np.flatnonzero(hit):
+            bullet = int(pair_bullets[row])
+            if bullet in hits and hits[bullet][0] <= t[row]:
+                continue
+            part = PART_HULL if row < count else PART_TURRET
+            hits[bullet] = (float(t[row]), tanks[row % count], part, int(face[row]))
+        return hits
+
+
+def armor_damage(damage, part, face):
+    """Scale damage by the armor of the face struck"""
+    return damage * ARMOR_MULTIPLIERS[PART_NAMES[part]][FACE_NAMES[face]]
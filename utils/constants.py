@@ -5,6 +5,21 @@ SCREEN_WIDTH = 1024
 SCREEN_HEIGHT = 768
 FPS = 60
 
+# Pipelined mode: simulate on a worker thread at a fixed tick and let the
+# renderer interpolate between ticks (RENDER_FPS = 0 leaves rendering uncapped)
+PIPELINED_SIMULATION = False
+SIMULATION_TICK_RATE = FPS
+RENDER_FPS = 0
+
+# Dynamic resolution (3D mode)
+DYNAMIC_RESOLUTION = True
+TARGET_FRAME_TIME_MS = 1000.0 / FPS
+MIN_RENDER_SCALE = 0.5
+RESOLUTION_SCALE_STEP = 0.1
+RESOLUTION_SAMPLE_FRAMES = 30  # frames averaged before the scale may change
+RESOLUTION_DOWNSCALE_THRESHOLD = 1.0  # fraction of target frame time
+RESOLUTION_UPSCALE_THRESHOLD = 0.7
+
 # Colors (RGB values)
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -17,10 +32,20 @@ DARK_GRAY = (64, 64, 64)
 LIGHT_GRAY = (192, 192, 192)
 
 # 3D World settings
+# The world regions below only pay off once WORLD_SIZE spans more than
+# 2 * COARSE_REGION_RADIUS + 1 regions (350 at the defaults); at 200 every
+# region is always awake or coarse. Worlds up to about 4000 are the target:
+# the navigation grid coarsens to stay within NAV_MAX_RESOLUTION cells per
+# side and heatmaps keep HEATMAP_RESOLUTION, so neither grows with the world.
 WORLD_SIZE = 200.0
 TERRAIN_SIZE = 100.0
 TERRAIN_HEIGHT = 5.0
 
+# Map: obstacles come from MAP_FILE (JSON) if set, otherwise are generated
+MAP_FILE = None
+MAP_SEED = 1
+OBSTACLE_COUNT = 40
+
 # Camera settings
 CAMERA_HEIGHT = 8.0
 CAMERA_DISTANCE = 15.0
@@ -39,7 +64,25 @@ TURRET_ROTATION_SPEED = 0.03
 BULLET_SPEED = 1.0
 BULLET_DAMAGE = 25
 COLLISION_DAMAGE = 50
+COLLISION_MIN_IMPACT_SPEED = 0.2  # closing speed needed for a ram to do damage
 BULLET_LIFETIME = 300  # frames
+HIT_RADIUS = 2.0
+BULLET_RADIUS = 0.1
+
+# Damage multipliers by part and facing: thick frontal armor, thin rear
+ARMOR_MULTIPLIERS = {
+    'hull': {'front': 0.5, 'side': 1.0, 'rear': 1.5, 'top': 1.25},
+    'turret': {'front': 0.6, 'side': 1.0, 'rear': 1.5, 'top': 1.25},
+}
+
+# Enemy gunnery
+FIRING_TABLE_MAX_RANGE = 120.0
+FIRING_TABLE_MAX_HEIGHT = 20.0
+FIRING_TABLE_RANGE_BINS = 241
+FIRING_TABLE_HEIGHT_BINS = 81
+AIM_SPREAD_PER_TICK = 0.02  # expected miss distance per frame of flight
+AIM_TOLERANCE = 0.15  # radians the turret may be off the lead angle and still fire
+MIN_HIT_PROBABILITY = 0.3
 
 # Game mechanics
 ENEMY_SPAWN_RATE = 300  # frames between enemy spawns
@@ -47,6 +90,87 @@ TANK_MAX_HEALTH = 100
 ENEMY_HEALTH = 50
 MAX_ENEMIES = 8
 
+# AI scheduling
+AI_NEAR_DISTANCE = 40.0  # enemies closer than this think every frame
+AI_FAR_INTERVAL = 4  # frames between thinks for distant enemies
+AI_BUDGET_MS = 2.0  # per-frame time budget for distant enemy AI
+AI_WORKERS = 0  # worker processes for batched AI planning (0 plans in-process)
+AI_PARALLEL_THRESHOLD = 256  # smaller batches skip the worker pool
+AI_PARALLEL_CAPACITY = 4096  # most enemies the shared arrays can hold
+
+# Navigation
+NAV_CELL_SIZE = 4.0
+NAV_MAX_RESOLUTION = 512  # most cells per side; bigger worlds get bigger cells
+NAV_UPDATE_INTERVAL = 10  # frames between flow field updates
+NAV_SWEEPS_PER_UPDATE = 16  # relaxation passes allowed per update
+
+# Bots
+BOT_REACTION_TICKS = 8  # frames a bot holds a decision, like a player's reaction time
+BOT_AIM_ERROR = 0.05  # standard deviation of a bot's aim in radians
+BOT_FIRE_RANGE = 50.0
+BOT_RETREAT_HEALTH = 0.25  # fraction of health below which chasing bots back off
+BOT_WANDER_FIRE_CHANCE = 0.01  # per-frame chance a wandering bot fires
+
+# Occupancy grid (minimap and bot observations)
+OCCUPANCY_RESOLUTION = 32  # cells per side
+OCCUPANCY_RADIUS = 60.0  # world units from the player to the grid edge
+MINIMAP_SIZE = 160  # pixels per side in the 2D view
+RENDER_2D_SCALE = 10  # pixels per world unit in the 2D view
+
+# 3D HUD
+HUD_FONT_SIZE = 24
+HUD_MARGIN = 10  # pixels from the window edge
+HUD_BAR_SIZE = (200, 16)  # health bar width and height in pixels
+HUD_STATS_INTERVAL = 15  # frames between refreshes of the profiling line
+
+# Gameplay event log
+EVENT_BUFFER_SIZE = 4096  # events the ring holds between dispatches
+EVENT_LOG_FILE = None  # ndjson path (or .bin for raw records) to log events to
+
+# Match telemetry
+TELEMETRY_DIR = None  # directory to record per-tick .npy telemetry into
+TELEMETRY_CHUNK_ROWS = 65536  # rows per mapped window and per file extension
+TELEMETRY_BATCH_TICKS = 256  # ticks staged in memory between copies into the files
+TELEMETRY_FLUSH_INTERVAL = 600  # ticks between header commits
+
+# Heatmaps of occupancy, shots, hits and deaths
+HEATMAP_FILE = None  # .npz file each run's heatmaps are merged into
+HEATMAP_RESOLUTION = 100  # cells per side over WORLD_SIZE
+HEATMAP_BATCH_TICKS = 256  # ticks staged between binning passes
+
+# Audio
+AUDIO_ENABLED = True
+AUDIO_SAMPLE_RATE = 44100
+AUDIO_BUFFER_SIZE = 512  # samples per mixer buffer; smaller plays sooner
+AUDIO_CHANNELS = 16  # voices for effects, plus one reserved for the engine
+AUDIO_MAX_PER_SOUND = 3  # plays of one sound started per tick
+AUDIO_MAX_DISTANCE = 120.0  # sounds further from the player are not played
+AUDIO_FALLOFF_DISTANCE = 20.0  # distance at which a sound is at half volume
+AUDIO_ENGINE_VOLUME = 0.3
+AUDIO_ENGINE_IDLE = 0.3  # engine level when standing still, as a fraction of full
+HEADLESS_AUDIO = False  # mix sound in headless runs; on anyway with SDL_AUDIODRIVER=dummy
+SOUND_FILES = {}  # sound name -> file to decode in place of the built-in sound
+
+# Replay export
+REPLAY_WORKERS = 0  # render processes (0 uses every core)
+REPLAY_SEGMENT_FRAMES = 300  # frames per task handed to a render process
+
+# Memory accounting
+MEMORY_SAMPLE_INTERVAL = 600  # ticks between censuses of live objects
+MEMORY_SNAPSHOT_INTERVAL = 0  # ticks between tracemalloc snapshots (0 disables)
+MEMORY_GROWTH_TICKS = 0  # raise if memory keeps growing across windows this long (0 disables)
+MEMORY_GROWTH_SAMPLES = 8  # censuses per growth window, at least
+MEMORY_TOP_LINES = 10  # source lines listed per snapshot diff
+
+# World regions
+REGION_SIZE = 50.0
+ACTIVE_REGION_RADIUS = 1  # regions around the player simulated in full
+COARSE_REGION_RADIUS = 3  # regions beyond this sleep entirely
+REGION_COARSE_INTERVAL = 8  # frames between coarse updates of a region
+DORMANT_SPEED_FACTOR = 0.5  # coarse enemies close in at this fraction of TANK_SPEED
+ENEMY_GROUPS = 0  # enemy groups scattered over the world at start
+ENEMY_GROUP_SIZE = 4
+
 # Physics
 GRAVITY = -0.01
 FRICTION = 0.95
@@ -56,8 +180,16 @@ SKY_COLOR = [0.5, 0.7, 1.0, 1.0]  # Light blue sky
 GROUND_COLOR = [0.2, 0.8, 0.2, 1.0]  # Green ground
 PLAYER_COLOR = [0.0, 0.6, 0.0, 1.0]   # Dark green player tank
 ENEMY_COLOR = [0.8, 0.0, 0.0, 1.0]    # Red enemy tanks
+ALLY_COLOR = [0.2, 0.4, 0.8, 1.0]     # Blue bot-driven allied tanks
 BULLET_COLOR = [1.0, 1.0, 0.0, 1.0]   # Yellow bullets
 EXPLOSION_COLOR = [1.0, 0.5, 0.0, 1.0]
+OBSTACLE_COLOR = [0.55, 0.5, 0.45, 1.0]  # Stone buildings and rocks
+MUZZLE_FLASH_COLOR = [1.0, 0.9, 0.6, 1.0]
+
+# Particles
+MAX_PARTICLES = 4096
+PARTICLE_SIZE = 4.0  # pixels
+PARTICLE_DRAG = 0.92
 
 # Lighting
 AMBIENT_LIGHT = [0.3, 0.3, 0.3, 1.0]
@@ -0,0 +1,92 @@
+import json
+from collections import namedtuple
+
+# One tick of control for a tank: throttle in [-1, 1], hull and turret turn
+# in {-1, 0, 1}, and whether to fire
+TankCommand = namedtuple('TankCommand', ['throttle', 'turn', 'turret_turn', 'fire'])
+IDLE = TankCommand(0.0, 0, 0, False)
+
+
+def execute_command(tank, command):
+    """Advance a tank one tick under a command; returns the bullet fired, if any"""
+    tank.update(controls=command[:3])
+    if command.fire:
+        return tank.shoot()
+    return None
+
+
+class KeyboardInput:
+    """Reads the held keys into a TankCommand.
+
+    W/S drive, A/D turn the hull, Q/E or the arrow keys turn the turret and
+    space fires. pygame is only needed once a command is actually read.
+    """
+    def command(self, tank, game):
+        """Command for this tick from the current keyboard state"""
+        import pygame
+        keys = pygame.key.get_pressed()
+        throttle = float(keys[pygame.K_w]) - float(keys[pygame.K_s])
+        turn = int(keys[pygame.K_d]) - int(keys[pygame.K_a])
+        turret_turn = (int(keys[pygame.K_e] or keys[pygame.K_RIGHT]) -
+                       int(keys[pygame.K_q] or keys[pygame.K_LEFT]))
+        return TankCommand(throttle, turn, turret_turn, bool(keys[pygame.K_SPACE]))
+
+
+class ScriptedInput:
+    """Plays back a recorded script of commands.
+
+    A script is a list of (tick, TankCommand) changes in tick order; each
+    command holds until the next change. With loop=True the script restarts
+    after its last change.
+    """
+    def __init__(self, changes, loop=False):
+        self.changes = [(int(tick), TankCommand(*command)) for tick, command in changes]
+        self.loop = loop
+        self.length = self.changes[-1][0] + 1 if self.changes else 0
+        self.tick = 0
+        self.index = 0
+        self.current = IDLE
+
+    @classmethod
+    def load(cls, path, loop=False):
+        """Read a script written by CommandRecorder"""
+        changes = []
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    changes.append((record['tick'], record['command']))
+        return cls(changes, loop)
+
+    def command(self, tank, game):
+        """Command for the current script tick"""
+        if self.loop and self.length and self.tick >= self.length:
+            self.tick = 0
+            self.index = 0
+        while self.index < len(self.changes) and self.changes[self.index][0] <= self.tick:
+            self.current = self.changes[self.index][1]
+            self.index += 1
+        self.tick += 1
+        return self.current
+
+
+class CommandRecorder:
+    """Wraps an input source and writes its commands as a replayable script"""
+    def __init__(self, source, path):
+        self.source = source
+        self.file = open(path, 'w')
+        self.tick = 0
+        self.last = None
+
+    def command(self, tank, game):
+        """Pass the wrapped source's command through, recording changes"""
+        command = TankCommand(*self.source.command(tank, game))
+        if command != self.last:
+            self.file.write(json.dumps({'tick': self.tick, 'command': list(command)}) + '\n')
+            self.last = command
+        self.tick += 1
+        return command
+
+    def close(self):
+        """Flush and close the script file"""
+        self.file.close()
@@ -0,0 +1,126 @@
+from OpenGL.GL import *
+from OpenGL.raw.GL.VERSION.GL_3_3 import glGetQueryObjectui64v
+from collections import deque
+import ctypes
+from utils.constants import *
+
+
+class DynamicResolution:
+    """Renders the 3D scene into an offscreen framebuffer whose size follows frame time"""
+    def __init__(self, width, height, target_frame_ms=TARGET_FRAME_TIME_MS):
+        self.width = width
+        self.height = height
+        self.target_frame_ms = target_frame_ms
+        self.scale = 1.0
+        self.min_scale = MIN_RENDER_SCALE
+        self.max_scale = 1.0
+
+        # Rolling frame-time window; the scale only moves once it is full
+        self.frame_times = deque(maxlen=RESOLUTION_SAMPLE_FRAMES)
+        self.gpu_frame_ms = 0.0
+
+        self.create_framebuffer()
+        self.create_timer_queries()
+
+    def create_framebuffer(self):
+        """Allocate a window-sized color and depth target once"""
+        self.fbo = glGenFramebuffers(1)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
+
+        self.color_texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.color_texture)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA8, self.width, self.height, 0,
+                     GL_RGBA, GL_UNSIGNED_BYTE, None)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        glFramebufferTexture2D(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_TEXTURE_2D,
+                               self.color_texture, 0)
+
+        self.depth_buffer = glGenRenderbuffers(1)
+        glBindRenderbuffer(GL_RENDERBUFFER, self.depth_buffer)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH_COMPONENT24, self.width, self.height)
+        glBindRenderbuffer(GL_RENDERBUFFER, 0)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT, GL_RENDERBUFFER,
+                                  self.depth_buffer)
+
+        status = glCheckFramebufferStatus(GL_FRAMEBUFFER)
+        glBindFramebuffer(GL_FRAMEBUFFER, 0)
+        if status != GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError(f"Framebuffer incomplete (status {status})")
+
+    def create_timer_queries(self):
+        """Set up GPU timer queries, alternating so results are read a frame late"""
+        try:
+            self.queries = list(glGenQueries(2))
+        except Exception:
+            self.queries = None
+        self.query_index = 0
+        self.query_pending = [False, False]
+        self.query_active = False
+
+    @property
+    def render_size(self):
+        """Size of the region of the framebuffer drawn this frame"""
+        return (max(1, int(self.width * self.scale)), max(1, int(self.height * self.scale)))
+
+    def set_scale(self, scale):
+        """Force a resolution scale, clamped to the allowed range"""
+        self.scale = max(self.min_scale, min(self.max_scale, scale))
+        self.frame_times.clear()
+
+    def begin(self):
+        """Redirect rendering into the scaled framebuffer region"""
+        if self.queries:
+            self.read_gpu_time()
+        self.query_active = bool(self.queries)
+        if self.query_active:
+            glBeginQuery(GL_TIME_ELAPSED, self.queries[self.query_index])
+
+        glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
+        glViewport(0, 0, *self.render_size)
+
+    def end(self):
+        """Upscale the rendered region to the window"""
+        render_width, render_height = self.render_size
+        glBindFramebuffer(GL_READ_FRAMEBUFFER, self.fbo)
+        glBindFramebuffer(GL_DRAW_FRAMEBUFFER, 0)
+        glBlitFramebuffer(0, 0, render_width, render_height,
+                          0, 0, self.width, self.height,
+                          GL_COLOR_BUFFER_BIT, GL_LINEAR)
+        glBindFramebuffer(GL_FRAMEBUFFER, 0)
+        glViewport(0, 0, self.width, self.height)
+
+        if self.query_active:
+            glEndQuery(GL_TIME_ELAPSED)
+            self.query_pending[self.query_index] = True
+            self.query_index = 1 - self.query_index
+
+    def read_gpu_time(self):
+        """Collect the previous frame's GPU time if the query has finished"""
+        index = self.query_index
+        if not self.query_pending[index]:
+            return
+        if glGetQueryObjectiv(self.queries[index], GL_QUERY_RESULT_AVAILABLE):
+            elapsed_ns = ctypes.c_uint64()
+            glGetQueryObjectui64v(self.queries[index], GL_QUERY_RESULT, ctypes.byref(elapsed_ns))
+            self.query_pending[index] = False
+
+            # Software rasterizers report nonsense here; fall back to CPU timing
+            if elapsed_ns.value > 1e9:
+                self.queries = None
+                self.gpu_frame_ms = 0.0
+                return
+            self.gpu_frame_ms = elapsed_ns.value / 1e6
+
+    def record_frame(self, cpu_frame_ms):
+        """Feed one frame's time and adjust the scale outside the hysteresis band"""
+        self.frame_times.append(max(cpu_frame_ms, self.gpu_frame_ms))
+        if len(self.frame_times) < self.frame_times.maxlen:
+            return
+
+        average = sum(self.frame_times) / len(self.frame_times)
+        if average > self.target_frame_ms * RESOLUTION_DOWNSCALE_THRESHOLD:
+            self.set_scale(self.scale - RESOLUTION_SCALE_STEP)
+        elif average < self.target_frame_ms * RESOLUTION_UPSCALE_THRESHOLD:
+            self.set_scale(self.scale + RESOLUTION_SCALE_STEP)
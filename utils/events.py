@@ -0,0 +1,173 @@
+import json
+import queue
+import threading
+from array import array
+from collections import namedtuple
+from utils.constants import *
+
+# Needs only the standard library, so the dependency-free text demo can use it
+
+# Event kinds
+SHOT = 0
+HIT = 1
+KILL = 2
+SPAWN = 3
+DEATH = 4
+EVENT_NAMES = ('shot', 'hit', 'kill', 'spawn', 'death')
+
+# Every event is one fixed-size record of doubles. source and target are
+# ids chosen by the emitter; value is the damage, score or distance the
+# event carries.
+FIELDS = ('tick', 'kind', 'x', 'y', 'z', 'source', 'target', 'value')
+RECORD_SIZE = len(FIELDS)
+Event = namedtuple('Event', FIELDS)
+
+
+def iter_events(batch):
+    """Event tuples from a flat batch of records"""
+    for i in range(0, len(batch), RECORD_SIZE):
+        tick, kind, x, y, z, source, target, value = batch[i:i + RECORD_SIZE]
+        yield Event(int(tick), int(kind), x, y, z, int(source), int(target), value)
+
+
+def event_to_json(event):
+    """One ndjson line for an Event"""
+    record = event._asdict()
+    record['kind'] = EVENT_NAMES[event.kind]
+    return json.dumps(record)
+
+
+def load_events(path):
+    """Every Event in a log written by EventWriter, in either format"""
+    if path.endswith('.bin'):
+        batch = array('d')
+        with open(path, 'rb') as f:
+            batch.frombytes(f.read())
+        return list(iter_events(batch))
+    events = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                record['kind'] = EVENT_NAMES.index(record['kind'])
+                events.append(Event(**record))
+    return events
+
+
+class EventWriter:
+    """Appends event batches to a file on a background thread.
+
+    Paths ending in .bin get raw float64 records; anything else gets one
+    JSON object per line. The thread drains every queued batch before each
+    write, so a burst of ticks costs one write.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.binary = path.endswith('.bin')
+        self.file = open(path, 'wb' if self.binary else 'w')
+        self.batches = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self.run, name='event-writer', daemon=True)
+        self.thread.start()
+
+    def put(self, batch):
+        """Queue a batch for writing; never blocks"""
+        self.batches.put(batch)
+
+    def run(self):
+        while True:
+            batches = [self.batches.get()]
+            while not self.batches.empty():
+                batches.append(self.batches.get())
+            stop = batches[-1] is None
+            if stop:
+                batches.pop()
+            if self.binary:
+                for batch in batches:
+                    batch.tofile(self.file)
+            else:
+                self.file.write(''.join(event_to_json(event) + '\n'
+                                        for batch in batches for event in iter_events(batch)))
+            if stop:
+                break
+        self.file.close()
+
+    def close(self):
+        """Write everything queued and close the file"""
+        self.batches.put(None)
+        self.thread.join()
+
+
+class EventBus:
+    """Typed gameplay events, recorded cheaply and handed on once per tick.
+
+    emit() stores a record in a preallocated ring buffer and does no I/O.
+    end_tick() passes the tick's records as one flat array to every
+    subscriber and to the log writer, if one is open. A tick that emits more
+    than the ring holds loses its oldest events, counted in dropped.
+    """
+    def __init__(self, capacity=EVENT_BUFFER_SIZE, path=None):
+        self.capacity = capacity
+        self.buffer = array('d', bytes(8 * capacity * RECORD_SIZE))
+        self.head = 0
+        self.dispatched = 0
+        self.tick = 0
+        self.dropped = 0
+        self.subscribers = []
+        self.writer = None
+        if path:
+            self.log_to(path)
+
+    def subscribe(self, callback):
+        """Call callback(batch) at the end of every tick that had events"""
+        self.subscribers.append(callback)
+
+    def log_to(self, path):
+        """Write every event from now on to path"""
+        if self.writer:
+            self.writer.close()
+        self.writer = EventWriter(path)
+
+    def emit(self, kind, x=0.0, y=0.0, z=0.0, source=-1, target=-1, value=0.0):
+        """Record one event for this tick"""
+        i = (self.head % self.capacity) * RECORD_SIZE
+        buffer = self.buffer
+        buffer[i] = self.tick
+        buffer[i + 1] = kind
+        buffer[i + 2] = x
+        buffer[i + 3] = y
+        buffer[i + 4] = z
+        buffer[i + 5] = source
+        buffer[i + 6] = target
+        buffer[i + 7] = value
+        self.head += 1
+
+    def emit_at(self, kind, position, source=-1, target=-1, value=0.0):
+        """emit() at a Vector3 position"""
+        self.emit(kind, position.x, position.y, position.z, source, target, value)
+
+    def end_tick(self):
+        """Dispatch this tick's events in one batch and start the next tick"""
+        pending = self.head - self.dispatched
+        if pending > self.capacity:
+            self.dropped += pending - self.capacity
+            pending = self.capacity
+        if pending:
+            start = (self.head - pending) % self.capacity * RECORD_SIZE
+            end = self.head % self.capacity * RECORD_SIZE
+            if start < end:
+                batch = self.buffer[start:end]
+            else:
+                batch = self.buffer[start:] + self.buffer[:end]
+            for callback in self.subscribers:
+                callback(batch)
+            if self.writer:
+                self.writer.put(batch)
+        self.dispatched = self.head
+        self.tick += 1
+
+    def close(self):
+        """Dispatch anything left and finish writing the log"""
+        self.end_tick()
+        if self.writer:
+            self.writer.close()
+            self.writer = None
@@ -0,0 +1,149 @@
+import os
+import struct
+import zlib
+from array import array
+import numpy as np
+from utils.constants import *
+from utils.events import RECORD_SIZE, SHOT, HIT, KILL, DEATH
+
+# Accumulated layers; kills and deaths both count as deaths
+LAYERS = ('occupancy', 'shots', 'hits', 'deaths')
+OCCUPANCY, SHOTS, HITS, DEATHS = range(len(LAYERS))
+EVENT_LAYERS = {SHOT: SHOTS, HIT: HITS, KILL: DEATHS, DEATH: DEATHS}
+
+# Black through red and yellow to white
+HEAT_COLORS = np.array([(0, 0, 0), (128, 0, 0), (255, 64, 0), (255, 200, 0), (255, 255, 255)], dtype=np.float64)
+
+
+def heat_image(grid):
+    """(rows, columns, 3) uint8 heat colors for a count grid, on a log scale"""
+    scaled = np.log1p(grid.astype(np.float64))
+    if scaled.max() > 0:
+        scaled /= scaled.max()
+    position = scaled * (len(HEAT_COLORS) - 1)
+    low = np.minimum(position.astype(int), len(HEAT_COLORS) - 2)
+    blend = (position - low)[..., None]
+    return (HEAT_COLORS[low] * (1 - blend) + HEAT_COLORS[low + 1] * blend).astype(np.uint8)
+
+
+def write_image(path, image):
+    """Save an (rows, columns, 3) uint8 image as .ppm, or .png for any other path"""
+    rows, columns, _ = image.shape
+    if path.endswith('.ppm'):
+        with open(path, 'wb') as f:
+            f.write(b"P6\n%d %d\n255\n" % (columns, rows))
+            f.write(np.ascontiguousarray(image).tobytes())
+        return
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    # Each scanline starts with filter type 0
+    scanlines = np.zeros((rows, columns * 3 + 1), dtype=np.uint8)
+    scanlines[:, 1:] = image.reshape(rows, -1)
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', columns, rows, 8, 2, 0, 0, 0)))
+        f.write(chunk(b'IDAT', zlib.compress(scanlines.tobytes())))
+        f.write(chunk(b'IEND', b''))
+
+
+class Heatmaps:
+    """Where tanks drive, shoot, hit and die, as count grids over the world.
+
+    grids is (len(LAYERS), resolution, resolution) with rows along z and
+    columns along x. Positions are staged as they arrive and binned with
+    one bincount per layer every batch_ticks ticks, so per-tick cost is an
+    array append. Grids from separate runs add up with merge().
+    """
+    def __init__(self, resolution=HEATMAP_RESOLUTION, world_size=WORLD_SIZE, batch_ticks=HEATMAP_BATCH_TICKS):
+        self.resolution = resolution
+        self.world_size = world_size
+        self.batch_ticks = batch_ticks
+        self.counts = np.zeros((len(LAYERS), resolution, resolution), dtype=np.int64)
+        self.pending = [array('d') for _ in LAYERS]  # interleaved x, z per layer
+        self.ticks = 0
+
+    @property
+    def grids(self):
+        """The count grids, with everything staged so far binned"""
+        self.bin_pending()
+        return self.counts
+
+    def add(self, layer, xs, zs):
+        """Count world positions into a layer; positions off the map are ignored"""
+        scale = self.resolution / self.world_size
+        columns = (np.asarray(xs, dtype=np.float64) + self.world_size / 2) * scale
+        rows = (np.asarray(zs, dtype=np.float64) + self.world_size / 2) * scale
+        # Tanks are clamped onto the map's far edges, so those count as inside
+        inside = (columns >= 0) & (columns <= self.resolution) & (rows >= 0) & (rows <= self.resolution)
+        last = self.resolution - 1
+        cells = (np.minimum(rows[inside].astype(np.int64), last) * self.resolution
+                 + np.minimum(columns[inside].astype(np.int64), last))
+        self.counts[layer] += np.bincount(cells, minlength=self.resolution ** 2).reshape(
+            self.resolution, self.resolution)
+
+    def bin_pending(self):
+        """Bin every staged position into the grids"""
+        for layer, pending in enumerate(self.pending):
+            if pending:
+                points = np.frombuffer(pending, dtype=np.float64).reshape(-1, 2)
+                self.add(layer, points[:, 0], points[:, 1])
+                del points
+                del pending[:]
+
+    def record_tanks(self, tanks):
+        """Stage one tick of tank positions into the occupancy layer"""
+        pending = self.pending[OCCUPANCY]
+        for tank in tanks:
+            pending.extend((tank.position.x, tank.position.z))
+        self.ticks += 1
+        if self.ticks % self.batch_ticks == 0:
+            self.bin_pending()
+
+    def record_events(self, batch):
+        """EventBus subscriber: stage shot, hit, kill and death positions"""
+        records = np.frombuffer(batch, dtype=np.float64).reshape(-1, RECORD_SIZE)
+        kinds = records[:, 1]
+        for kind, layer in EVENT_LAYERS.items():
+            matching = records[kinds == kind]
+            if len(matching):
+                self.pending[layer].extend(matching[:, [2, 4]].ravel().tolist())
+
+    def merge(self, other):
+        """Add another run's grids into these"""
+        if other.counts.shape != self.counts.shape or other.world_size != self.world_size:
+            raise ValueError("Heatmaps cover different grids")
+        self.grids[:] += other.grids
+        self.ticks += other.ticks
+        return self
+
+    def save(self, path):
+        """Write the grids to an .npz file"""
+        layers = {name: grid for name, grid in zip(LAYERS, self.grids)}
+        np.savez(path, world_size=self.world_size, ticks=self.ticks, **layers)
+
+    @classmethod
+    def load(cls, path):
+        """Heatmaps saved by save()"""
+        with np.load(path) as data:
+            heatmaps = cls(data[LAYERS[0]].shape[0], float(data['world_size']))
+            heatmaps.counts[:] = [data[name] for name in LAYERS]
+            heatmaps.ticks = int(data['ticks'])
+        return heatmaps
+
+    def accumulate_into(self, path):
+        """Merge these grids into the file at path, creating it if needed"""
+        total = Heatmaps.load(path).merge(self) if os.path.exists(path) else self
+        total.save(path)
+        return total
+
+    def export_images(self, directory, extension='png'):
+        """One heat image per layer, named after the layer; returns the paths"""
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for name, grid in zip(LAYERS, self.grids):
+            path = os.path.join(directory, f"{name}.{extension}")
+            write_image(path, heat_image(grid))
+            paths.append(path)
+        return paths
@@ -0,0 +1,218 @@
+import ctypes
+import pygame
+import numpy as np
+from OpenGL.GL import *
+from utils.constants import *
+
+FIRST_GLYPH = 32  # space
+LAST_GLYPH = 126  # tilde
+SOLID = LAST_GLYPH - FIRST_GLYPH + 1  # atlas cell filled with opaque white, for bars
+ATLAS_COLUMNS = 16
+# Interleaved vertex layout: x, y, u, v, r, g, b, a as float32
+VERTEX_FLOATS = 8
+VERTEX_STRIDE = VERTEX_FLOATS * 4
+
+
+def to_float_color(color):
+    """0-1 RGBA for a 0-255 RGB tuple"""
+    return tuple(c / 255 for c in color[:3]) + (1.0,)
+
+
+def format_stats(stats):
+    """One line of profiling figures from a dict of label -> value"""
+    return '  '.join(f"{label} {value:.2f}" if isinstance(value, float) else f"{label} {value}"
+                     for label, value in stats.items())
+
+
+class GlyphAtlas:
+    """Printable ASCII rendered once into a single texture.
+
+    uvs holds (u0, v0, u1, v1) per glyph and sizes its pixel width and
+    height, indexed by character code minus FIRST_GLYPH. The extra SOLID
+    entry is an opaque white block used to draw bars from the same texture.
+    """
+    def __init__(self, font_size=HUD_FONT_SIZE):
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = pygame.font.Font(None, font_size)
+        glyphs = [font.render(chr(code), True, WHITE) for code in range(FIRST_GLYPH, LAST_GLYPH + 1)]
+        self.line_height = font.get_linesize()
+
+        # One padded cell per glyph so neighbours never bleed into each other
+        cell_width = max(glyph.get_width() for glyph in glyphs) + 2
+        cell_height = max(glyph.get_height() for glyph in glyphs) + 2
+        rows = -(-(len(glyphs) + 1) // ATLAS_COLUMNS)
+        self.width = ATLAS_COLUMNS * cell_width
+        self.height = rows * cell_height
+        surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        surface.fill((255, 255, 255, 0))
+
+        self.uvs = np.zeros((SOLID + 1, 4), dtype=np.float32)
+        self.sizes = np.zeros((SOLID + 1, 2), dtype=np.float32)
+        for index, glyph in enumerate(glyphs):
+            x = (index % ATLAS_COLUMNS) * cell_width + 1
+            y = (index // ATLAS_COLUMNS) * cell_height + 1
+            surface.blit(glyph, (x, y))
+            width, height = glyph.get_size()
+            self.uvs[index] = (x, y, x + width, y + height)
+            self.sizes[index] = (width, height)
+
+        # Sample only the middle of the solid cell so bar edges stay crisp
+        x = (SOLID % ATLAS_COLUMNS) * cell_width
+        y = (SOLID // ATLAS_COLUMNS) * cell_height
+        surface.fill((255, 255, 255, 255), (x, y, cell_width, cell_height))
+        self.uvs[SOLID] = (x + cell_width / 2, y + cell_height / 2) * 2
+        self.sizes[SOLID] = (cell_width, cell_height)
+        self.uvs /= (self.width, self.height, self.width, self.height)
+
+        # Row 0 of the texture is the top of the surface, matching the
+        # HUD's top-left origin
+        pixels = pygame.image.tostring(surface, 'RGBA')
+        self.texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, self.width, self.height, 0,
+                     GL_RGBA, GL_UNSIGNED_BYTE, pixels)
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+    def glyph_indices(self, text):
+        """Atlas indices for a string; unprintable characters become '?'"""
+        codes = np.frombuffer(text.encode('ascii', 'replace'), dtype=np.uint8).astype(np.int64)
+        codes[(codes < FIRST_GLYPH) | (codes > LAST_GLYPH)] = ord('?')
+        return codes - FIRST_GLYPH
+
+
+class HUD:
+    """Heads-up display drawn over the 3D view in one draw call.
+
+    Text and bars are quads into a GlyphAtlas, built into a single vertex
+    buffer. The buffer is rebuilt and uploaded only when a displayed value
+    changes; every other frame just redraws it. Profiling figures are
+    sampled every HUD_STATS_INTERVAL frames so they stay readable and do
+    not force a rebuild each frame.
+    """
+    def __init__(self, width, height, font_size=HUD_FONT_SIZE):
+        self.width = width
+        self.height = height
+        self.atlas = GlyphAtlas(font_size)
+        self.buffer = glGenBuffers(1)
+        self.vertex_count = 0
+        self.key = None
+        self.quads = []
+        self.frame = 0
+        self.stats_text = ''
+        self.rebuilds = 0
+
+    def update(self, health_ratio, score, enemies, game_over, stats=None):
+        """Take this frame's values; returns True if the vertex buffer was rebuilt"""
+        if stats is not None and self.frame % HUD_STATS_INTERVAL == 0:
+            self.stats_text = format_stats(stats)
+        self.frame += 1
+
+        bar_width, _ = HUD_BAR_SIZE
+        key = (round(max(0.0, min(1.0, health_ratio)) * bar_width), score, enemies,
+               game_over, self.stats_text)
+        if key == self.key:
+            return False
+        self.key = key
+        self.build(*key)
+        return True
+
+    def build(self, health_width, score, enemies, game_over, stats_text):
+        """Lay out every element and upload the vertices"""
+        self.quads = []
+        bar_width, bar_height = HUD_BAR_SIZE
+        line = self.atlas.line_height
+        self.add_bar(HUD_MARGIN, HUD_MARGIN, bar_width, bar_height, RED)
+        self.add_bar(HUD_MARGIN, HUD_MARGIN, health_width, bar_height, GREEN)
+        top = HUD_MARGIN + bar_height + 6
+        self.add_text(HUD_MARGIN, top, f"Score: {score}", WHITE)
+        self.add_text(HUD_MARGIN, top + line, f"Enemies: {enemies}", WHITE)
+        if stats_text:
+            self.add_text(HUD_MARGIN, self.height - HUD_MARGIN - line, stats_text, YELLOW)
+        if game_over:
+            self.add_text_centered(self.height // 2 - line * 2, "GAME OVER", RED, 3)
+            self.add_text_centered(self.height // 2 + line, "Press R to restart", WHITE)
+
+        vertices = np.concatenate(self.quads) if self.quads else np.zeros((0, VERTEX_FLOATS), np.float32)
+        self.vertex_count = len(vertices)
+        glBindBuffer(GL_ARRAY_BUFFER, self.buffer)
+        glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_DYNAMIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self.rebuilds += 1
+
+    def add_quads(self, left, top, width, height, indices, color):
+        """Append one quad per glyph index, corners in GL_QUADS order"""
+        uvs = self.atlas.uvs[indices]
+        quads = np.empty((len(indices), 4, VERTEX_FLOATS), dtype=np.float32)
+        right = left + width
+        bottom = top + height
+        for corner, (x, y, u, v) in enumerate(((left, top, 0, 1), (right, top, 2, 1),
+                                               (right, bottom, 2, 3), (left, bottom, 0, 3))):
+            quads[:, corner, 0] = x
+            quads[:, corner, 1] = y
+            quads[:, corner, 2] = uvs[:, u]
+            quads[:, corner, 3] = uvs[:, v]
+        quads[:, :, 4:] = to_float_color(color)
+        self.quads.append(quads.reshape(-1, VERTEX_FLOATS))
+
+    def add_bar(self, left, top, width, height, color):
+        if width > 0:
+            self.add_quads(np.array([left]), top, np.array([width]), height, np.array([SOLID]), color)
+
+    def text_width(self, text, scale=1):
+        return float(self.atlas.sizes[self.atlas.glyph_indices(text), 0].sum()) * scale
+
+    def add_text(self, left, top, text, color, scale=1):
+        indices = self.atlas.glyph_indices(text)
+        if len(indices) == 0:
+            return
+        widths = self.atlas.sizes[indices, 0] * scale
+        lefts = left + np.cumsum(widths) - widths
+        self.add_quads(lefts, top, widths, self.atlas.sizes[indices, 1] * scale, indices, color)
+
+    def add_text_centered(self, top, text, color, scale=1):
+        self.add_text((self.width - self.text_width(text, scale)) / 2, top, text, color, scale)
+
+    def draw(self):
+        """Draw the current vertex buffer over whatever is on screen"""
+        if self.vertex_count == 0:
+            return
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        glOrtho(0, self.width, self.height, 0, -1, 1)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+        glPushAttrib(GL_ENABLE_BIT | GL_COLOR_BUFFER_BIT)
+
+        glDisable(GL_LIGHTING)
+        glDisable(GL_DEPTH_TEST)
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glEnable(GL_TEXTURE_2D)
+        glBindTexture(GL_TEXTURE_2D, self.atlas.texture)
+        glTexEnvi(GL_TEXTURE_ENV, GL_TEXTURE_ENV_MODE, GL_MODULATE)
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.buffer)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(2, GL_FLOAT, VERTEX_STRIDE, ctypes.c_void_p(0))
+        glTexCoordPointer(2, GL_FLOAT, VERTEX_STRIDE, ctypes.c_void_p(8))
+        glColorPointer(4, GL_FLOAT, VERTEX_STRIDE, ctypes.c_void_p(16))
+        glDrawArrays(GL_QUADS, 0, self.vertex_count)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+        glPopAttrib()
+        glPopMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
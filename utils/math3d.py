@@ -86,4 +86,16 @@ def angle_to_target(from_pos, to_pos):
     """Calculate angle to turn towards target"""
     dx = to_pos.x - from_pos.x
     dz = to_pos.z - from_pos.z
-    return math.atan2(dx, dz)
\ No newline at end of file
+    return math.atan2(dx, dz)
+
+def look_at_matrix(eye, target, up):
+    """Create a view matrix equivalent to gluLookAt"""
+    forward = (target - eye).normalize()
+    side = forward.cross(up).normalize()
+    true_up = side.cross(forward)
+    return np.array([
+        [side.x, side.y, side.z, -side.dot(eye)],
+        [true_up.x, true_up.y, true_up.z, -true_up.dot(eye)],
+        [-forward.x, -forward.y, -forward.z, forward.dot(eye)],
+        [0, 0, 0, 1]
+    ])
@@ -0,0 +1,164 @@
+import gc
+import sys
+import tracemalloc
+from utils.constants import *
+
+
+def instance_bytes(obj):
+    """Shallow size of an object plus its attribute dict"""
+    size = sys.getsizeof(obj)
+    attributes = getattr(obj, '__dict__', None)
+    if attributes is not None:
+        size += sys.getsizeof(attributes)
+    return size
+
+
+def live_objects(types):
+    """Count and estimated bytes of every live instance of each type, by name
+
+    Walks every object the garbage collector tracks, so it finds instances
+    held anywhere, not just in the game's lists. Subclasses count under
+    their own name only.
+    """
+    wanted = {cls: cls.__name__ for cls in types}
+    counts = dict.fromkeys(wanted.values(), 0)
+    sizes = {}
+    for obj in gc.get_objects():
+        name = wanted.get(type(obj))
+        if name:
+            counts[name] += 1
+            if name not in sizes:
+                sizes[name] = instance_bytes(obj)
+    return {name: (count, count * sizes.get(name, 0)) for name, count in counts.items()}
+
+
+def game_containers(game):
+    """Length and bytes of the game's entity containers, by name"""
+    containers = {name: getattr(game, name) for name in ('allies', 'enemies', 'bullets')}
+    sizes = {name: (len(items), sys.getsizeof(items)) for name, items in containers.items()}
+    particles = game.particles
+    sizes['particles'] = (len(particles.alive_indices()),
+                          sum(array.nbytes for array in vars(particles).values() if hasattr(array, 'nbytes')))
+    sizes['dormant'] = (game.regions.dormant_count(), 0)
+    return sizes
+
+
+def format_bytes(size):
+    for unit in ('B', 'KiB', 'MiB'):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+class MemoryMonitor:
+    """Counts what a running game keeps alive and watches it for growth.
+
+    Every interval ticks update() takes a census: live Tank, Enemy, Bullet
+    and Vector3 objects found through the garbage collector, and the
+    lengths and sizes of the game's containers. Each figure keeps its
+    high-water mark. With snapshot_interval set, tracemalloc snapshots are
+    taken that often and diffed against the previous one by source line.
+
+    With growth_ticks set, censuses run at least MEMORY_GROWTH_SAMPLES
+    times per window of growth_ticks ticks, and the censuses of each window
+    are compared with the one before it. When anything's smallest value in a
+    window is above its largest in the one before, its floor is rising;
+    if it rises in two windows running, an AssertionError is raised.
+    Churn like bullets coming and going never trips it, nor does a cache
+    filling once, but a leak that never gives memory back does.
+    """
+    def __init__(self, interval=MEMORY_SAMPLE_INTERVAL, snapshot_interval=MEMORY_SNAPSHOT_INTERVAL,
+                 growth_ticks=MEMORY_GROWTH_TICKS, top_lines=MEMORY_TOP_LINES):
+        from entities.bullet import Bullet
+        from entities.enemy import Enemy
+        from entities.tank import Tank
+        from utils.math3d import Vector3
+        self.types = (Tank, Enemy, Bullet, Vector3)
+        # Growth windows need several censuses each to tell churn from a rising floor
+        self.interval = min(interval, max(1, growth_ticks // MEMORY_GROWTH_SAMPLES)) if growth_ticks else interval
+        self.snapshot_interval = snapshot_interval
+        self.growth_ticks = growth_ticks
+        self.top_lines = top_lines
+        self.tick = 0
+        self.latest = {}
+        self.high_water = {}  # name -> (count, bytes, tick)
+        self.window = {}  # name -> (lowest, highest) count in this growth window
+        self.previous_window = None
+        self.rising = set()
+        self.window_start = 0
+        self.snapshot = None
+        self.snapshot_diffs = []
+        if snapshot_interval and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def update(self, game):
+        """Count one tick, taking a census or snapshot when one is due"""
+        self.tick += 1
+        if self.tick % self.interval == 0:
+            self.sample(game)
+        if self.snapshot_interval and self.tick % self.snapshot_interval == 0:
+            self.take_snapshot()
+
+    def sample(self, game):
+        """Take a census now, update the high-water marks and check for growth"""
+        census = live_objects(self.types)
+        census.update(game_containers(game))
+        if tracemalloc.is_tracing():
+            # Counted in bytes, so the growth check watches total traced memory
+            traced = tracemalloc.get_traced_memory()[0]
+            census['traced'] = (traced, traced)
+        self.latest = census
+        for name, (count, size) in census.items():
+            mark = self.high_water.get(name)
+            if mark is None:
+                self.high_water[name] = (count, size, self.tick)
+            elif count > mark[0] or size > mark[1]:
+                self.high_water[name] = (max(count, mark[0]), max(size, mark[1]), self.tick)
+            lowest, highest = self.window.get(name, (count, count))
+            self.window[name] = (min(lowest, count), max(highest, count))
+        if self.growth_ticks and self.tick - self.window_start >= self.growth_ticks:
+            self.check_growth()
+        return census
+
+    def check_growth(self):
+        """Close the growth window, raising if any floor rose past the last window's peak"""
+        rising = set()
+        growing = []
+        if self.previous_window:
+            for name, (lowest, _) in self.window.items():
+                previous = self.previous_window.get(name)
+                if previous and lowest > previous[1]:
+                    rising.add(name)
+                    if name in self.rising:
+                        growing.append(f"{name} {previous[1]} -> {lowest}")
+        self.rising = rising
+        self.previous_window = self.window
+        self.window = {}
+        self.window_start = self.tick
+        if growing:
+            raise AssertionError(f"Memory kept growing over windows of {self.growth_ticks} ticks "
+                                 f"to tick {self.tick}: " + ', '.join(growing))
+
+    def take_snapshot(self):
+        """Snapshot traced allocations and keep the top changes since the last one"""
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ])
+        if self.snapshot is not None:
+            self.snapshot_diffs = snapshot.compare_to(self.snapshot, 'lineno')[:self.top_lines]
+        self.snapshot = snapshot
+        return self.snapshot_diffs
+
+    def report(self):
+        """Text report of the latest census, high-water marks and allocation changes"""
+        lines = [f"Memory after {self.tick} ticks (now / high-water):"]
+        for name, (count, size) in self.latest.items():
+            peak_count, peak_size, tick = self.high_water[name]
+            lines.append(f"  {name:<10} {count:>7} {format_bytes(size):>10}   "
+                         f"{peak_count:>7} {format_bytes(peak_size):>10} at tick {tick}")
+        if self.snapshot_diffs:
+            lines.append("Largest allocation changes since the previous snapshot:")
+            lines += [f"  {stat}" for stat in self.snapshot_diffs]
+        return '\n'.join(lines)
@@ -0,0 +1,144 @@
+import math
+import numpy as np
+from utils.constants import *
+
+# 8-connected neighbourhood as (di, dj) cell offsets along x and z
+NEIGHBOR_OFFSETS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+NEIGHBOR_COSTS = np.array([math.hypot(di, dj) for di, dj in NEIGHBOR_OFFSETS], dtype=np.float32)
+NEIGHBOR_DIRECTIONS = np.array(
+    [(di / cost, dj / cost) for (di, dj), cost in zip(NEIGHBOR_OFFSETS, NEIGHBOR_COSTS)],
+    dtype=np.float32
+)
+
+
+class NavigationGrid:
+    """Obstacle grid over the world with one shared flow field toward a goal.
+
+    The field is a distance-to-goal map relaxed with whole-grid NumPy sweeps.
+    Relaxation only ever lowers values, so every finite value must stay a
+    real path length. When the goal moves, the old field plus the old
+    field's distance from the new goal to the old one keeps that true, so
+    relaxation restarts from it instead of from scratch and only a bounded
+    number of sweeps run per update.
+    """
+    def __init__(self, world_size=WORLD_SIZE, cell_size=NAV_CELL_SIZE):
+        self.world_half = world_size / 2
+        self.cell_size = max(cell_size, world_size / NAV_MAX_RESOLUTION)
+        self.size = int(math.ceil(world_size / self.cell_size))
+
+        self.blocked = np.zeros((self.size, self.size), dtype=bool)
+        self.distance = np.full((self.size, self.size), np.inf, dtype=np.float32)
+        self.directions = np.zeros((self.size, self.size, 2), dtype=np.float32)
+
+        self.goal_cell = None
+        self.converged = True
+        self.ticks_until_update = 0
+
+    def cell_of(self, x, z):
+        """Grid cell containing a world position"""
+        i = int((x + self.world_half) / self.cell_size)
+        j = int((z + self.world_half) / self.cell_size)
+        return (min(max(i, 0), self.size - 1), min(max(j, 0), self.size - 1))
+
+    def cells_of(self, xs, zs):
+        """Vectorized cell_of for arrays of positions"""
+        i = ((np.asarray(xs) + self.world_half) / self.cell_size).astype(np.intp)
+        j = ((np.asarray(zs) + self.world_half) / self.cell_size).astype(np.intp)
+        return np.clip(i, 0, self.size - 1), np.clip(j, 0, self.size - 1)
+
+    def block_box(self, x, z, half_x, half_z):
+        """Mark every cell overlapping an axis-aligned box as impassable"""
+        i0, j0 = self.cell_of(x - half_x, z - half_z)
+        i1, j1 = self.cell_of(x + half_x, z + half_z)
+        self.blocked[i0:i1 + 1, j0:j1 + 1] = True
+        self.reset_field()
+
+    def block_circle(self, x, z, radius):
+        """Mark every cell whose centre lies within a circle as impassable"""
+        centers = (np.arange(self.size) + 0.5) * self.cell_size - self.world_half
+        dx = centers[:, None] - x
+        dz = centers[None, :] - z
+        reach = radius + self.cell_size * 0.5
+        self.blocked |= dx * dx + dz * dz <= reach * reach
+        self.reset_field()
+
+    def reset_field(self):
+        """Forget the current field; the next update rebuilds it from the goal"""
+        self.distance[:] = np.inf
+        if self.goal_cell is not None:
+            self.distance[self.goal_cell] = 0.0
+        self.converged = False
+
+    def set_goal(self, cell):
+        """Move the goal, warm-starting the field from the previous one"""
+        if cell == self.goal_cell:
+            return
+        # Any path to the old goal, continued along the path the old field has
+        # from the new goal back to it, is a real path to the new goal. So the
+        # old field plus its value at the new goal is an upper bound, provided
+        # that value is known and the old goal is passable. A straight-line
+        # move distance is not: paths bend around obstacles.
+        step = self.distance[cell] if self.goal_cell is not None else np.inf
+        if np.isfinite(step) and not self.blocked[self.goal_cell]:
+            self.distance += step
+        else:
+            self.distance[:] = np.inf
+        self.goal_cell = cell
+        self.distance[cell] = 0.0
+        self.converged = False
+
+    def neighbor_distances(self):
+        """Stack of (8, size, size) distances of each cell's neighbours"""
+        padded = np.pad(self.distance, 1, constant_values=np.inf)
+        return np.stack([
+            padded[1 + di:1 + di + self.size, 1 + dj:1 + dj + self.size]
+            for di, dj in NEIGHBOR_OFFSETS
+        ])
+
+    def relax(self, max_sweeps):
+        """Run up to max_sweeps relaxation passes; stop early once stable"""
+        costs = NEIGHBOR_COSTS[:, None, None]
+        for _ in range(max_sweeps):
+            candidate = (self.neighbor_distances() + costs).min(axis=0)
+            candidate[self.blocked] = np.inf
+            candidate[self.goal_cell] = 0.0
+            improved = candidate < self.distance
+            if not improved.any():
+                self.converged = True
+                break
+            np.minimum(self.distance, candidate, out=self.distance)
+
+    def rebuild_directions(self):
+        """Point every cell at its lowest-distance neighbour"""
+        neighbors = self.neighbor_distances()
+        best = neighbors.argmin(axis=0)
+        self.directions[:] = NEIGHBOR_DIRECTIONS[best]
+
+        # Cells inside obstacles keep pointing at their best free neighbour so a
+        # tank clipping a corner is pushed back out; unreachable cells get none
+        stuck = ~np.isfinite(neighbors.min(axis=0))
+        self.directions[stuck] = 0.0
+        self.directions[self.goal_cell] = 0.0
+
+    def update(self, target_pos):
+        """Track the goal and advance the flow field by a bounded amount of work"""
+        self.ticks_until_update -= 1
+        if self.ticks_until_update > 0:
+            return
+        self.ticks_until_update = NAV_UPDATE_INTERVAL
+
+        self.set_goal(self.cell_of(target_pos.x, target_pos.z))
+        if not self.converged:
+            self.relax(NAV_SWEEPS_PER_UPDATE)
+            self.rebuild_directions()
+
+    def direction_at(self, position):
+        """Unit (x, z) steering direction for a world position, or (0, 0)"""
+        i, j = self.cell_of(position.x, position.z)
+        dx, dz = self.directions[i, j]
+        return float(dx), float(dz)
+
+    def directions_at(self, xs, zs):
+        """Vectorized direction_at returning an (N, 2) array"""
+        i, j = self.cells_of(xs, zs)
+        return self.directions[i, j]
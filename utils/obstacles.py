@@ -0,0 +1,244 @@
+import json
+import random
+import numpy as np
+from utils.transforms import translation_matrices
+from utils.constants import *
+
+BOX = 0
+CYLINDER = 1
+
+BVH_LEAF_SIZE = 4
+
+
+class ObstacleMap:
+    """Static boxes and cylinders indexed by a bounding volume hierarchy.
+
+    Obstacles stand on the ground. Boxes are axis-aligned; cylinders are
+    upright. The BVH is stored as flat NumPy arrays so that ray and segment
+    queries traverse it for a whole batch of segments at once, one tree level
+    per loop iteration, instead of one segment at a time.
+    """
+    def __init__(self, obstacles=()):
+        kinds = []
+        centers = []
+        half_extents = []
+        for obstacle in obstacles:
+            if obstacle['type'] == 'box':
+                kinds.append(BOX)
+                half = (obstacle['width'] / 2, obstacle['height'] / 2, obstacle['depth'] / 2)
+            elif obstacle['type'] == 'cylinder':
+                kinds.append(CYLINDER)
+                half = (obstacle['radius'], obstacle['height'] / 2, obstacle['radius'])
+            else:
+                raise ValueError(f"Unknown obstacle type: {obstacle['type']}")
+            half_extents.append(half)
+            centers.append((obstacle['x'], half[1], obstacle['z']))
+
+        self.kinds = np.array(kinds, dtype=np.int8)
+        self.centers = np.array(centers, dtype=np.float32).reshape(-1, 3)
+        self.half_extents = np.array(half_extents, dtype=np.float32).reshape(-1, 3)
+        self.build_bvh()
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def build_bvh(self):
+        """Build the hierarchy by median splits along each node's longest axis"""
+        mins = self.centers - self.half_extents
+        maxs = self.centers + self.half_extents
+
+        node_min = []
+        node_max = []
+        node_left = []
+        node_right = []
+        node_start = []
+        node_count = []
+        order = []
+
+        def build(indices):
+            node = len(node_min)
+            node_min.append(mins[indices].min(axis=0))
+            node_max.append(maxs[indices].max(axis=0))
+            node_left.append(-1)
+            node_right.append(-1)
+            node_start.append(len(order))
+            node_count.append(0)
+
+            if len(indices) <= BVH_LEAF_SIZE:
+                node_count[node] = len(indices)
+                order.extend(indices.tolist())
+                return node
+
+            centroids = self.centers[indices]
+            axis = int(np.argmax(centroids.max(axis=0) - centroids.min(axis=0)))
+            sorted_indices = indices[np.argsort(centroids[:, axis], kind='stable')]
+            middle = len(sorted_indices) // 2
+            node_left[node] = build(sorted_indices[:middle])
+            node_right[node] = build(sorted_indices[middle:])
+            return node
+
+        if len(self):
+            build(np.arange(len(self)))
+
+        self.node_min = np.array(node_min, dtype=np.float32).reshape(-1, 3)
+        self.node_max = np.array(node_max, dtype=np.float32).reshape(-1, 3)
+        self.node_left = np.array(node_left, dtype=np.intp)
+        self.node_right = np.array(node_right, dtype=np.intp)
+        self.node_start = np.array(node_start, dtype=np.intp)
+        self.node_count = np.array(node_count, dtype=np.intp)
+        self.primitive_order = np.array(order, dtype=np.intp)
+
+    @staticmethod
+    def slab_test(origins, inverse_directions, box_min, box_max):
+        """Entry and exit parameters of rays against axis-aligned boxes"""
+        t1 = (box_min - origins) * inverse_directions
+        t2 = (box_max - origins) * inverse_directions
+        t_near = np.nan_to_num(np.minimum(t1, t2), nan=-np.inf).max(axis=1)
+        t_far = np.nan_to_num(np.maximum(t1, t2), nan=np.inf).min(axis=1)
+        return t_near, t_far
+
+    def primitive_test(self, origins, directions, inverse_directions, primitives):
+        """Entry parameter of rays against specific obstacles (inf on a miss)"""
+        centers = self.centers[primitives]
+        half = self.half_extents[primitives]
+        t_near, t_far = self.slab_test(origins, inverse_directions, centers - half, centers + half)
+        t_hit = np.where((t_near <= t_far) & (t_far >= 0), np.maximum(t_near, 0.0), np.inf)
+
+        cylinders = self.kinds[primitives] == CYLINDER
+        if cylinders.any():
+            # Solve |(o + t d - c)_xz| = r, then clip to the cylinder's height slab
+            o = origins[cylinders] - centers[cylinders]
+            d = directions[cylinders]
+            radius = half[cylinders, 0]
+            a = d[:, 0] ** 2 + d[:, 2] ** 2
+            b = 2 * (o[:, 0] * d[:, 0] + o[:, 2] * d[:, 2])
+            c = o[:, 0] ** 2 + o[:, 2] ** 2 - radius ** 2
+            disc = b * b - 4 * a * c
+            vertical = a < 1e-12
+            root = np.sqrt(np.maximum(disc, 0.0))
+            safe_a = np.where(vertical, 1.0, a)
+            enter = np.where(vertical, np.where(c <= 0, -np.inf, np.inf), (-b - root) / (2 * safe_a))
+            leave = np.where(vertical, np.where(c <= 0, np.inf, -np.inf), (-b + root) / (2 * safe_a))
+            missed = ~vertical & (disc < 0)
+
+            # Interval where the ray is within the cylinder's height
+            dy = d[:, 1]
+            flat = np.abs(dy) < 1e-12
+            safe_dy = np.where(flat, 1.0, dy)
+            t1 = (-half[cylinders, 1] - o[:, 1]) / safe_dy
+            t2 = (half[cylinders, 1] - o[:, 1]) / safe_dy
+            inside = np.abs(o[:, 1]) <= half[cylinders, 1]
+            height_near = np.where(flat, np.where(inside, -np.inf, np.inf), np.minimum(t1, t2))
+            height_far = np.where(flat, np.where(inside, np.inf, -np.inf), np.maximum(t1, t2))
+            t_enter = np.maximum(enter, height_near)
+            t_leave = np.minimum(leave, height_far)
+            hit = ~missed & (t_enter <= t_leave) & (t_leave >= 0)
+            t_hit[cylinders] = np.where(hit, np.maximum(t_enter, 0.0), np.inf)
+        return t_hit
+
+    def segment_query(self, starts, ends):
+        """First obstacle hit along each segment
+
+        Returns (hit, t, obstacle) arrays: whether each segment is blocked, the
+        fraction along it of the first hit, and the obstacle index (-1 if none).
+        """
+        starts = np.asarray(starts, dtype=np.float32).reshape(-1, 3)
+        ends = np.asarray(ends, dtype=np.float32).reshape(-1, 3)
+        count = len(starts)
+        best_t = np.full(count, np.inf, dtype=np.float32)
+        best_obstacle = np.full(count, -1, dtype=np.intp)
+        if count == 0 or len(self) == 0:
+            return np.zeros(count, dtype=bool), best_t, best_obstacle
+
+        directions = ends - starts
+        with np.errstate(divide='ignore'):
+            inverse_directions = 1.0 / directions
+
+        # Frontier of (segment, node) pairs still to visit, starting at the root
+        rays = np.arange(count)
+        nodes = np.zeros(count, dtype=np.intp)
+        with np.errstate(invalid='ignore'):
+            while len(rays):
+                t_near, t_far = self.slab_test(starts[rays], inverse_directions[rays],
+                                               self.node_min[nodes], self.node_max[nodes])
+                keep = (t_near <= t_far) & (t_far >= 0) & (t_near <= np.minimum(best_t[rays], 1.0))
+                rays = rays[keep]
+                nodes = nodes[keep]
+
+                leaves = self.node_left[nodes] < 0
+                leaf_rays = rays[leaves]
+                leaf_nodes = nodes[leaves]
+                if len(leaf_rays):
+                    counts = self.node_count[leaf_nodes]
+                    pair_rays = np.repeat(leaf_rays, counts)
+                    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+                    primitives = self.primitive_order[np.repeat(self.node_start[leaf_nodes], counts) + offsets]
+                    t_hit = self.primitive_test(starts[pair_rays], directions[pair_rays],
+                                                inverse_directions[pair_rays], primitives)
+                    t_hit = np.where(t_hit <= 1.0, t_hit, np.inf).astype(np.float32)
+                    np.minimum.at(best_t, pair_rays, t_hit)
+                    winners = np.isfinite(t_hit) & (t_hit == best_t[pair_rays])
+                    best_obstacle[pair_rays[winners]] = primitives[winners]
+
+                inner_rays = rays[~leaves]
+                inner_nodes = nodes[~leaves]
+                rays = np.concatenate([inner_rays, inner_rays])
+                nodes = np.concatenate([self.node_left[inner_nodes], self.node_right[inner_nodes]])
+
+        return np.isfinite(best_t), best_t, best_obstacle
+
+    def line_of_sight(self, origins, targets):
+        """True for each origin/target pair with no obstacle in between"""
+        hit, _, _ = self.segment_query(origins, targets)
+        return ~hit
+
+    def draw(self, queue):
+        """Submit every obstacle to the render queue"""
+        for kind, mesh in ((BOX, 'cube'), (CYLINDER, 'cylinder')):
+            selected = self.kinds == kind
+            if not selected.any():
+                continue
+            transforms = translation_matrices(self.centers[selected])
+            transforms[:, 0, 0] = self.half_extents[selected, 0] * 2
+            transforms[:, 1, 1] = self.half_extents[selected, 1] * 2
+            transforms[:, 2, 2] = self.half_extents[selected, 2] * 2
+            if kind == CYLINDER:
+                # The cylinder mesh has unit radius rather than unit diameter
+                transforms[:, 0, 0] /= 2
+                transforms[:, 2, 2] /= 2
+            queue.submit_batch(mesh, transforms, OBSTACLE_COLOR)
+
+    def block_navigation(self, navigation, clearance=TANK_WIDTH / 2):
+        """Mark every obstacle, grown by a clearance, on a navigation grid"""
+        for kind, (x, _, z), (hx, _, hz) in zip(self.kinds, self.centers.tolist(),
+                                                 self.half_extents.tolist()):
+            if kind == BOX:
+                navigation.block_box(x, z, hx + clearance, hz + clearance)
+            else:
+                navigation.block_circle(x, z, hx + clearance)
+
+
+def load_map(path):
+    """Load obstacles from a JSON map file: {"obstacles": [{...}, ...]}"""
+    with open(path) as f:
+        return ObstacleMap(json.load(f)['obstacles'])
+
+
+def generate_map(count=OBSTACLE_COUNT, seed=MAP_SEED, clear_radius=20.0):
+    """Scatter buildings and rocks over the world, leaving the spawn area open"""
+    rng = random.Random(seed)
+    world_half = WORLD_SIZE / 2 - 10
+    obstacles = []
+    while len(obstacles) < count:
+        x = rng.uniform(-world_half, world_half)
+        z = rng.uniform(-world_half, world_half)
+        if x * x + z * z < clear_radius * clear_radius:
+            continue
+        if rng.random() < 0.5:
+            obstacles.append({'type': 'box', 'x': x, 'z': z,
+                              'width': rng.uniform(4, 12), 'depth': rng.uniform(4, 12),
+                              'height': rng.uniform(3, 8)})
+        else:
+            obstacles.append({'type': 'cylinder', 'x': x, 'z': z,
+                              'radius': rng.uniform(1, 3), 'height': rng.uniform(1.5, 4)})
+    return ObstacleMap(obstacles)
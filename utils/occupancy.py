@@ -0,0 +1,99 @@
+import numpy as np
+from utils.constants import *
+
+# Channels of the occupancy grid, in order
+PLAYER = 0
+ALLY = 1
+ENEMY = 2
+PLAYER_BULLET = 3
+ENEMY_BULLET = 4
+CHANNEL_COUNT = 5
+
+# ASCII symbol per channel, highest drawing priority first
+ASCII_SYMBOLS = ((PLAYER_BULLET, '*'), (ENEMY_BULLET, '!'), (ENEMY, 'E'), (ALLY, 'A'), (PLAYER, 'P'))
+
+# Minimap color per channel, drawn in channel order
+MINIMAP_COLORS = np.array([
+    (0, 255, 0),
+    (80, 140, 255),
+    (255, 40, 40),
+    (255, 255, 0),
+    (255, 140, 0),
+], dtype=np.uint8)
+
+
+class OccupancyGrid:
+    """Bins entity positions into a player-centred, multi-channel count grid.
+
+    The grid covers a square of side 2 * radius around a centre point, split
+    into resolution x resolution cells, with one channel per entity kind.
+    Rows follow world z and columns world x, like the top-down 2D view. All
+    entities are counted in a single np.add.at over flattened (channel, row,
+    column) indices.
+    """
+    def __init__(self, resolution=OCCUPANCY_RESOLUTION, radius=OCCUPANCY_RADIUS):
+        self.resolution = resolution
+        self.radius = radius
+        self.cell_size = 2 * radius / resolution
+
+    @property
+    def shape(self):
+        """Shape of the grid buffer: (channels, rows, columns)"""
+        return (CHANNEL_COUNT, self.resolution, self.resolution)
+
+    def empty(self, dtype=np.float32):
+        """Allocate a zeroed grid buffer"""
+        return np.zeros(self.shape, dtype=dtype)
+
+    def rasterize(self, center_x, center_z, xs, zs, channels, out=None):
+        """Count entities per cell into out, an existing buffer of self.shape
+
+        xs, zs and channels are equal-length arrays. Entities outside the
+        square are ignored. Returns out.
+        """
+        if out is None:
+            out = self.empty()
+        elif out.shape != self.shape or not out.flags.c_contiguous:
+            raise ValueError(f"out must be a C-contiguous array of shape {self.shape}")
+        columns = np.floor((np.asarray(xs) - center_x + self.radius) / self.cell_size).astype(np.intp)
+        rows = np.floor((np.asarray(zs) - center_z + self.radius) / self.cell_size).astype(np.intp)
+        inside = (columns >= 0) & (columns < self.resolution) & (rows >= 0) & (rows < self.resolution)
+        index = (np.asarray(channels, dtype=np.intp)[inside] * self.resolution + rows[inside]) \
+            * self.resolution + columns[inside]
+        # Counted straight into out, with no full-size temporary
+        out.fill(0)
+        np.add.at(out.reshape(-1), index, 1)
+        return out
+
+    def rasterize_snapshot(self, snapshot, out=None):
+        """Rasterize the tanks and bullets of a Snapshot around the player"""
+        tanks = snapshot.tank_positions
+        bullets = snapshot.bullet_positions
+        tank_channels = np.where(snapshot.tank_is_player, ALLY, ENEMY)
+        tank_channels[0] = PLAYER
+        bullet_channels = np.where(snapshot.bullet_is_player, PLAYER_BULLET, ENEMY_BULLET)
+        return self.rasterize(
+            float(tanks[0, 0]), float(tanks[0, 2]),
+            np.concatenate([tanks[:, 0], bullets[:, 0]]),
+            np.concatenate([tanks[:, 2], bullets[:, 2]]),
+            np.concatenate([tank_channels, bullet_channels]),
+            out,
+        )
+
+
+def grid_to_ascii(grid):
+    """One character per cell, '.' where empty, as a list of row strings"""
+    chars = np.full(grid.shape[1:], '.', dtype='<U1')
+    for channel, symbol in reversed(ASCII_SYMBOLS):
+        chars[grid[channel] > 0] = symbol
+    return [' '.join(row) for row in chars.tolist()]
+
+
+def grid_to_image(grid, out=None):
+    """RGB (columns, rows, 3) image of a grid, laid out for pygame.surfarray"""
+    if out is None:
+        out = np.zeros((grid.shape[2], grid.shape[1], 3), dtype=np.uint8)
+    out[:] = 0
+    for channel in range(CHANNEL_COUNT):
+        out[grid[channel].T > 0] = MINIMAP_COLORS[channel]
+    return out
@@ -0,0 +1,166 @@
+import math
+import multiprocessing
+import threading
+from multiprocessing import shared_memory
+import numpy as np
+from utils.constants import *
+
+# Per-enemy float64 columns in the shared input block
+INPUT_COLUMNS = ('x', 'y', 'z', 'rotation', 'turret_rotation', 'steer_x', 'steer_z')
+# Header slots: enemy count, target position, hull rotation speed, stop flag
+HEADER_COUNT = 0
+HEADER_TARGET = slice(1, 4)
+HEADER_ROTATION_SPEED = 4
+HEADER_STOP = 5
+HEADER_SIZE = 6
+BARRIER_TIMEOUT = 5.0
+
+
+def plan_ai_batch(inputs, target, rotation_speed, out):
+    """Vectorized Tank.plan_ai_movement over rows of INPUT_COLUMNS
+
+    Writes (throttle, turn, turret_turn) rows into out. A zero steer vector
+    means no flow field direction, so the tank heads straight for the target.
+    """
+    x, y, z, rotation, turret_rotation, steer_x, steer_z = inputs.T
+    dx = target[0] - x
+    dz = target[2] - z
+    distance = np.sqrt(dx * dx + (target[1] - y) ** 2 + dz * dz)
+    target_angle = np.arctan2(dx, dz)
+
+    # Drive along the steer direction when there is one
+    has_steer = (steer_x != 0) | (steer_z != 0)
+    heading = np.where(has_steer, np.arctan2(steer_x, steer_z), target_angle)
+    angle_diff = (heading - rotation + math.pi) % (2 * math.pi) - math.pi
+
+    approaching = distance > 25.0
+    facing = np.abs(angle_diff) <= 0.1
+    turn = np.where(approaching & ~facing, np.sign(angle_diff), 0.0)
+    throttle = np.where(distance < 15.0, -0.5, np.where(approaching & facing, 1.0, 0.0))
+
+    # Aim turret at target, allowing for this tick's hull turn
+    turret_diff = (target_angle - (rotation + turn * rotation_speed + turret_rotation)
+                   + math.pi) % (2 * math.pi) - math.pi
+    turret_turn = np.where(np.abs(turret_diff) > 0.05, np.sign(turret_diff), 0.0)
+
+    out[:, 0] = throttle
+    out[:, 1] = turn
+    out[:, 2] = turret_turn
+
+
+def attach_arrays(shm, capacity):
+    """Map the header, input and output arrays onto a shared memory block"""
+    header = np.ndarray((HEADER_SIZE,), dtype=np.float64, buffer=shm.buf)
+    inputs = np.ndarray((capacity, len(INPUT_COLUMNS)), dtype=np.float64, buffer=shm.buf,
+                        offset=header.nbytes)
+    commands = np.ndarray((capacity, 3), dtype=np.float64, buffer=shm.buf,
+                          offset=header.nbytes + inputs.nbytes)
+    return header, inputs, commands
+
+
+def shared_size(capacity):
+    """Bytes needed for a pool of the given enemy capacity"""
+    return 8 * (HEADER_SIZE + capacity * (len(INPUT_COLUMNS) + 3))
+
+
+def worker_main(name, capacity, index, workers, barrier):
+    """Worker loop: wait for a tick, plan this worker's slice, report back"""
+    shm = shared_memory.SharedMemory(name=name)
+    header, inputs, commands = attach_arrays(shm, capacity)
+    try:
+        while True:
+            barrier.wait()
+            if header[HEADER_STOP]:
+                break
+            count = int(header[HEADER_COUNT])
+            start = count * index // workers
+            end = count * (index + 1) // workers
+            if end > start:
+                plan_ai_batch(inputs[start:end], header[HEADER_TARGET], header[HEADER_ROTATION_SPEED],
+                              commands[start:end])
+            barrier.wait()
+    finally:
+        del header, inputs, commands
+        shm.close()
+
+
+class ParallelAI:
+    """Plans AI commands for many enemies on a persistent pool of processes.
+
+    Enemy state is written once per tick into a shared memory block; workers
+    map the same block and each plan a contiguous slice, so nothing is pickled
+    per tick. Two barrier waits bracket the work. Batches smaller than
+    threshold, or any batch once the pool has failed, are planned in-process
+    with the same vectorized code.
+    """
+    def __init__(self, workers=AI_WORKERS, capacity=AI_PARALLEL_CAPACITY,
+                 threshold=AI_PARALLEL_THRESHOLD):
+        self.workers = workers
+        self.capacity = capacity
+        self.threshold = threshold
+        self.processes = []
+
+        self.shm = shared_memory.SharedMemory(create=True, size=shared_size(capacity))
+        self.header, self.inputs, self.commands = attach_arrays(self.shm, capacity)
+        self.header[:] = 0
+
+        self.barrier = None
+        if workers > 0:
+            context = multiprocessing.get_context('spawn')
+            self.barrier = context.Barrier(workers + 1)
+            for index in range(workers):
+                process = context.Process(target=worker_main, daemon=True,
+                                          args=(self.shm.name, capacity, index, workers, self.barrier))
+                process.start()
+                self.processes.append(process)
+
+    @property
+    def parallel(self):
+        """True while the worker pool is usable"""
+        return bool(self.processes)
+
+    def plan(self, inputs, target, rotation_speed=TANK_ROTATION_SPEED):
+        """(N, 3) commands for an (N, len(INPUT_COLUMNS)) array of enemy state"""
+        count = len(inputs)
+        if count == 0:
+            return np.zeros((0, 3))
+        if not self.parallel or count < self.threshold or count > self.capacity:
+            out = np.empty((count, 3))
+            plan_ai_batch(np.asarray(inputs, dtype=np.float64), target, rotation_speed, out)
+            return out
+
+        self.inputs[:count] = inputs
+        self.header[HEADER_COUNT] = count
+        self.header[HEADER_TARGET] = target
+        self.header[HEADER_ROTATION_SPEED] = rotation_speed
+        try:
+            # Release the workers, then wait for all of them to finish. Idle
+            # workers block without a timeout; only the parent gives up.
+            self.barrier.wait(BARRIER_TIMEOUT)
+            self.barrier.wait(BARRIER_TIMEOUT)
+        except threading.BrokenBarrierError:
+            print("AI worker pool stopped responding, planning in-process")
+            self.terminate()
+            return self.plan(inputs, target, rotation_speed)
+        return self.commands[:count].copy()
+
+    def terminate(self):
+        """Kill the workers without waiting for them"""
+        for process in self.processes:
+            process.terminate()
+        self.processes = []
+
+    def close(self):
+        """Stop the workers and release the shared memory"""
+        if self.processes:
+            self.header[HEADER_STOP] = 1
+            try:
+                self.barrier.wait(BARRIER_TIMEOUT)
+            except threading.BrokenBarrierError:
+                pass
+            for process in self.processes:
+                process.join(timeout=1.0)
+            self.terminate()
+        del self.header, self.inputs, self.commands
+        self.shm.close()
+        self.shm.unlink()
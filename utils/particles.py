@@ -0,0 +1,71 @@
+import numpy as np
+from utils.constants import *
+
+
+class ParticleSystem:
+    """Fixed-capacity particle pool stored as parallel NumPy arrays.
+
+    New particles overwrite the oldest slots in ring order, so emitting never
+    allocates and a burst larger than the budget simply recycles slots.
+    """
+    def __init__(self, capacity=MAX_PARTICLES):
+        self.capacity = capacity
+        self.positions = np.zeros((capacity, 3), dtype=np.float32)
+        self.velocities = np.zeros((capacity, 3), dtype=np.float32)
+        self.colors = np.zeros((capacity, 4), dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.max_life = np.ones(capacity, dtype=np.float32)
+        self.head = 0
+        self.rng = np.random.default_rng()
+
+    def emit(self, position, count, speed, color, lifetime, direction=None, spread=1.0):
+        """Spawn a burst of particles at a point"""
+        count = min(count, self.capacity)
+        slots = (self.head + np.arange(count)) % self.capacity
+        self.head = (self.head + count) % self.capacity
+
+        # Random directions, optionally biased along a cone around `direction`
+        velocities = self.rng.normal(size=(count, 3)).astype(np.float32)
+        velocities /= np.linalg.norm(velocities, axis=1, keepdims=True) + 1e-6
+        velocities *= spread
+        if direction is not None:
+            velocities += np.array([direction.x, direction.y, direction.z], dtype=np.float32)
+        velocities *= speed * self.rng.uniform(0.3, 1.0, size=(count, 1)).astype(np.float32)
+
+        self.positions[slots] = (position.x, position.y, position.z)
+        self.velocities[slots] = velocities
+        self.colors[slots] = color
+        life = self.rng.uniform(0.5, 1.0, size=count).astype(np.float32) * lifetime
+        self.life[slots] = life
+        self.max_life[slots] = life
+
+    def emit_explosion(self, position):
+        """Large fireball burst for a destroyed tank"""
+        self.emit(position, 120, 0.4, EXPLOSION_COLOR, 45)
+
+    def emit_hit(self, position):
+        """Small spark burst where a bullet struck"""
+        self.emit(position, 20, 0.25, BULLET_COLOR, 15)
+
+    def emit_muzzle_flash(self, position, direction):
+        """Short forward cone of sparks from a gun barrel"""
+        self.emit(position, 12, 0.3, MUZZLE_FLASH_COLOR, 8, direction=direction, spread=0.3)
+
+    def update(self):
+        """Integrate and fade every slot in one vectorized pass"""
+        alive = self.life > 0
+        self.velocities[:, 1] += GRAVITY
+        self.positions += self.velocities * alive[:, None]
+        np.maximum(self.positions[:, 1], 0.0, out=self.positions[:, 1])
+        self.velocities *= PARTICLE_DRAG
+
+        self.life -= alive
+        self.colors[:, 3] = np.clip(self.life / self.max_life, 0.0, 1.0)
+
+    def alive_indices(self):
+        """Indices of slots holding live particles"""
+        return np.flatnonzero(self.life > 0)
+
+    def clear(self):
+        """Kill every particle"""
+        self.life[:] = 0
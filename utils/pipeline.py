@@ -0,0 +1,144 @@
+import math
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+from entities.tank import gather_tank_state
+
+# Everything the renderer needs from one simulation tick. Tanks are stored with
+# the player first. Arrays are marked read-only once captured so the render
+# thread can hold on to a snapshot while the simulation moves on.
+Snapshot = namedtuple('Snapshot', [
+    'tick', 'time',
+    'tank_ids', 'tank_positions', 'tank_rotations', 'turret_rotations', 'tank_colors',
+    'tank_is_player',
+    'bullet_ids', 'bullet_positions', 'bullet_is_player',
+    'particle_positions', 'particle_colors',
+    'score', 'player_health', 'player_max_health', 'game_over',
+])
+
+
+def capture_snapshot(game, tick=0, timestamp=0.0, particles=True):
+    """Copy the renderable state of a game into an immutable Snapshot
+
+    particles=False leaves the particle arrays empty, for callers that
+    only need tanks and bullets.
+    """
+    tanks = [game.player] + game.allies + game.enemies
+    positions, rotations, turret_rotations, colors = gather_tank_state(tanks)
+    bullets = game.bullets
+    # Fancy indexing copies, so the simulation can keep moving particles
+    alive = game.particles.alive_indices() if particles else np.zeros(0, dtype=np.intp)
+    arrays = [
+        np.array([t.serial for t in tanks], dtype=np.int64),
+        positions, rotations, turret_rotations, colors,
+        np.array([t.is_player for t in tanks], dtype=bool),
+        np.array([b.serial for b in bullets], dtype=np.int64),
+        np.array([(b.position.x, b.position.y, b.position.z) for b in bullets],
+                 dtype=np.float32).reshape(-1, 3),
+        np.array([b.is_player_bullet for b in bullets], dtype=bool),
+        game.particles.positions[alive],
+        game.particles.colors[alive],
+    ]
+    for array in arrays:
+        array.flags.writeable = False
+    return Snapshot(tick, timestamp, *arrays, game.score, game.player.health,
+                    game.player.max_health, game.game_over)
+
+
+def match_ids(previous_ids, current_ids):
+    """Return (current_index, previous_index) pairs for ids present in both"""
+    if len(previous_ids) == 0 or len(current_ids) == 0:
+        empty = np.zeros(0, dtype=np.intp)
+        return empty, empty
+    sorter = np.argsort(previous_ids)
+    found = np.searchsorted(previous_ids, current_ids, sorter=sorter)
+    found = sorter[np.minimum(found, len(previous_ids) - 1)]
+    matched = previous_ids[found] == current_ids
+    return np.flatnonzero(matched), found[matched]
+
+
+def lerp_angles(a, b, alpha):
+    """Interpolate angles along the shorter arc"""
+    difference = (b - a + math.pi) % (2 * math.pi) - math.pi
+    return a + difference * alpha
+
+
+def interpolate_snapshots(previous, current, alpha):
+    """Blend two snapshots; entities that only exist in `current` are not moved"""
+    if previous is None or alpha >= 1.0:
+        return current
+    alpha = max(0.0, alpha)
+
+    tank_positions = current.tank_positions.copy()
+    tank_rotations = current.tank_rotations.copy()
+    turret_rotations = current.turret_rotations.copy()
+    now, before = match_ids(previous.tank_ids, current.tank_ids)
+    tank_positions[now] = previous.tank_positions[before] + (
+        current.tank_positions[now] - previous.tank_positions[before]) * alpha
+    tank_rotations[now] = lerp_angles(previous.tank_rotations[before], current.tank_rotations[now], alpha)
+    turret_rotations[now] = lerp_angles(previous.turret_rotations[before], current.turret_rotations[now], alpha)
+
+    bullet_positions = current.bullet_positions.copy()
+    now, before = match_ids(previous.bullet_ids, current.bullet_ids)
+    bullet_positions[now] = previous.bullet_positions[before] + (
+        current.bullet_positions[now] - previous.bullet_positions[before]) * alpha
+
+    return current._replace(
+        tank_positions=tank_positions,
+        tank_rotations=tank_rotations,
+        turret_rotations=turret_rotations,
+        bullet_positions=bullet_positions,
+    )
+
+
+class SimulationThread(threading.Thread):
+    """Advances a game at a fixed tick rate and publishes double-buffered snapshots"""
+    def __init__(self, game, tick_rate):
+        super().__init__(name="simulation", daemon=True)
+        self.game = game
+        self.tick_interval = 1.0 / tick_rate
+        self.running = True
+        self.tick = 0
+
+        self.snapshot_lock = threading.Lock()
+        self.previous = None
+        self.current = capture_snapshot(game, 0, time.perf_counter())
+
+    def run(self):
+        next_tick = time.perf_counter()
+        while self.running:
+            with self.game.state_lock:
+                self.game.update()
+                self.tick += 1
+                snapshot = capture_snapshot(self.game, self.tick, time.perf_counter())
+            self.publish(snapshot)
+
+            next_tick += self.tick_interval
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -self.tick_interval * 5:
+                # Too far behind to catch up; drop the backlog instead of spiralling
+                next_tick = time.perf_counter()
+
+    def publish(self, snapshot):
+        """Swap in a new snapshot, keeping the previous one for interpolation"""
+        with self.snapshot_lock:
+            self.previous, self.current = self.current, snapshot
+
+    def snapshot_at(self, render_time):
+        """Interpolated state for a render time one tick behind the simulation"""
+        with self.snapshot_lock:
+            previous, current = self.previous, self.current
+        if previous is None:
+            return current
+        span = current.time - previous.time
+        alpha = (render_time - self.tick_interval - previous.time) / span if span > 0 else 1.0
+        return interpolate_snapshots(previous, current, min(alpha, 1.0))
+
+    def stop(self):
+        """Ask the thread to finish and wait for it"""
+        self.running = False
+        self.join()
@@ -0,0 +1,187 @@
+import math
+import random
+import numpy as np
+from utils.constants import *
+
+
+class RegionPopulation:
+    """Enemies parked in one region, stored as plain arrays instead of objects"""
+    def __init__(self):
+        self.positions = np.zeros((0, 3), dtype=np.float32)
+        self.rotations = np.zeros(0, dtype=np.float32)
+        self.health = np.zeros(0, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.rotations)
+
+    def add(self, positions, rotations, health):
+        """Append a batch of enemies"""
+        self.positions = np.concatenate([self.positions, np.asarray(positions, dtype=np.float32).reshape(-1, 3)])
+        self.rotations = np.concatenate([self.rotations, np.asarray(rotations, dtype=np.float32)])
+        self.health = np.concatenate([self.health, np.asarray(health, dtype=np.float32)])
+
+    def take(self, selected):
+        """Remove and return (positions, rotations, health) for a boolean mask"""
+        taken = self.positions[selected], self.rotations[selected], self.health[selected]
+        keep = ~selected
+        self.positions = self.positions[keep]
+        self.rotations = self.rotations[keep]
+        self.health = self.health[keep]
+        return taken
+
+
+class WorldRegions:
+    """Partitions the world into square regions simulated at three levels of detail.
+
+    Regions within ACTIVE_REGION_RADIUS of the player's region hold real Enemy
+    objects that run the full simulation. Regions out to COARSE_REGION_RADIUS
+    hold enemies as arrays and advance them with a cheap model every
+    REGION_COARSE_INTERVAL frames: they drive straight toward the player.
+    Regions beyond that sleep and cost nothing. Work per frame therefore
+    depends on how many enemies are near the player, not on the world total.
+    """
+    def __init__(self, world_size=WORLD_SIZE, region_size=REGION_SIZE,
+                 active_radius=ACTIVE_REGION_RADIUS, coarse_radius=COARSE_REGION_RADIUS):
+        self.world_half = world_size / 2
+        self.region_size = region_size
+        self.count = int(math.ceil(world_size / region_size))
+        self.active_radius = active_radius
+        self.coarse_radius = coarse_radius
+        self.populations = {}
+        self.tick = 0
+
+        # Statistics for the last update
+        self.woken = 0
+        self.slept = 0
+        self.coarse_updated = 0
+
+    def region_of(self, x, z):
+        """Region containing a world position"""
+        i = int((x + self.world_half) // self.region_size)
+        j = int((z + self.world_half) // self.region_size)
+        return (min(max(i, 0), self.count - 1), min(max(j, 0), self.count - 1))
+
+    def regions_of(self, xs, zs):
+        """Vectorized region_of returning (i, j) arrays"""
+        i = ((np.asarray(xs) + self.world_half) // self.region_size).astype(np.intp)
+        j = ((np.asarray(zs) + self.world_half) // self.region_size).astype(np.intp)
+        return np.clip(i, 0, self.count - 1), np.clip(j, 0, self.count - 1)
+
+    def add_dormant(self, positions, rotations, health):
+        """Park a batch of enemies in the regions containing them"""
+        positions = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+        rotations = np.asarray(rotations, dtype=np.float32)
+        health = np.asarray(health, dtype=np.float32)
+        i, j = self.regions_of(positions[:, 0], positions[:, 2])
+        keys = i * self.count + j
+        for key in np.unique(keys):
+            selected = keys == key
+            region = divmod(int(key), self.count)
+            population = self.populations.setdefault(region, RegionPopulation())
+            population.add(positions[selected], rotations[selected], health[selected])
+
+    def populate(self, groups=ENEMY_GROUPS, group_size=ENEMY_GROUP_SIZE, seed=MAP_SEED,
+                 clear_radius=REGION_SIZE):
+        """Scatter dormant enemy groups over the world, away from the spawn point"""
+        rng = random.Random(seed)
+        world_half = self.world_half - 10
+        positions = []
+        while len(positions) < groups * group_size:
+            x = rng.uniform(-world_half, world_half)
+            z = rng.uniform(-world_half, world_half)
+            if x * x + z * z < clear_radius * clear_radius:
+                continue
+            for _ in range(group_size):
+                positions.append((x + rng.uniform(-8, 8), 0.5, z + rng.uniform(-8, 8)))
+        rotations = [rng.uniform(0, 2 * math.pi) for _ in positions]
+        self.add_dormant(positions, rotations, [ENEMY_HEALTH] * len(positions))
+
+    def neighborhood(self, center, radius):
+        """Occupied regions within radius regions (Chebyshev) of center"""
+        i0, i1 = max(center[0] - radius, 0), min(center[0] + radius, self.count - 1)
+        j0, j1 = max(center[1] - radius, 0), min(center[1] + radius, self.count - 1)
+        return [(i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1)
+                if (i, j) in self.populations]
+
+    def dormant_count(self):
+        """Enemies currently held outside the full simulation"""
+        return sum(len(p) for p in self.populations.values())
+
+    def update(self, enemies, target_pos, make_enemy):
+        """Move enemies between levels of detail around the player
+
+        Active enemies that have strayed more than one region beyond the
+        active area are parked; the extra region of slack stops enemies on a
+        boundary from flickering between levels. Parked enemies in active
+        regions are turned back into objects with make_enemy(x, z). Returns
+        the list of woken enemies; enemies is updated in place.
+        """
+        center = self.region_of(target_pos.x, target_pos.z)
+        awake_radius = self.active_radius + 1
+
+        # Park enemies that have left the active area
+        parked = []
+        for enemy in enemies:
+            i, j = self.region_of(enemy.position.x, enemy.position.z)
+            if max(abs(i - center[0]), abs(j - center[1])) > awake_radius:
+                parked.append(enemy)
+        if parked:
+            self.add_dormant([(e.position.x, e.position.y, e.position.z) for e in parked],
+                             [e.rotation for e in parked], [e.health for e in parked])
+            parked_ids = set(map(id, parked))
+            enemies[:] = [e for e in enemies if id(e) not in parked_ids]
+
+        # Advance the coarse ring, a staggered share of regions each frame
+        phase = self.tick % REGION_COARSE_INTERVAL
+        moved = 0
+        for region in self.neighborhood(center, self.coarse_radius):
+            if max(abs(region[0] - center[0]), abs(region[1] - center[1])) <= self.active_radius:
+                continue
+            if (region[0] + region[1]) % REGION_COARSE_INTERVAL == phase and region in self.populations:
+                moved += self.advance(region, target_pos, REGION_COARSE_INTERVAL)
+
+        # Wake every parked enemy in the active area
+        woken = []
+        for region in self.neighborhood(center, self.active_radius):
+            population = self.populations.pop(region)
+            positions, rotations, health = population.positions, population.rotations, population.health
+            for (x, _, z), rotation, hp in zip(positions.tolist(), rotations.tolist(), health.tolist()):
+                enemy = make_enemy(x, z)
+                enemy.rotation = rotation
+                enemy.health = hp
+                woken.append(enemy)
+        enemies.extend(woken)
+
+        self.tick += 1
+        self.woken = len(woken)
+        self.slept = len(parked)
+        self.coarse_updated = moved
+        return woken
+
+    def advance(self, region, target_pos, ticks):
+        """Coarse model: drive a region's enemies straight at the target"""
+        population = self.populations[region]
+        offset = np.array([target_pos.x, 0.0, target_pos.z], dtype=np.float32) - population.positions
+        offset[:, 1] = 0.0
+        distance = np.maximum(np.hypot(offset[:, 0], offset[:, 2]), 1e-6)
+        step = np.minimum(TANK_SPEED * DORMANT_SPEED_FACTOR * ticks, distance)
+        population.positions += offset * (step / distance)[:, None]
+        population.rotations = np.arctan2(offset[:, 0], offset[:, 2]).astype(np.float32)
+
+        # Re-file enemies that crossed into another region
+        i, j = self.regions_of(population.positions[:, 0], population.positions[:, 2])
+        left = (i != region[0]) | (j != region[1])
+        if left.any():
+            self.add_dormant(*population.take(left))
+        if not len(population):
+            del self.populations[region]
+        return len(offset)
+
+    def stats(self):
+        """Per-frame region activity figures"""
+        return {
+            'dormant': self.dormant_count(),
+            'woken': self.woken,
+            'slept': self.slept,
+            'coarse_updated': self.coarse_updated,
+        }
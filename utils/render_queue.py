@@ -0,0 +1,186 @@
+from OpenGL.GL import *
+import numpy as np
+import math
+
+# Materials toggle fixed-function state; the key order is also the draw order
+MATERIALS = {
+    'lit': {'lighting': True},
+    'unlit': {'lighting': False},
+}
+
+
+class Mesh:
+    """Vertex and normal arrays for one piece of geometry"""
+    def __init__(self, vertices, normals, primitive=GL_QUADS):
+        self.vertices = np.ascontiguousarray(vertices, dtype=np.float32)
+        self.normals = np.ascontiguousarray(normals, dtype=np.float32)
+        self.primitive = primitive
+        self.count = len(self.vertices)
+
+
+def build_cube_mesh():
+    """Unit cube centred on the origin"""
+    faces = [
+        ((0, 0, 1), [(-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1)]),
+        ((0, 0, -1), [(-1, -1, -1), (-1, 1, -1), (1, 1, -1), (1, -1, -1)]),
+        ((0, 1, 0), [(-1, 1, -1), (-1, 1, 1), (1, 1, 1), (1, 1, -1)]),
+        ((0, -1, 0), [(-1, -1, -1), (1, -1, -1), (1, -1, 1), (-1, -1, 1)]),
+        ((1, 0, 0), [(1, -1, -1), (1, 1, -1), (1, 1, 1), (1, -1, 1)]),
+        ((-1, 0, 0), [(-1, -1, -1), (-1, -1, 1), (-1, 1, 1), (-1, 1, -1)]),
+    ]
+    vertices = []
+    normals = []
+    for normal, corners in faces:
+        for corner in corners:
+            vertices.append([c * 0.5 for c in corner])
+            normals.append(normal)
+    return Mesh(vertices, normals)
+
+
+def build_sphere_mesh(slices=8, stacks=8):
+    """Unit-radius sphere built from quads"""
+    vertices = []
+    for i in range(stacks):
+        lat0 = math.pi * (-0.5 + i / stacks)
+        lat1 = math.pi * (-0.5 + (i + 1) / stacks)
+        for j in range(slices):
+            lng0 = 2 * math.pi * j / slices
+            lng1 = 2 * math.pi * (j + 1) / slices
+            for lat, lng in ((lat0, lng0), (lat0, lng1), (lat1, lng1), (lat1, lng0)):
+                vertices.append([
+                    math.cos(lat) * math.cos(lng),
+                    math.sin(lat),
+                    math.cos(lat) * math.sin(lng)
+                ])
+    # Points on a unit sphere are their own normals
+    return Mesh(vertices, vertices)
+
+
+def build_cylinder_mesh(slices=16):
+    """Upright cylinder of unit radius and unit height centred on the origin"""
+    vertices = []
+    normals = []
+    for i in range(slices):
+        a0 = 2 * math.pi * i / slices
+        a1 = 2 * math.pi * (i + 1) / slices
+        x0, z0 = math.cos(a0), math.sin(a0)
+        x1, z1 = math.cos(a1), math.sin(a1)
+
+        # Side quad
+        vertices.extend([[x0, -0.5, z0], [x0, 0.5, z0], [x1, 0.5, z1], [x1, -0.5, z1]])
+        normals.extend([[x0, 0, z0], [x0, 0, z0], [x1, 0, z1], [x1, 0, z1]])
+
+        # Degenerate quads fanning the top and bottom caps
+        vertices.extend([[0, 0.5, 0], [x1, 0.5, z1], [x0, 0.5, z0], [0, 0.5, 0]])
+        normals.extend([[0, 1, 0]] * 4)
+        vertices.extend([[0, -0.5, 0], [x0, -0.5, z0], [x1, -0.5, z1], [0, -0.5, 0]])
+        normals.extend([[0, -1, 0]] * 4)
+    return Mesh(vertices, normals)
+
+
+def build_terrain_mesh(grid_size=20):
+    """Flat unit grid on the XZ plane centred on the origin"""
+    step = 1.0 / grid_size
+    vertices = []
+    for i in range(grid_size):
+        for j in range(grid_size):
+            x1 = -0.5 + i * step
+            z1 = -0.5 + j * step
+            x2 = x1 + step
+            z2 = z1 + step
+            vertices.extend([[x1, 0, z1], [x1, 0, z2], [x2, 0, z2], [x2, 0, z1]])
+    return Mesh(vertices, [[0, 1, 0]] * len(vertices))
+
+
+def build_meshes():
+    """Every mesh the queue can draw, by name; needs no GL context"""
+    return {
+        'cube': build_cube_mesh(),
+        'sphere': build_sphere_mesh(),
+        'cylinder': build_cylinder_mesh(),
+        'terrain': build_terrain_mesh(),
+    }
+
+
+class RenderQueue:
+    """Collects draw commands and submits them sorted by GL state"""
+    def __init__(self, meshes=None):
+        self.meshes = meshes if meshes is not None else build_meshes()
+        self.material_order = {name: i for i, name in enumerate(MATERIALS)}
+        self.commands = []
+
+        # Statistics from the last flush
+        self.draw_calls = 0
+        self.state_changes = 0
+
+    def submit(self, mesh, transform, color, material='lit'):
+        """Queue a mesh drawn with a 4x4 model matrix"""
+        self.commands.append((mesh, transform, tuple(color), material))
+
+    def submit_batch(self, mesh, transforms, colors, material='lit'):
+        """Queue one instance of a mesh per (4, 4) matrix in an (N, 4, 4) stack"""
+        colors = np.asarray(colors, dtype=np.float32)
+        if colors.ndim == 1:
+            colors = np.broadcast_to(colors, (len(transforms), len(colors)))
+        for transform, color in zip(transforms, colors.tolist()):
+            self.commands.append((mesh, transform, tuple(color), material))
+
+    def sort_key(self, command):
+        """Order commands by material, then mesh, then color"""
+        mesh, _, color, material = command
+        return (self.material_order[material], mesh, color)
+
+    def flush(self, view):
+        """Draw every queued command, then reset the queue"""
+        self.commands.sort(key=self.sort_key)
+
+        # Build every model-view matrix in one batch, already transposed to the
+        # column-major layout glLoadMatrixf expects
+        if self.commands:
+            models = np.array([command[1] for command in self.commands], dtype=np.float32)
+            modelviews = np.ascontiguousarray(
+                np.matmul(np.asarray(view, dtype=np.float32), models).transpose(0, 2, 1)
+            )
+
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+
+        current_material = None
+        current_mesh = None
+        current_color = None
+        state_changes = 0
+
+        for i, (mesh_name, _, color, material) in enumerate(self.commands):
+            if material != current_material:
+                if MATERIALS[material]['lighting']:
+                    glEnable(GL_LIGHTING)
+                else:
+                    glDisable(GL_LIGHTING)
+                current_material = material
+                state_changes += 1
+
+            if mesh_name != current_mesh:
+                mesh = self.meshes[mesh_name]
+                glVertexPointer(3, GL_FLOAT, 0, mesh.vertices)
+                glNormalPointer(GL_FLOAT, 0, mesh.normals)
+                current_mesh = mesh_name
+                state_changes += 1
+
+            if color != current_color:
+                glColor4fv(color)
+                current_color = color
+                state_changes += 1
+
+            glLoadMatrixf(modelviews[i])
+            glDrawArrays(mesh.primitive, 0, mesh.count)
+
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+        # Leave the camera loaded and lighting restored for immediate-mode drawing
+        glLoadMatrixf(np.ascontiguousarray(view.T, dtype=np.float32))
+        glEnable(GL_LIGHTING)
+
+        self.draw_calls = len(self.commands)
+        self.state_changes = state_changes
+        self.commands = []
@@ -5,10 +5,12 @@ import numpy as np
 import math
 from utils.constants import *
 from utils.math3d import Vector3
+from utils.render_queue import RenderQueue
 
 class Renderer:
-    def __init__(self):
+    def __init__(self, meshes=None):
         self.setup_opengl()
+        self.queue = RenderQueue(meshes)
         
     def setup_opengl(self):
         """Initialize OpenGL settings"""
@@ -190,6 +192,28 @@ class Renderer:
                 glVertex3f(x1, y, z2)
         glEnd()
         
+    def draw_particles(self, positions, colors):
+        """Draw particles, as (N, 3) positions and (N, 4) colors, in one batch of blended points"""
+        if len(positions) == 0:
+            return
+        positions = np.ascontiguousarray(positions)
+        colors = np.ascontiguousarray(colors)
+        
+        glDisable(GL_LIGHTING)
+        glDepthMask(GL_FALSE)
+        glPointSize(PARTICLE_SIZE)
+        
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, positions)
+        glColorPointer(4, GL_FLOAT, 0, colors)
+        glDrawArrays(GL_POINTS, 0, len(positions))
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        
+        glDepthMask(GL_TRUE)
+        glEnable(GL_LIGHTING)
+        
     def push_matrix(self):
         """Push current matrix onto stack"""
         glPushMatrix()
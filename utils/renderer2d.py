@@ -0,0 +1,314 @@
+import pygame
+import numpy as np
+from utils.constants import *
+from utils.obstacles import BOX
+from utils.occupancy import OccupancyGrid, grid_to_image, PLAYER, ALLY, ENEMY, PLAYER_BULLET, ENEMY_BULLET
+
+BACKGROUND_TILE = 256  # pixels per side of a cached background tile
+MAX_BACKGROUND_TILES = 64
+
+
+def to_rgb(color):
+    """0-255 RGB tuple for a 0-1 float color constant"""
+    return tuple(int(c * 255) for c in color[:3])
+
+
+# Sprite radius in pixels and color for each occupancy channel
+SPRITES = {
+    PLAYER: (15, to_rgb(PLAYER_COLOR)),
+    ALLY: (12, to_rgb(ALLY_COLOR)),
+    ENEMY: (12, to_rgb(ENEMY_COLOR)),
+    PLAYER_BULLET: (3, to_rgb(BULLET_COLOR)),
+    ENEMY_BULLET: (3, RED),
+}
+
+
+class TextCache:
+    """Rendered text surfaces, re-rendered only when their text changes"""
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, key, text, font, color):
+        """Surface for text, and whether it had to be rendered this call"""
+        entry = self.entries.get(key)
+        if entry and entry[0] == text:
+            return entry[1], False
+        surface = font.render(text, True, color)
+        self.entries[key] = (text, surface)
+        return surface, True
+
+
+class Renderer2D:
+    """Top-down 2D renderer built on cached sprites and dirty rectangles.
+
+    The view is centred on a point in the world. Static obstacles are drawn
+    once into cached background tiles. Entities are pre-rendered sprites,
+    blitted in one batch. While the view centre stays put, each frame only
+    restores the background under last frame's sprites, draws the new
+    ones, and redraws HUD overlays whose content changed or that a sprite
+    touched. Only those rectangles are sent to the display. When the view
+    moves by less than a screen, the screen is scrolled and only the strips
+    it exposes are restored from the background; the whole display is
+    updated then, since every pixel moved. A bigger jump redraws everything.
+
+    draw() takes plain arrays, so replays and exporters can drive it without
+    a live Game.
+    """
+    def __init__(self, screen, obstacles=None, scale=RENDER_2D_SCALE):
+        self.screen = screen
+        self.obstacles = obstacles
+        self.scale = scale
+        self.width, self.height = screen.get_size()
+        self.sky = to_rgb(SKY_COLOR)
+
+        self.sprites = {}
+        for channel, (radius, color) in SPRITES.items():
+            sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, color, (radius, radius), radius)
+            self.sprites[channel] = sprite
+
+        self.tiles = {}
+        self.font = pygame.font.Font(None, 36)
+        self.big_font = pygame.font.Font(None, 72)
+        self.text = TextCache()
+        self.occupancy = OccupancyGrid()
+        self.minimap_grid = self.occupancy.empty()
+        self.minimap_image = None
+
+        self.view = None
+        self.previous_rects = []
+        self.overlay_keys = {}
+        self.overlay_rects = {}
+        self.full_redraws = 0
+        self.scrolls = 0
+        self.partial_updates = 0
+
+    def background_tile(self, ti, tj):
+        """Sky and obstacles for one tile of the world, in world pixels"""
+        tile = self.tiles.get((ti, tj))
+        if tile is not None:
+            return tile
+        if len(self.tiles) >= MAX_BACKGROUND_TILES:
+            self.tiles.pop(next(iter(self.tiles)))
+
+        tile = pygame.Surface((BACKGROUND_TILE, BACKGROUND_TILE))
+        tile.fill(self.sky)
+        if self.obstacles is not None and len(self.obstacles):
+            origin = np.array([ti, tj]) * BACKGROUND_TILE
+            centers = self.obstacles.centers[:, [0, 2]] * self.scale - origin
+            half = self.obstacles.half_extents[:, [0, 2]] * self.scale
+            touching = np.all((centers + half >= 0) & (centers - half < BACKGROUND_TILE), axis=1)
+            color = to_rgb(OBSTACLE_COLOR)
+            for kind, (x, y), (hx, hy) in zip(self.obstacles.kinds[touching].tolist(),
+                                               centers[touching].tolist(), half[touching].tolist()):
+                if kind == BOX:
+                    pygame.draw.rect(tile, color, (int(x - hx), int(y - hy), int(2 * hx), int(2 * hy)))
+                else:
+                    pygame.draw.circle(tile, color, (int(x), int(y)), int(hx))
+        self.tiles[(ti, tj)] = tile
+        return tile
+
+    def restore(self, rect):
+        """Copy the background under a screen rectangle back onto the screen"""
+        offset_x, offset_y = self.view
+        left = rect.left + offset_x
+        top = rect.top + offset_y
+        for ti in range(left // BACKGROUND_TILE, (left + rect.width - 1) // BACKGROUND_TILE + 1):
+            for tj in range(top // BACKGROUND_TILE, (top + rect.height - 1) // BACKGROUND_TILE + 1):
+                tile_rect = pygame.Rect(ti * BACKGROUND_TILE, tj * BACKGROUND_TILE,
+                                        BACKGROUND_TILE, BACKGROUND_TILE)
+                area = tile_rect.clip(pygame.Rect(left, top, rect.width, rect.height))
+                if area.width and area.height:
+                    self.screen.blit(self.background_tile(ti, tj),
+                                     (area.left - offset_x, area.top - offset_y),
+                                     area.move(-tile_rect.left, -tile_rect.top))
+
+    def scroll(self, view):
+        """Scroll the screen to a nearby view; returns the exposed rects, restored
+
+        HUD overlays are fixed to the screen, so their background is put
+        back before scrolling and they must be redrawn afterwards.
+        """
+        for rect in self.overlay_rects.values():
+            self.restore(rect)
+        dx = view[0] - self.view[0]
+        dy = view[1] - self.view[1]
+        self.screen.scroll(-dx, -dy)
+        self.view = view
+        exposed = []
+        if dx:
+            exposed.append(pygame.Rect(self.width - dx if dx > 0 else 0, 0, abs(dx), self.height))
+        if dy:
+            exposed.append(pygame.Rect(0, self.height - dy if dy > 0 else 0, self.width, abs(dy)))
+        for rect in exposed:
+            self.restore(rect)
+        return exposed
+
+    def project(self, xz):
+        """Integer screen coordinates for an (N, 2) array of world x/z"""
+        offset = np.array(self.view)
+        return np.floor(np.asarray(xz, dtype=np.float64).reshape(-1, 2) * self.scale - offset).astype(int)
+
+    def draw(self, center_x, center_z, tank_xz, tank_channels, bullet_xz, bullet_channels,
+             particle_xz=None, particle_colors=None, hud=None, grid=None):
+        """Draw one frame and update the display; returns the rectangles updated
+
+        tank_xz and bullet_xz are (N, 2) world positions with occupancy
+        channels for their sprites. particle_colors are 0-1 RGB rows. hud is
+        a dict with health_ratio, score, enemies and game_over. grid is an
+        occupancy grid for the minimap.
+        """
+        view = (int(np.floor(center_x * self.scale)) - self.width // 2,
+                int(np.floor(center_z * self.scale)) - self.height // 2)
+        moved = view != self.view
+        scroll = (moved and self.view is not None and
+                  abs(view[0] - self.view[0]) < self.width and abs(view[1] - self.view[1]) < self.height)
+        full = moved and not scroll
+        screen_rect = self.screen.get_rect()
+
+        if full:
+            self.view = view
+            self.restore(screen_rect)
+            dirty = [screen_rect]
+        else:
+            # Last frame's sprites come off in the view they were drawn in
+            for rect in self.previous_rects:
+                self.restore(rect)
+            dirty = list(self.previous_rects)
+            if hud is not None and not hud['game_over'] and 'game_over' in self.overlay_rects:
+                rect = self.overlay_rects.pop('game_over')
+                self.restore(rect)
+                dirty.append(rect)
+            if scroll:
+                dirty += self.scroll(view)
+
+        # Sprites, one batched blit
+        drawn = []
+        blits = []
+        for xz, channels in ((tank_xz, tank_channels), (bullet_xz, bullet_channels)):
+            if len(xz) == 0:
+                continue
+            points = self.project(xz)
+            channels = np.asarray(channels)
+            for channel in np.unique(channels).tolist():
+                sprite = self.sprites[channel]
+                radius = sprite.get_width() // 2
+                for x, y in points[channels == channel].tolist():
+                    if -radius <= x < self.width + radius and -radius <= y < self.height + radius:
+                        blits.append((sprite, (x - radius, y - radius)))
+        if blits:
+            drawn += self.screen.blits(blits)
+
+        if particle_xz is not None and len(particle_xz):
+            rect = self.draw_particles(particle_xz, particle_colors)
+            if rect:
+                drawn.append(rect)
+
+        dirty += drawn
+        self.previous_rects = [r.clip(screen_rect) for r in drawn]
+
+        if hud is not None:
+            dirty += self.draw_overlays(hud, grid, dirty, moved)
+
+        if moved:
+            pygame.display.update(screen_rect)
+            if full:
+                self.full_redraws += 1
+            else:
+                self.scrolls += 1
+            return [screen_rect]
+        pygame.display.update(dirty)
+        self.partial_updates += 1
+        return dirty
+
+    def draw_particles(self, particle_xz, particle_colors):
+        """Splat 2x2 particles into the screen pixels; returns their bounding rect"""
+        points = self.project(particle_xz)
+        visible = ((points[:, 0] >= 0) & (points[:, 0] < self.width - 1) &
+                   (points[:, 1] >= 0) & (points[:, 1] < self.height - 1))
+        if not visible.any():
+            return None
+        xs, ys = points[visible].T
+        colors = (np.asarray(particle_colors)[visible, :3] * 255).astype(np.uint8)
+        pixels = pygame.surfarray.pixels3d(self.screen)
+        for dx, dy in ((0, 0), (1, 0), (0, 1), (1, 1)):
+            pixels[xs + dx, ys + dy] = colors
+        del pixels
+        return pygame.Rect(xs.min(), ys.min(), xs.max() - xs.min() + 2, ys.max() - ys.min() + 2)
+
+    def draw_overlays(self, hud, grid, dirty, full):
+        """Redraw HUD elements that changed or were drawn over; returns their rects
+
+        full redraws every element.
+        """
+        overlays = [
+            ('health', pygame.Rect(10, 10, 200, 20), round(hud['health_ratio'] * 200), self.draw_health),
+            ('score', pygame.Rect(10, 40, 220, 26), hud['score'], self.draw_score),
+            ('enemies', pygame.Rect(10, 70, 220, 26), hud['enemies'], self.draw_enemies),
+        ]
+        if grid is not None:
+            rect = pygame.Rect(self.width - MINIMAP_SIZE - 10, 10, MINIMAP_SIZE, MINIMAP_SIZE)
+            overlays.append(('minimap', rect, grid.tobytes(), lambda rect, key: self.draw_minimap(rect, grid)))
+        if hud['game_over']:
+            rect = pygame.Rect(0, 0, 400, 130)
+            rect.center = (self.width // 2, self.height // 2 + 20)
+            overlays.append(('game_over', rect, True, self.draw_game_over))
+
+        updated = []
+        for name, rect, key, draw in overlays:
+            if not full and self.overlay_keys.get(name) == key and rect.collidelist(dirty) == -1:
+                continue
+            # HUD panels are opaque to the sprites underneath
+            self.restore(rect)
+            draw(rect, key)
+            self.overlay_keys[name] = key
+            self.overlay_rects[name] = rect
+            updated.append(rect)
+        if not hud['game_over']:
+            self.overlay_keys.pop('game_over', None)
+            self.overlay_rects.pop('game_over', None)
+        return updated
+
+    def draw_health(self, rect, width):
+        pygame.draw.rect(self.screen, RED, rect)
+        pygame.draw.rect(self.screen, GREEN, (rect.left, rect.top, width, rect.height))
+
+    def draw_score(self, rect, score):
+        surface, _ = self.text.get('score', f"Score: {score}", self.font, WHITE)
+        self.screen.blit(surface, rect.topleft)
+
+    def draw_enemies(self, rect, enemies):
+        surface, _ = self.text.get('enemies', f"Enemies: {enemies}", self.font, WHITE)
+        self.screen.blit(surface, rect.topleft)
+
+    def draw_minimap(self, rect, grid):
+        self.minimap_image = grid_to_image(grid, self.minimap_image)
+        minimap = pygame.transform.scale(pygame.surfarray.make_surface(self.minimap_image), rect.size)
+        self.screen.blit(minimap, rect.topleft)
+        pygame.draw.rect(self.screen, WHITE, rect, 1)
+
+    def draw_game_over(self, rect, _):
+        game_over_text, _ = self.text.get('game_over', "GAME OVER", self.big_font, RED)
+        restart_text, _ = self.text.get('restart', "Press R to restart", self.font, WHITE)
+        self.screen.blit(game_over_text, game_over_text.get_rect(center=(rect.centerx, rect.top + 30)))
+        self.screen.blit(restart_text, restart_text.get_rect(center=(rect.centerx, rect.top + 90)))
+
+    def draw_snapshot(self, snapshot):
+        """Draw a pipeline Snapshot"""
+        tank_channels = np.where(snapshot.tank_is_player, ALLY, ENEMY)
+        tank_channels[0] = PLAYER
+        bullet_channels = np.where(snapshot.bullet_is_player, PLAYER_BULLET, ENEMY_BULLET)
+        particle_xz = snapshot.particle_positions[:, [0, 2]]
+        particle_colors = snapshot.particle_colors
+        hud = {
+            'health_ratio': max(0.0, snapshot.player_health / snapshot.player_max_health),
+            'score': snapshot.score,
+            'enemies': int((~snapshot.tank_is_player).sum()),
+            'game_over': snapshot.game_over,
+        }
+        grid = self.occupancy.rasterize_snapshot(snapshot, self.minimap_grid)
+        center_x, _, center_z = snapshot.tank_positions[0].tolist()
+        return self.draw(center_x, center_z,
+                         snapshot.tank_positions[:, [0, 2]], tank_channels,
+                         snapshot.bullet_positions[:, [0, 2]], bullet_channels,
+                         particle_xz, particle_colors, hud, grid)
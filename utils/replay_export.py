@@ -0,0 +1,161 @@
+import argparse
+import multiprocessing
+import os
+import time
+import numpy as np
+from utils.constants import *
+from utils.telemetry import Telemetry
+
+# Set by init_worker in each export process
+worker = None
+
+
+class ReplayFrames:
+    """Renders recorded telemetry ticks with Renderer2D into an offscreen surface.
+
+    Must run in a process whose SDL video driver is already chosen; the
+    exporter's workers use the dummy driver. Telemetry records the player,
+    enemies and bullets, so allies and particles do not appear.
+    """
+    def __init__(self, directory, size, map_file=MAP_FILE):
+        import pygame
+        from utils.obstacles import load_map, generate_map
+        from utils.occupancy import OccupancyGrid
+        from utils.renderer2d import Renderer2D
+        self.pygame = pygame
+        pygame.display.init()
+        pygame.font.init()
+        self.screen = pygame.display.set_mode(size)
+        self.telemetry = Telemetry(directory)
+        self.renderer = Renderer2D(self.screen, load_map(map_file) if map_file else generate_map())
+        self.occupancy = OccupancyGrid()
+        self.grid = self.occupancy.empty()
+
+    def render(self, i):
+        """Draw tick row i onto the screen"""
+        from utils.occupancy import PLAYER, ENEMY, PLAYER_BULLET, ENEMY_BULLET
+        row = self.telemetry.ticks[i]
+        enemies = self.telemetry.enemies_at(i)
+        bullets = self.telemetry.bullets_at(i)
+        player_x = float(row['player_x'])
+        player_z = float(row['player_z'])
+
+        tank_xz = np.empty((len(enemies) + 1, 2))
+        tank_xz[0] = player_x, player_z
+        tank_xz[1:, 0] = enemies['x']
+        tank_xz[1:, 1] = enemies['z']
+        tank_channels = np.full(len(tank_xz), ENEMY)
+        tank_channels[0] = PLAYER
+        bullet_xz = np.column_stack((bullets['x'], bullets['z']))
+        bullet_channels = np.where(bullets['is_player'], PLAYER_BULLET, ENEMY_BULLET)
+
+        hud = {
+            'health_ratio': max(0.0, float(row['player_health']) / TANK_MAX_HEALTH),
+            'score': int(row['score']),
+            'enemies': len(enemies),
+            'game_over': bool(row['player_health'] <= 0),
+        }
+        grid = self.occupancy.rasterize(
+            player_x, player_z,
+            np.concatenate([tank_xz[:, 0], bullet_xz[:, 0]]),
+            np.concatenate([tank_xz[:, 1], bullet_xz[:, 1]]),
+            np.concatenate([tank_channels, bullet_channels]),
+            self.grid)
+        self.renderer.draw(player_x, player_z, tank_xz, tank_channels, bullet_xz, bullet_channels,
+                           hud=hud, grid=grid)
+
+    def frame_bytes(self):
+        """The screen as packed RGB24 rows"""
+        return self.pygame.image.tobytes(self.screen, 'RGB')
+
+    def save(self, path):
+        self.pygame.image.save(self.screen, path)
+
+
+def init_worker(directory, size, map_file):
+    """Pool initializer: a dummy-driver display and one ReplayFrames per process"""
+    global worker
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    # SDL would otherwise catch SIGTERM and the pool could not stop the process
+    os.environ['SDL_NO_SIGNAL_HANDLERS'] = '1'
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    worker = ReplayFrames(directory, size, map_file)
+
+
+def render_segment(segment):
+    """Render frames [first, last) of an export; returns the frame count
+
+    Frame n shows tick row start + n * step. Raw streams are written in
+    place at the frame's offset in the pre-sized output file, so segments
+    need no copying to be concatenated; image sequences get one file per
+    frame. Only one frame is held in memory at a time.
+    """
+    output, raw, first, last, start, step = segment
+    if raw:
+        with open(output, 'r+b') as f:
+            for n in range(first, last):
+                worker.render(start + n * step)
+                frame = worker.frame_bytes()
+                os.pwrite(f.fileno(), frame, n * len(frame))
+    else:
+        for n in range(first, last):
+            worker.render(start + n * step)
+            worker.save(os.path.join(output, f"frame_{n:06d}.png"))
+    return last - first
+
+
+def export_replay(directory, output, start=0, end=None, step=1, size=(SCREEN_WIDTH, SCREEN_HEIGHT),
+                  workers=REPLAY_WORKERS, segment_frames=REPLAY_SEGMENT_FRAMES, map_file=MAP_FILE):
+    """Render a recorded match to video frames across a process pool
+
+    directory holds telemetry from TelemetryRecorder. An output ending in
+    .rgb gets one raw RGB24 stream of size frames (for example for
+    ffmpeg -f rawvideo -pix_fmt rgb24); anything else is a directory of
+    numbered PNG frames. The tick range is cut into segments of
+    segment_frames frames, rendered in parallel by workers processes
+    (0 uses every core). Returns the number of frames written.
+    """
+    ticks = len(Telemetry(directory))
+    end = ticks if end is None else min(end, ticks)
+    frames = len(range(start, end, step))
+    raw = output.endswith('.rgb')
+    if raw:
+        with open(output, 'wb') as f:
+            f.truncate(frames * size[0] * size[1] * 3)
+    else:
+        os.makedirs(output, exist_ok=True)
+
+    segments = [(output, raw, first, min(first + segment_frames, frames), start, step)
+                for first in range(0, frames, segment_frames)]
+    workers = min(workers or os.cpu_count(), max(1, len(segments)))
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(workers, initializer=init_worker, initargs=(directory, size, map_file)) as pool:
+        frames = sum(pool.imap_unordered(render_segment, segments))
+        pool.close()
+        pool.join()
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render recorded telemetry to video frames")
+    parser.add_argument('telemetry', help="directory recorded with main.py --telemetry")
+    parser.add_argument('output', help="directory for PNG frames, or a .rgb raw RGB24 stream")
+    parser.add_argument('--start', type=int, default=0, help="first tick row to render")
+    parser.add_argument('--end', type=int, default=None, help="tick row to stop before")
+    parser.add_argument('--step', type=int, default=1, help="render every step-th tick")
+    parser.add_argument('--size', type=int, nargs=2, default=(SCREEN_WIDTH, SCREEN_HEIGHT),
+                        metavar=('WIDTH', 'HEIGHT'))
+    parser.add_argument('--workers', type=int, default=REPLAY_WORKERS,
+                        help="render processes (0 uses every core)")
+    parser.add_argument('--map', default=MAP_FILE, help="map file the match was played on")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    frames = export_replay(args.telemetry, args.output, args.start, args.end, args.step,
+                           tuple(args.size), args.workers, map_file=args.map)
+    seconds = time.perf_counter() - started
+    print(f"Rendered {frames} frames in {seconds:.2f}s ({frames / seconds:.0f} frames/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import queue
+import threading
+import time
+
+
+class StartupReport:
+    """Wall-clock time of each start-up phase, in the order they finished"""
+    def __init__(self, start=None, echo=False):
+        self.start = time.perf_counter() if start is None else start
+        self.last = self.start
+        self.phases = []
+        self.background = []
+        self.echo = echo
+        self.finished = False
+
+    def mark(self, name):
+        """End the phase running since the previous mark and call it name"""
+        now = time.perf_counter()
+        self.phases.append((name, now - self.last))
+        self.last = now
+
+    def add_background(self, durations):
+        """Record (name, seconds) work done off the main thread"""
+        self.background.extend(durations)
+
+    def finish(self, name):
+        """Mark the last phase, printing the report if echo is set; later calls do nothing"""
+        if self.finished:
+            return
+        self.finished = True
+        self.mark(name)
+        if self.echo:
+            print(self.format())
+
+    @property
+    def total(self):
+        return self.last - self.start
+
+    def format(self):
+        """The report as printable lines"""
+        lines = ["Startup:"]
+        lines += [f"  {name:<14}{seconds * 1000:8.1f} ms" for name, seconds in self.phases]
+        lines.append(f"  {'total':<14}{self.total * 1000:8.1f} ms")
+        lines += [f"  {name:<14}{seconds * 1000:8.1f} ms (background)" for name, seconds in self.background]
+        return '\n'.join(lines)
+
+
+class Warmup:
+    """Builds expensive caches on a background thread.
+
+    Tasks run one at a time in submission order. result() blocks only if
+    its task has not finished yet, and re-raises any error it hit. Only
+    CPU-side work belongs here: a GL context is bound to the thread that
+    made it, so uploads stay on the render thread.
+    """
+    def __init__(self):
+        self.tasks = queue.Queue()
+        self.done = {}
+        self.results = {}
+        self.durations = []
+        self.thread = threading.Thread(target=self.run, name='warmup', daemon=True)
+        self.thread.start()
+
+    def submit(self, name, func):
+        """Queue func() to be built under name"""
+        self.done[name] = threading.Event()
+        self.tasks.put((name, func))
+
+    def run(self):
+        while True:
+            name, func = self.tasks.get()
+            start = time.perf_counter()
+            try:
+                self.results[name] = (True, func())
+            except Exception as e:
+                self.results[name] = (False, e)
+            self.durations.append((name, time.perf_counter() - start))
+            self.done[name].set()
+
+    def result(self, name):
+        """The value built for name, waiting for it if necessary"""
+        self.done[name].wait()
+        ok, value = self.results[name]
+        if not ok:
+            raise value
+        return value
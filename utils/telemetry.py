@@ -0,0 +1,205 @@
+import os
+import struct
+from array import array
+import numpy as np
+from numpy.lib import format as npy_format
+from utils.constants import *
+
+# Per-tick row. Enemies and bullets vary in number, so each tick points at
+# its slice of the enemy and bullet files with a start row and a count.
+TICK_DTYPE = np.dtype([
+    ('tick', '<i8'),
+    ('player_x', '<f4'), ('player_z', '<f4'), ('player_rotation', '<f4'), ('player_health', '<f4'),
+    ('score', '<i4'),
+    ('enemy_start', '<i8'), ('enemy_count', '<i4'),
+    ('bullet_start', '<i8'), ('bullet_count', '<i4'),
+    ('ai_ms', '<f4'), ('collision_ms', '<f4'), ('bullet_ms', '<f4'), ('tick_ms', '<f4'),
+])
+ENEMY_DTYPE = np.dtype([('x', '<f4'), ('z', '<f4'), ('rotation', '<f4'), ('health', '<f4')])
+BULLET_DTYPE = np.dtype([('x', '<f4'), ('y', '<f4'), ('z', '<f4'), ('is_player', 'u1')])
+FILES = {'ticks': TICK_DTYPE, 'enemies': ENEMY_DTYPE, 'bullets': BULLET_DTYPE}
+
+
+class ColumnFile:
+    """A growable .npy file of fixed-width rows, written through a mapped window.
+
+    The header is padded to a fixed size so it can be rewritten in place as
+    the row count grows. Only a window of chunk_rows rows is mapped at a
+    time; when it fills, the file is extended by another chunk and the
+    window moves on. Resident memory stays at one chunk however long the
+    run. Between flushes the header lags behind, so a crashed run still
+    loads up to its last flush.
+    """
+    def __init__(self, path, dtype, chunk_rows=TELEMETRY_CHUNK_ROWS):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.chunk_rows = chunk_rows
+        self.length = 0
+
+        # Room for the widest shape this file can ever have
+        widest = self.header_text(10 ** 19)
+        self.header_bytes = -(-(len(npy_format.magic(1, 0)) + 2 + len(widest) + 1) // 64) * 64
+
+        self.file = open(path, 'w+b')
+        self.write_header()
+        self.window = None
+        self.window_start = 0
+        self.map_window(0)
+
+    def header_text(self, rows):
+        return repr({'descr': npy_format.dtype_to_descr(self.dtype), 'fortran_order': False,
+                     'shape': (rows,)})
+
+    def write_header(self):
+        """Rewrite the header in place with the current row count"""
+        prefix = npy_format.magic(1, 0)
+        text = self.header_text(self.length)
+        text = text.ljust(self.header_bytes - len(prefix) - 2 - 1) + '\n'
+        self.file.seek(0)
+        self.file.write(prefix + struct.pack('<H', len(text)) + text.encode('latin1'))
+
+    def map_window(self, start):
+        """Extend the file by a chunk and map it starting at row start"""
+        if self.window is not None:
+            self.window.flush()
+            self.window = self.rows = None
+        self.file.truncate(self.header_bytes + (start + self.chunk_rows) * self.dtype.itemsize)
+        self.window = np.memmap(self.file, dtype=self.dtype, mode='r+',
+                                offset=self.header_bytes + start * self.dtype.itemsize,
+                                shape=(self.chunk_rows,))
+        # Slicing a plain view skips the memmap subclass overhead per tick
+        self.rows = self.window.view(np.ndarray)
+        self.window_start = start
+
+    def reserve(self, count):
+        """Window slice for the next count rows, moving the window if needed
+
+        count must not exceed chunk_rows; use append() for longer runs.
+        """
+        local = self.length - self.window_start
+        if local + count > self.chunk_rows:
+            self.map_window(self.length)
+            local = 0
+        self.length += count
+        return self.rows[local:local + count]
+
+    def append(self, rows):
+        """Append a structured array of any length"""
+        for i in range(0, len(rows), self.chunk_rows):
+            part = rows[i:i + self.chunk_rows]
+            self.reserve(len(part))[:] = part
+
+    def flush(self):
+        """Commit the row count to the header
+
+        Rows written through the map are already in the page cache and reach
+        the file even if the process dies, so there is no need to sync them.
+        """
+        self.write_header()
+        self.file.flush()
+
+    def close(self):
+        """Flush, trim the unused tail and close the file"""
+        self.window.flush()
+        self.flush()
+        self.window = self.rows = None
+        self.file.truncate(self.header_bytes + self.length * self.dtype.itemsize)
+        self.file.close()
+
+
+class TelemetryRecorder:
+    """Records per-tick match telemetry into a directory of .npy files.
+
+    ticks.npy holds one TICK_DTYPE row per recorded tick; enemies.npy and
+    bullets.npy hold that tick's enemies and bullets, found through the
+    start and count columns. Each tick only appends plain numbers to small
+    staging arrays; every batch_ticks ticks they are converted in bulk and
+    copied into the memory-mapped files, so neither per-tick cost nor
+    memory grows with the length of the match.
+    """
+    def __init__(self, directory, chunk_rows=TELEMETRY_CHUNK_ROWS, batch_ticks=TELEMETRY_BATCH_TICKS,
+                 flush_interval=TELEMETRY_FLUSH_INTERVAL):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.files = {name: ColumnFile(os.path.join(directory, f"{name}.npy"), dtype, chunk_rows)
+                      for name, dtype in FILES.items()}
+        self.stages = {'ticks': array('d'), 'enemies': array('f'), 'bullets': array('f')}
+        self.batch_ticks = batch_ticks
+        self.flush_interval = flush_interval
+        self.ticks = 0
+        self.enemy_rows = 0
+        self.bullet_rows = 0
+
+    def record(self, game, phase_ms=(0.0, 0.0, 0.0, 0.0)):
+        """Append one tick of a Game's state; phase_ms is (ai, collision, bullet, tick) times"""
+        enemies = game.enemies
+        bullets = game.bullets
+        stage = self.stages['enemies']
+        for enemy in enemies:
+            position = enemy.position
+            stage.extend((position.x, position.z, enemy.rotation, enemy.health))
+        stage = self.stages['bullets']
+        for bullet in bullets:
+            position = bullet.position
+            stage.extend((position.x, position.y, position.z, bullet.is_player_bullet))
+
+        player = game.player
+        self.stages['ticks'].extend((
+            self.ticks, player.position.x, player.position.z, player.rotation, player.health,
+            game.score, self.enemy_rows, len(enemies), self.bullet_rows, len(bullets), *phase_ms))
+        self.enemy_rows += len(enemies)
+        self.bullet_rows += len(bullets)
+        self.ticks += 1
+
+        if self.ticks % self.batch_ticks == 0:
+            self.write_stages()
+        if self.ticks % self.flush_interval == 0:
+            self.flush()
+
+    def write_stages(self):
+        """Convert the staged numbers to rows and copy them into the files"""
+        for name, stage in self.stages.items():
+            if not stage:
+                continue
+            dtype = FILES[name]
+            columns = np.frombuffer(stage, dtype=stage.typecode).reshape(-1, len(dtype.names))
+            rows = np.empty(len(columns), dtype=dtype)
+            for i, field in enumerate(dtype.names):
+                rows[field] = columns[:, i]
+            self.files[name].append(rows)
+            del columns
+            del stage[:]
+
+    def flush(self):
+        """Commit everything recorded so far to disk"""
+        self.write_stages()
+        for column_file in self.files.values():
+            column_file.flush()
+
+    def close(self):
+        self.write_stages()
+        for column_file in self.files.values():
+            column_file.close()
+
+
+class Telemetry:
+    """A recorded match opened for analysis without copying.
+
+    ticks, enemies and bullets are read-only memory maps of the files.
+    """
+    def __init__(self, directory):
+        for name in FILES:
+            setattr(self, name, np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r'))
+
+    def __len__(self):
+        return len(self.ticks)
+
+    def enemies_at(self, i):
+        """View of the enemy rows recorded on tick row i"""
+        row = self.ticks[i]
+        return self.enemies[row['enemy_start']:row['enemy_start'] + row['enemy_count']]
+
+    def bullets_at(self, i):
+        """View of the bullet rows recorded on tick row i"""
+        row = self.ticks[i]
+        return self.bullets[row['bullet_start']:row['bullet_start'] + row['bullet_count']]
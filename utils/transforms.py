@@ -0,0 +1,58 @@
+import numpy as np
+from utils.math3d import scale_matrix, translation_matrix
+
+# Batched counterparts of the utils.math3d matrix helpers. Every function takes
+# stacked inputs and returns an (N, 4, 4) float32 array, so the transforms for a
+# whole army are built with a handful of NumPy calls instead of one per entity.
+
+
+def translation_matrices(positions):
+    """Create stacked translation matrices from an (N, 3) array"""
+    positions = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+    matrices = np.zeros((len(positions), 4, 4), dtype=np.float32)
+    matrices[:, 0, 0] = 1
+    matrices[:, 1, 1] = 1
+    matrices[:, 2, 2] = 1
+    matrices[:, 3, 3] = 1
+    matrices[:, :3, 3] = positions
+    return matrices
+
+
+def rotation_matrices_y(angles):
+    """Create stacked rotation matrices around the Y axis"""
+    angles = np.asarray(angles, dtype=np.float32).reshape(-1)
+    cos_a = np.cos(angles)
+    sin_a = np.sin(angles)
+    matrices = np.zeros((len(angles), 4, 4), dtype=np.float32)
+    matrices[:, 0, 0] = cos_a
+    matrices[:, 0, 2] = sin_a
+    matrices[:, 1, 1] = 1
+    matrices[:, 2, 0] = -sin_a
+    matrices[:, 2, 2] = cos_a
+    matrices[:, 3, 3] = 1
+    return matrices
+
+
+def pose_matrices(positions, angles):
+    """Create stacked translate-then-rotate-about-Y matrices"""
+    matrices = rotation_matrices_y(angles)
+    matrices[:, :3, 3] = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+    return matrices
+
+
+def tank_part_matrices(positions, rotations, turret_rotations, width, height, length):
+    """Compose hull, turret and barrel world matrices for a stack of tanks"""
+    body = pose_matrices(positions, rotations)
+
+    hull = np.matmul(body, scale_matrix(width, height * 0.6, length).astype(np.float32))
+
+    turret = np.matmul(
+        np.matmul(body, translation_matrix(0, height * 0.4, 0).astype(np.float32)),
+        rotation_matrices_y(turret_rotations)
+    )
+    turret_base = np.matmul(turret, scale_matrix(width * 0.8, height * 0.4, width * 0.8).astype(np.float32))
+
+    barrel_local = np.dot(translation_matrix(0, 0, length * 0.4), scale_matrix(0.1, 0.1, length * 0.6))
+    barrel = np.matmul(turret, barrel_local.astype(np.float32))
+
+    return hull, turret_base, barrel